@@ -1,6 +1,8 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import User
+from galactiturf.admin_exports import JSONExportMixin
+from galactiturf.pagination import EstimatedCountPaginator
+from .models import BalanceSnapshot, CoinLedgerArchive, CoinLedgerEntry, User
 
 
 @admin.register(User)
@@ -9,8 +11,10 @@ class CustomUserAdmin(UserAdmin):
     
     list_display = ['username', 'email', 'first_name', 'last_name', 'coin_balance', 'subscription_tier', 'is_active']
     list_filter = ['subscription_tier', 'is_active', 'date_joined']
-    search_fields = ['username', 'email', 'first_name', 'last_name']
+    search_fields = ['=username', '=email']
     ordering = ['-date_joined']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     
     fieldsets = UserAdmin.fieldsets + (
         ('Galactiturf Info', {
@@ -23,3 +27,46 @@ class CustomUserAdmin(UserAdmin):
             'fields': ('coin_balance', 'subscription_tier', 'phone_number', 'date_of_birth')
         }),
     )
+
+
+@admin.register(CoinLedgerEntry)
+class CoinLedgerEntryAdmin(JSONExportMixin, admin.ModelAdmin):
+    """Admin configuration for CoinLedgerEntry model."""
+    
+    list_display = ['user', 'amount', 'reason', 'reference', 'created_at']
+    list_filter = ['reason', 'created_at']
+    list_select_related = ['user']
+    search_fields = ['=reference', '=user__username']
+    ordering = ['-id']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ['export_as_json']
+    export_fields = ['id', 'user_id', 'user__username', 'amount', 'reason', 'reference', 'created_at']
+    readonly_fields = ['user', 'amount', 'reason', 'reference', 'created_at']
+
+
+@admin.register(BalanceSnapshot)
+class BalanceSnapshotAdmin(admin.ModelAdmin):
+    """Admin configuration for BalanceSnapshot model."""
+    
+    list_display = ['user', 'balance', 'last_entry_id', 'taken_at']
+    list_select_related = ['user']
+    search_fields = ['=user__username']
+    ordering = ['-taken_at']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    readonly_fields = ['user', 'balance', 'last_entry_id', 'taken_at']
+
+
+@admin.register(CoinLedgerArchive)
+class CoinLedgerArchiveAdmin(admin.ModelAdmin):
+    """Admin configuration for CoinLedgerArchive model."""
+    
+    list_display = ['user', 'amount', 'reason', 'reference', 'created_at', 'archived_at']
+    list_filter = ['reason']
+    list_select_related = ['user']
+    search_fields = ['=user__username']
+    ordering = ['-id']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    readonly_fields = ['id', 'user', 'amount', 'reason', 'reference', 'created_at', 'archived_at']
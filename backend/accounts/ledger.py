@@ -0,0 +1,202 @@
+"""
+Balance snapshots, drift checks and compaction for the coin ledger.
+
+Every change to ``User.coin_balance`` writes a ``CoinLedgerEntry``, so a
+balance should always equal the sum of the user's entries. Summing the
+whole history for every user gets slower as the ledger grows, so:
+
+* ``take_snapshots`` records each user's balance as of a ledger entry
+  (``BalanceSnapshot``), adding only the entries written since the
+  previous run. It stops ``LEDGER_SNAPSHOT_LAG_SECONDS`` short of now, so
+  the transactions that wrote the entries it counts have almost always
+  committed. One held open for longer commits its entry below the
+  watermark after the run, and the snapshot never adds it.
+* ``verify_balances`` replays only the entries after each user's snapshot
+  and reports every user whose stored balance differs. Users are split
+  into shards by ``id % workers``, checked in parallel by a process pool.
+  The users that differ have their snapshots recounted from their whole
+  history (``recount_snapshots``), which picks up entries committed late,
+  and only those still off after that are reported.
+* ``compact_ledger`` moves old entries already counted by a snapshot into
+  ``CoinLedgerArchive``, keeping the live ledger (and its indexes) small.
+  Nothing that checks balances reads those entries again, and the coin
+  flow rollups and finance exports read the archive as well.
+"""
+import logging
+import multiprocessing
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from itertools import chain
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import F, Max, Min, Q, Sum
+from django.db.models.functions import Coalesce, Mod
+from django.utils import timezone
+
+from galactiturf.archive import move_rows
+from games.models import SchedulerCheckpoint
+from .models import BalanceSnapshot, CoinLedgerArchive, CoinLedgerEntry, User
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_NAME = 'accounts.balance_snapshots'
+
+# Snapshots written per statement, users per drift query (per shard), entries moved per transaction
+SNAPSHOT_BATCH = 1000
+VERIFY_BATCH = 2000
+COMPACT_BATCH = 5000
+
+ENTRY_FIELDS = ['id', 'user_id', 'amount', 'reason', 'reference', 'created_at']
+
+Drift = namedtuple('Drift', ['user_id', 'username', 'stored', 'expected'])
+
+
+def take_snapshots(now=None, lag=None, batch_size=SNAPSHOT_BATCH):
+    """Bring the balance snapshots up to date; return the number of users whose snapshot moved."""
+    now = now or timezone.now()
+    lag = settings.LEDGER_SNAPSHOT_LAG_SECONDS if lag is None else lag
+
+    with transaction.atomic():
+        # Runs are serialised, or two of them would add the same entries twice
+        SchedulerCheckpoint.objects.get_or_create(name=CHECKPOINT_NAME)
+        checkpoint = SchedulerCheckpoint.objects.select_for_update().get(name=CHECKPOINT_NAME)
+
+        # Every run moves its snapshots to the same entry, so the highest one is where the last run stopped
+        since = BalanceSnapshot.objects.aggregate(last=Max('last_entry_id'))['last'] or 0
+        upto = (
+            CoinLedgerEntry.objects.filter(created_at__lte=now - timedelta(seconds=lag))
+            .order_by('-created_at', '-id').values_list('id', flat=True).first()
+        )
+        if upto is None or upto <= since:
+            checkpoint.mark_completed(now)
+            return 0
+
+        deltas = list(
+            CoinLedgerEntry.objects.filter(id__gt=since, id__lte=upto)
+            .values('user_id').annotate(total=Sum('amount')).order_by('user_id')
+            .values_list('user_id', 'total')
+        )
+        for start in range(0, len(deltas), batch_size):
+            batch = deltas[start:start + batch_size]
+            balances = dict(
+                BalanceSnapshot.objects.filter(user_id__in=[user_id for user_id, _ in batch])
+                .values_list('user_id', 'balance')
+            )
+            BalanceSnapshot.objects.bulk_create(
+                [
+                    BalanceSnapshot(
+                        user_id=user_id, balance=balances.get(user_id, 0) + total,
+                        last_entry_id=upto, taken_at=now,
+                    )
+                    for user_id, total in batch
+                ],
+                update_conflicts=True,
+                unique_fields=['user'],
+                update_fields=['balance', 'last_entry_id', 'taken_at'],
+            )
+        checkpoint.mark_completed(now)
+    return len(deltas)
+
+
+def _drift(users):
+    """The users whose balance doesn't match their snapshot plus newer entries."""
+    # One statement, so balances and entries are read at the same instant
+    users = users.annotate(
+        expected=Coalesce('balance_snapshot__balance', 0) + Coalesce(
+            Sum('coin_ledger__amount', filter=Q(
+                coin_ledger__id__gt=Coalesce('balance_snapshot__last_entry_id', 0)
+            )),
+            0,
+        ),
+    ).exclude(coin_balance=F('expected'))
+    return [Drift(*row) for row in users.order_by('pk').values_list('pk', 'username', 'coin_balance', 'expected')]
+
+
+def _shard_drift(shard, shards, low, high):
+    """Users with low <= id < high in the shard whose balance doesn't match snapshot plus newer entries."""
+    users = User.objects.filter(pk__gte=low, pk__lt=high)
+    if shards > 1:
+        users = users.annotate(shard=Mod('pk', shards)).filter(shard=shard)
+    return _drift(users)
+
+
+def verify_shard(shard, shards=1, batch_size=VERIFY_BATCH):
+    """Check the balances of the users with ``id % shards == shard``; return their drift."""
+    bounds = User.objects.aggregate(low=Min('pk'), high=Max('pk'))
+    if bounds['low'] is None:
+        return []
+    step = batch_size * shards
+    return list(chain.from_iterable(
+        _shard_drift(shard, shards, low, low + step)
+        for low in range(bounds['low'], bounds['high'] + 1, step)
+    ))
+
+
+def _totals(entries, user_ids):
+    """Each user's sum of the entries (live or archived) their snapshot covers."""
+    return dict(
+        entries.filter(user_id__in=user_ids, id__lte=F('user__balance_snapshot__last_entry_id'))
+        .values('user_id').annotate(total=Sum('amount')).order_by().values_list('user_id', 'total')
+    )
+
+
+def recount_snapshots(user_ids):
+    """
+    Recount the snapshots of the given users from every entry they cover.
+
+    ``take_snapshots`` adds each run's entries once, so an entry that
+    commits below the watermark after a run is never added. Summing the
+    live and archived entries up to ``last_entry_id`` counts it. Returns
+    the ids of the users whose snapshot was wrong, now corrected.
+    """
+    with transaction.atomic():
+        # Locked like a snapshot run, so neither overwrites the other
+        SchedulerCheckpoint.objects.get_or_create(name=CHECKPOINT_NAME)
+        SchedulerCheckpoint.objects.select_for_update().get(name=CHECKPOINT_NAME)
+
+        live = _totals(CoinLedgerEntry.objects, user_ids)
+        archived = _totals(CoinLedgerArchive.objects, user_ids)
+        wrong = [
+            snapshot for snapshot in BalanceSnapshot.objects.filter(user_id__in=user_ids)
+            if snapshot.balance != live.get(snapshot.user_id, 0) + archived.get(snapshot.user_id, 0)
+        ]
+        for snapshot in wrong:
+            snapshot.balance = live.get(snapshot.user_id, 0) + archived.get(snapshot.user_id, 0)
+        BalanceSnapshot.objects.bulk_update(wrong, ['balance'])
+    return [snapshot.user_id for snapshot in wrong]
+
+
+def verify_balances(workers=1, batch_size=VERIFY_BATCH):
+    """
+    Compare every user's stored balance with their snapshot plus newer ledger entries.
+
+    With more than one worker the shards are checked by a pool of forked
+    processes, each with its own database connection. The snapshots of
+    users that don't match are recounted, and those users checked again.
+    Returns the drift that remains, ordered by user.
+    """
+    if workers <= 1:
+        drift = verify_shard(0, 1, batch_size)
+    else:
+        # Forked workers must open their own connections rather than share the parent's
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            shards = pool.map(verify_shard, range(workers), [workers] * workers, [batch_size] * workers)
+            drift = sorted(chain.from_iterable(shards))
+
+    recounted = recount_snapshots([row.user_id for row in drift]) if drift else []
+    if recounted:
+        logger.warning('Recounted %d balance snapshots that missed late-committed ledger entries', len(recounted))
+        drift = _drift(User.objects.filter(pk__in=[row.user_id for row in drift]))
+    return drift
+
+
+def compact_ledger(before, batch_size=COMPACT_BATCH):
+    """Move entries created before ``before`` and counted by a snapshot into the archive; return how many moved."""
+    covered = CoinLedgerEntry.objects.filter(
+        created_at__lt=before, id__lte=F('user__balance_snapshot__last_entry_id')
+    )
+    return move_rows(covered, CoinLedgerArchive, ENTRY_FIELDS, batch_size)
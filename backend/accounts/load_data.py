@@ -0,0 +1,349 @@
+"""
+Synthetic load-data generator for benchmarks and index work.
+
+Rows are generated deterministically from a seed and written in chunks:
+with COPY FROM STDIN on PostgreSQL and batched INSERTs elsewhere. Primary
+keys are assigned up front, so no row has to be read back.
+
+The data is skewed like production. A few hot games take most of the
+bookings (Zipf-distributed) and a small pool of whale users books far
+more often than everyone else. Coin balances are consistent: every user's
+coin_balance equals the sum of their ledger entries, which are the
+subscription purchases minus bookings plus refunds. Each game's
+booked_slots equals its confirmed and completed bookings.
+"""
+import csv
+import io
+import json
+import math
+import random
+from array import array
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import connection, models, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from games.models import Booking, Game
+from games.venues import assign_venues
+from payments.models import Transaction
+from subscriptions.models import SubscriptionTier
+from .models import CoinLedgerEntry, User
+
+LOCATIONS = [
+    'Lagos Sports Complex, Victoria Island',
+    'National Stadium, Surulere',
+    'Ikoyi Football Academy',
+    'Eko Hotel Sports Center',
+    'Lekki Sports Complex',
+    'Ajah Community Center',
+    'Yaba Sports Complex',
+    'Ikeja Football Ground',
+]
+GAME_NAMES = [
+    'Weekend Warriors', 'Elite League Match', 'Youth Development', 'Corporate League',
+    "Women's Football Night", 'Golden Age Football', 'Night League Championship', "Beginner's Paradise",
+]
+COIN_PRICES = [200, 250, 300, 400, 500, 600, 800, 1000]
+SLOT_SIZES = [16, 18, 20, 22, 24]
+
+
+class LoadDataGenerator:
+    """Generate users, games, bookings, transactions and ledger entries."""
+
+    def __init__(self, users, games, bookings, seed=42, chunk_size=10000, log=None):
+        if bookings > users * games:
+            raise ValueError('Cannot place more bookings than (users x games) distinct pairs.')
+        self.n_users = users
+        self.n_games = games
+        self.n_bookings = bookings
+        self.seed = seed
+        self.chunk_size = chunk_size
+        self.log = log or (lambda message: None)
+        self.now = timezone.now().replace(microsecond=0)
+        self.whales = max(1, users // 100)
+
+    def run(self):
+        """Write all rows and return a dict of row counts."""
+        self.user_start = self._next_id(User)
+        self.game_start = self._next_id(Game)
+        self.booking_start = self._next_id(Booking)
+        self.transaction_start = self._next_id(Transaction)
+        self.ledger_start = self._next_id(CoinLedgerEntry)
+        self.tiers = list(
+            SubscriptionTier.objects.filter(is_active=True).order_by('price').values_list('name', 'price', 'coins_awarded')
+        )
+        if not self.tiers:
+            raise ValueError('Create subscription tiers before generating load data.')
+
+        self._plan_games()
+        spend = self._plan_spend()
+
+        counts = {'users': 0, 'games': 0, 'bookings': 0, 'transactions': 0, 'ledger': 0}
+        counts['users'] = self._insert(User, self._user_rows(spend))
+        counts['games'] = self._insert(Game, self._game_rows())
+        assign_venues()
+
+        self._ledger_id = self.ledger_start
+        counts['transactions'] = self._insert(Transaction, self._transaction_rows(spend))
+        counts['bookings'] = self._insert(Booking, self._booking_rows())
+        counts['ledger'] = self._insert(CoinLedgerEntry, self._ledger_rows(spend))
+
+        self._reset_sequences()
+        return counts
+
+    # Planning
+
+    def _plan_games(self):
+        """Decide each game's price, size, date and booking count."""
+        rng = random.Random(self.seed)
+        weights = [1.0 / (rank ** 1.1) for rank in range(1, self.n_games + 1)]
+        rng.shuffle(weights)
+        total_weight = sum(weights)
+
+        counts = [min(int(self.n_bookings * w / total_weight), self.n_users) for w in weights]
+        remainder = self.n_bookings - sum(counts)
+        index = 0
+        while remainder > 0:
+            if counts[index] < self.n_users:
+                counts[index] += 1
+                remainder -= 1
+            index = (index + 1) % self.n_games
+
+        self.game_bookings = counts
+        self.game_prices = array('l', (rng.choice(COIN_PRICES) for _ in range(self.n_games)))
+        self.game_dates = [
+            self.now + timedelta(minutes=rng.randint(-30 * 24 * 60, 90 * 24 * 60)) for _ in range(self.n_games)
+        ]
+
+    def _iter_bookings(self):
+        """Yield (game_index, user_index, status) for every booking, deterministically."""
+        rng = random.Random(self.seed + 1)
+        for game_index, count in enumerate(self.game_bookings):
+            if count * 2 > self.n_users:
+                players = rng.sample(range(self.n_users), count)
+            else:
+                chosen = set()
+                while len(chosen) < count:
+                    if rng.random() < 0.3:
+                        chosen.add(rng.randrange(self.whales))
+                    else:
+                        chosen.add(rng.randrange(self.n_users))
+                players = sorted(chosen)
+            past = self.game_dates[game_index] < self.now
+            for user_index in players:
+                if rng.random() < 0.05:
+                    status = 'cancelled'
+                else:
+                    status = 'completed' if past else 'confirmed'
+                yield game_index, user_index, status
+
+    def _plan_spend(self):
+        """Total coins each user spends on bookings that were not refunded."""
+        spend = array('q', bytes(8 * self.n_users))
+        booked = array('l', bytes(array('l').itemsize * self.n_games))
+        for game_index, user_index, status in self._iter_bookings():
+            if status != 'cancelled':
+                spend[user_index] += self.game_prices[game_index]
+                booked[game_index] += 1
+        self.game_booked = booked
+        return spend
+
+    def _purchases(self, user_index, spend, rng):
+        """Return (tier, count, balance) covering a user's spend plus some leftover."""
+        whale = user_index < self.whales
+        name, price, coins = self.tiers[-1] if whale else rng.choice(self.tiers)
+        leftover = rng.randint(0, coins * (5 if whale else 1))
+        count = max(1, math.ceil((spend + leftover) / coins))
+        return (name, price, coins), count, count * coins - spend
+
+    # Row generators
+
+    def _user_rows(self, spend):
+        rng = random.Random(self.seed + 2)
+        password = make_password('testpass123')
+        for index in range(self.n_users):
+            (tier, _, _), _, balance = self._purchases(index, spend[index], rng)
+            pk = self.user_start + index
+            yield {
+                'id': pk,
+                'username': f'loaduser{pk}',
+                'email': f'loaduser{pk}@example.com',
+                'password': password,
+                'first_name': 'Load',
+                'last_name': f'User {pk}',
+                'date_joined': self.now - timedelta(minutes=rng.randint(0, 365 * 24 * 60)),
+                'coin_balance': balance,
+                'subscription_tier': tier,
+            }
+
+    def _game_rows(self):
+        rng = random.Random(self.seed + 3)
+        creator = User.objects.filter(is_superuser=True).values_list('pk', flat=True).first() or self.user_start
+        for index in range(self.n_games):
+            date_time = self.game_dates[index]
+            yield {
+                'id': self.game_start + index,
+                'name': f'{rng.choice(GAME_NAMES)} #{index + 1}',
+                'location': rng.choice(LOCATIONS),
+                'date_time': date_time,
+                'coin_price': self.game_prices[index],
+                'total_slots': max(self.game_bookings[index], rng.choice(SLOT_SIZES)),
+                'booked_slots': self.game_booked[index],
+                'status': 'completed' if date_time < self.now else 'upcoming',
+                'created_by_id': creator,
+                'created_at': date_time - timedelta(days=30),
+                'updated_at': date_time - timedelta(days=30),
+            }
+
+    def _transaction_rows(self, spend):
+        rng = random.Random(self.seed + 2)
+        transaction_id = self.transaction_start
+        for index in range(self.n_users):
+            (tier, price, coins), count, _ = self._purchases(index, spend[index], rng)
+            # Keep the user stream aligned with _user_rows
+            rng.randint(0, 365 * 24 * 60)
+            user_id = self.user_start + index
+            for purchase in range(count):
+                created_at = self.now - timedelta(days=400 - purchase % 400)
+                yield {
+                    'id': transaction_id,
+                    'user_id': user_id,
+                    'transaction_type': 'subscription',
+                    'amount': Decimal(price),
+                    'coins_amount': coins,
+                    'reference_id': f'PS_LOAD_{transaction_id}',
+                    'status': 'success',
+                    'description': f'Subscription purchase: {tier.title()}',
+                    'created_at': created_at,
+                    'updated_at': created_at,
+                }
+                transaction_id += 1
+
+    def _booking_rows(self):
+        rng = random.Random(self.seed + 4)
+        for offset, (game_index, user_index, status) in enumerate(self._iter_bookings()):
+            pk = self.booking_start + offset
+            created_at = min(self.now, self.game_dates[game_index]) - timedelta(minutes=rng.randint(1, 14 * 24 * 60))
+            yield {
+                'id': pk,
+                'user_id': self.user_start + user_index,
+                'game_id': self.game_start + game_index,
+                'status': status,
+                'slots': 1,
+                'coins_paid': self.game_prices[game_index],
+                'booking_reference': f'BK-L{pk:09X}',
+                'created_at': created_at,
+                'updated_at': created_at,
+            }
+
+    def _ledger_rows(self, spend):
+        """Ledger entries mirroring the purchases and bookings written above."""
+        ledger_id = self.ledger_start
+
+        rng = random.Random(self.seed + 2)
+        transaction_id = self.transaction_start
+        for index in range(self.n_users):
+            (_, _, coins), count, _ = self._purchases(index, spend[index], rng)
+            rng.randint(0, 365 * 24 * 60)
+            for _ in range(count):
+                yield self._ledger_row(ledger_id, index, coins, 'purchase', f'PS_LOAD_{transaction_id}')
+                ledger_id += 1
+                transaction_id += 1
+
+        for offset, (game_index, user_index, status) in enumerate(self._iter_bookings()):
+            reference = f'BK-L{self.booking_start + offset:09X}'
+            price = self.game_prices[game_index]
+            yield self._ledger_row(ledger_id, user_index, -price, 'booking', reference)
+            ledger_id += 1
+            if status == 'cancelled':
+                yield self._ledger_row(ledger_id, user_index, price, 'refund', reference)
+                ledger_id += 1
+
+    def _ledger_row(self, pk, user_index, amount, reason, reference):
+        return {
+            'id': pk,
+            'user_id': self.user_start + user_index,
+            'amount': amount,
+            'reason': reason,
+            'reference': reference,
+            'created_at': self.now,
+        }
+
+    # Writing
+
+    def _next_id(self, model):
+        return (model.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+
+    def _insert(self, model, rows):
+        """Write dict rows in chunks, filling unspecified columns with field defaults."""
+        fields = [field for field in model._meta.concrete_fields]
+        defaults = {}
+        for field in fields:
+            if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+                defaults[field.attname] = self.now
+            elif field.has_default():
+                defaults[field.attname] = field.get_default()
+            elif field.null:
+                defaults[field.attname] = None
+            else:
+                defaults[field.attname] = ''
+        converters = [self._converter(field) for field in fields]
+        attnames = [field.attname for field in fields]
+        columns = [field.column for field in fields]
+
+        written = 0
+        chunk = []
+        for row in rows:
+            chunk.append([
+                convert(row.get(attname, defaults[attname]))
+                for attname, convert in zip(attnames, converters)
+            ])
+            if len(chunk) >= self.chunk_size:
+                written += self._write_chunk(model._meta.db_table, columns, chunk)
+                chunk = []
+        if chunk:
+            written += self._write_chunk(model._meta.db_table, columns, chunk)
+        self.log(f'{model._meta.verbose_name_plural}: {written} rows')
+        return written
+
+    def _converter(self, field):
+        if isinstance(field, models.JSONField):
+            return lambda value: json.dumps(value)
+        if isinstance(field, models.DateTimeField):
+            return lambda value: value if value is None else connection.ops.adapt_datetimefield_value(value)
+        if isinstance(field, models.DecimalField):
+            return lambda value: value if value is None else str(value)
+        return lambda value: value
+
+    def _write_chunk(self, table, columns, rows):
+        quote = connection.ops.quote_name
+        column_sql = ', '.join(quote(column) for column in columns)
+        with transaction.atomic(), connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                for row in rows:
+                    writer.writerow(['\\N' if value is None else value for value in row])
+                buffer.seek(0)
+                cursor.copy_expert(
+                    f"COPY {quote(table)} ({column_sql}) FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+                    buffer
+                )
+            else:
+                placeholders = ', '.join(['%s'] * len(columns))
+                cursor.executemany(f"INSERT INTO {quote(table)} ({column_sql}) VALUES ({placeholders})", rows)
+        return len(rows)
+
+    def _reset_sequences(self):
+        """Move PostgreSQL sequences past the explicitly assigned keys."""
+        statements = connection.ops.sequence_reset_sql(
+            no_style(), [User, Game, Booking, Transaction, CoinLedgerEntry]
+        )
+        if statements:
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
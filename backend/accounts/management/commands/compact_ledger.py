@@ -0,0 +1,19 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from accounts.ledger import compact_ledger
+
+
+class Command(BaseCommand):
+    help = 'Move old coin ledger entries already counted by a balance snapshot into the archive'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=90, help='Keep entries from the last N days in the live ledger')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Entries moved per transaction')
+
+    def handle(self, *args, **options):
+        today = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+        moved = compact_ledger(today - timedelta(days=options['days']), batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Archived {moved} ledger entries'))
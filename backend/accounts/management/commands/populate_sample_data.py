@@ -1,10 +1,11 @@
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from datetime import timedelta
 from subscriptions.models import SubscriptionTier
 from games.models import Game
-from accounts.models import User
+from accounts.load_data import LoadDataGenerator
+from accounts.models import CoinLedgerEntry, User
 
 User = get_user_model()
 
@@ -12,11 +13,22 @@ User = get_user_model()
 class Command(BaseCommand):
     help = 'Populate sample data for Galactiturf platform'
 
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=0, help='Generate this many load-test users')
+        parser.add_argument('--games', type=int, default=0, help='Generate this many load-test games')
+        parser.add_argument('--bookings', type=int, default=0, help='Generate this many load-test bookings')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed; the same seed gives the same data')
+        parser.add_argument('--chunk-size', type=int, default=10000, help='Rows written per INSERT/COPY batch')
+
     def handle(self, *args, **options):
         self.stdout.write('Creating sample data...')
 
         # Create subscription tiers
         self.create_subscription_tiers()
+
+        if options['users'] or options['games'] or options['bookings']:
+            self.create_load_data(options)
+            return
         
         # Create sample games
         self.create_sample_games()
@@ -64,6 +76,26 @@ class Command(BaseCommand):
             else:
                 self.stdout.write(f'Subscription tier already exists: {tier.name}')
 
+    def create_load_data(self, options):
+        """Bulk-generate skewed, balance-consistent data for load testing."""
+        if options['users'] < 1 or options['games'] < 1:
+            raise CommandError('--users and --games must both be at least 1.')
+        try:
+            generator = LoadDataGenerator(
+                users=options['users'],
+                games=options['games'],
+                bookings=options['bookings'],
+                seed=options['seed'],
+                chunk_size=options['chunk_size'],
+                log=self.stdout.write,
+            )
+            counts = generator.run()
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        summary = ', '.join(f'{count} {name}' for name, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(f'Generated load data: {summary}'))
+
     def create_sample_games(self):
         """Create sample football games."""
         admin_user = User.objects.filter(is_superuser=True).first()
@@ -197,6 +229,9 @@ class Command(BaseCommand):
             if created:
                 user.set_password('testpass123')
                 user.save()
+                CoinLedgerEntry.objects.create(
+                    user=user, amount=user.coin_balance, reason='adjustment', reference='Opening balance'
+                )
                 self.stdout.write(f'Created user: {user.username}')
             else:
                 self.stdout.write(f'User already exists: {user.username}')
\ No newline at end of file
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from accounts.ledger import take_snapshots
+
+
+class Command(BaseCommand):
+    help = 'Snapshot coin balances from ledger entries written since the last run (safe to run hourly)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lag', type=int, default=None, help='Seconds of newest entries to leave for the next run')
+
+    def handle(self, *args, **options):
+        users = take_snapshots(lag=options['lag'])
+        self.stdout.write(self.style.SUCCESS(f'Updated {users} balance snapshots'))
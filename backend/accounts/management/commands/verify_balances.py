@@ -0,0 +1,26 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.ledger import verify_balances
+
+
+class Command(BaseCommand):
+    help = 'Check every coin balance against its snapshot and newer ledger entries'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count() or 1,
+            help='Processes checking user shards in parallel (1 checks in this process)',
+        )
+
+    def handle(self, *args, **options):
+        drift = verify_balances(workers=options['workers'])
+        for row in drift:
+            self.stdout.write(
+                f'{row.username} (#{row.user_id}): balance {row.stored}, ledger {row.expected} '
+                f'({row.stored - row.expected:+d})'
+            )
+        if drift:
+            raise CommandError(f'{len(drift)} balances do not match the ledger')
+        self.stdout.write(self.style.SUCCESS('Every balance matches the ledger'))
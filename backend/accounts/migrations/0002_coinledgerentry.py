@@ -0,0 +1,30 @@
+# Generated by Django 4.2.7 on 2026-10-18 22:54
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CoinLedgerEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.IntegerField(help_text='Coins credited (positive) or debited (negative)')),
+                ('reason', models.CharField(choices=[('purchase', 'Subscription Purchase'), ('booking', 'Game Booking'), ('refund', 'Booking Refund'), ('adjustment', 'Adjustment')], max_length=20)),
+                ('reference', models.CharField(blank=True, help_text='Booking or payment reference', max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='coin_ledger', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'coin ledger entries',
+                'indexes': [models.Index(fields=['user', 'id'], name='accounts_ledger_user_idx'), models.Index(fields=['created_at'], name='accounts_ledger_created_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.7 on 2026-10-18 22:55
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_coinledgerentry'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='coinledgerentry',
+            index=models.Index(django.db.models.functions.text.Upper('reference'), name='accounts_ledger_ref_upper'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(django.db.models.functions.text.Upper('username'), name='accounts_user_username_upper'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(django.db.models.functions.text.Upper('email'), name='accounts_user_email_upper'),
+        ),
+    ]
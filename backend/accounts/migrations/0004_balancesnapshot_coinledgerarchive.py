@@ -0,0 +1,40 @@
+# Generated by Django 4.2.7 on 2026-10-19 00:17
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_admin_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BalanceSnapshot',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='balance_snapshot', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('balance', models.IntegerField(help_text="Sum of the user's ledger entries up to last_entry_id")),
+                ('last_entry_id', models.BigIntegerField(db_index=True, help_text='Last ledger entry included in the balance')),
+                ('taken_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='CoinLedgerArchive',
+            fields=[
+                ('id', models.BigIntegerField(help_text='ID the entry had in the live ledger', primary_key=True, serialize=False)),
+                ('amount', models.IntegerField()),
+                ('reason', models.CharField(choices=[('purchase', 'Subscription Purchase'), ('booking', 'Game Booking'), ('refund', 'Booking Refund'), ('adjustment', 'Adjustment')], max_length=20)),
+                ('reference', models.CharField(blank=True, max_length=100)),
+                ('created_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_coin_ledger', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'archived coin ledger entries',
+                'indexes': [models.Index(fields=['user', 'id'], name='accounts_archive_user_idx'), models.Index(fields=['created_at'], name='accounts_archive_created_idx')],
+            },
+        ),
+    ]
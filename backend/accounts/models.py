@@ -1,5 +1,7 @@
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.db import connection, models, transaction
+from django.db.models import Case, F, When
+from django.db.models.functions import Upper
 
 
 class User(AbstractUser):
@@ -23,22 +25,126 @@ class User(AbstractUser):
     date_of_birth = models.DateField(blank=True, null=True)
     profile_picture = models.ImageField(upload_to='profile_pictures/', blank=True, null=True)
     
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Back the admin's case-insensitive exact searches
+            models.Index(Upper('username'), name='accounts_user_username_upper'),
+            models.Index(Upper('email'), name='accounts_user_email_upper'),
+        ]
+    
     def __str__(self):
         return self.username
     
-    def add_coins(self, amount):
+    def add_coins(self, amount, reason='adjustment', reference=''):
         """Add coins to user's balance."""
-        self.coin_balance += amount
-        self.save()
+        with transaction.atomic():
+            User.objects.filter(pk=self.pk).update(coin_balance=F('coin_balance') + amount)
+            CoinLedgerEntry.objects.create(user=self, amount=amount, reason=reason, reference=reference)
+        self.refresh_from_db(fields=['coin_balance'])
     
-    def deduct_coins(self, amount):
+    def deduct_coins(self, amount, reason='adjustment', reference=''):
         """Deduct coins from user's balance."""
-        if self.coin_balance >= amount:
-            self.coin_balance -= amount
-            self.save()
-            return True
-        return False
+        with transaction.atomic():
+            deducted = User.objects.filter(pk=self.pk, coin_balance__gte=amount).update(
+                coin_balance=F('coin_balance') - amount
+            )
+            if deducted:
+                CoinLedgerEntry.objects.create(user=self, amount=-amount, reason=reason, reference=reference)
+        self.refresh_from_db(fields=['coin_balance'])
+        return bool(deducted)
     
     def has_sufficient_coins(self, amount):
         """Check if user has sufficient coins for a transaction."""
         return self.coin_balance >= amount
+    
+    @classmethod
+    def bulk_add_coins(cls, credits, batch_size=500):
+        """
+        Add coins to many users at once from a {user_id: amount} mapping.
+        
+        Each batch is a single UPDATE ... FROM (VALUES ...) statement. Callers
+        are responsible for writing the matching ledger entries.
+        """
+        items = [(user_id, amount) for user_id, amount in credits.items() if amount]
+        table = connection.ops.quote_name(cls._meta.db_table)
+        
+        for start in range(0, len(items), batch_size):
+            batch = items[start:start + batch_size]
+            if connection.vendor in ('postgresql', 'sqlite'):
+                values = ', '.join(['(%s, %s)'] * len(batch))
+                params = [value for item in batch for value in item]
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        f"WITH credits (user_id, amount) AS (VALUES {values}) "
+                        f"UPDATE {table} SET coin_balance = {table}.coin_balance + credits.amount "
+                        f"FROM credits WHERE {table}.id = credits.user_id",
+                        params
+                    )
+            else:
+                cls.objects.filter(pk__in=[user_id for user_id, _ in batch]).update(
+                    coin_balance=F('coin_balance') + Case(
+                        *[When(pk=user_id, then=amount) for user_id, amount in batch]
+                    )
+                )
+
+
+class CoinLedgerEntry(models.Model):
+    """Model to record every change to a user's coin balance."""
+    
+    REASON_CHOICES = [
+        ('purchase', 'Subscription Purchase'),
+        ('booking', 'Game Booking'),
+        ('refund', 'Booking Refund'),
+        ('adjustment', 'Adjustment'),
+    ]
+    
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='coin_ledger')
+    amount = models.IntegerField(help_text="Coins credited (positive) or debited (negative)")
+    reason = models.CharField(max_length=20, choices=REASON_CHOICES)
+    reference = models.CharField(max_length=100, blank=True, help_text="Booking or payment reference")
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name_plural = 'coin ledger entries'
+        indexes = [
+            models.Index(fields=['user', 'id'], name='accounts_ledger_user_idx'),
+            models.Index(fields=['created_at'], name='accounts_ledger_created_idx'),
+            models.Index(Upper('reference'), name='accounts_ledger_ref_upper'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.reason} - {self.amount}"
+
+
+class BalanceSnapshot(models.Model):
+    """Model to record a user's coin balance as of a ledger entry."""
+    
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='balance_snapshot')
+    balance = models.IntegerField(help_text="Sum of the user's ledger entries up to last_entry_id")
+    last_entry_id = models.BigIntegerField(db_index=True, help_text="Last ledger entry included in the balance")
+    taken_at = models.DateTimeField()
+    
+    def __str__(self):
+        return f"{self.user_id} - {self.balance} @ {self.last_entry_id}"
+
+
+class CoinLedgerArchive(models.Model):
+    """Model to keep ledger entries compacted out of CoinLedgerEntry."""
+    
+    id = models.BigIntegerField(primary_key=True, help_text="ID the entry had in the live ledger")
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_coin_ledger')
+    amount = models.IntegerField()
+    reason = models.CharField(max_length=20, choices=CoinLedgerEntry.REASON_CHOICES)
+    reference = models.CharField(max_length=100, blank=True)
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name_plural = 'archived coin ledger entries'
+        indexes = [
+            models.Index(fields=['user', 'id'], name='accounts_archive_user_idx'),
+            models.Index(fields=['created_at'], name='accounts_archive_created_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.reason} - {self.amount}"
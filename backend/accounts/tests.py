@@ -1,3 +1,201 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.db.models import Count, Q, Sum
 from django.test import TestCase
+from django.utils import timezone
+
+from galactiturf.testing import AdminQueryCountMixin
+from games.models import Booking, Game
+from payments.models import Transaction
+from reports.models import DailyCoinFlow
+from reports.rollups import refresh_rollups
+from .ledger import Drift, compact_ledger, take_snapshots, verify_balances
+from .models import BalanceSnapshot, CoinLedgerArchive, CoinLedgerEntry, User
+
+
+class CoinLedgerTests(TestCase):
+    """Tests for coin balance changes and the ledger."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='player', password='testpass123', coin_balance=100)
+
+    def test_add_and_deduct_write_ledger_entries(self):
+        self.user.add_coins(50, reason='purchase', reference='PS_1')
+        self.assertTrue(self.user.deduct_coins(120, reason='booking', reference='BK-1'))
+        self.assertFalse(self.user.deduct_coins(1000))
+
+        self.assertEqual(self.user.coin_balance, 30)
+        self.assertEqual(
+            list(CoinLedgerEntry.objects.order_by('id').values_list('amount', 'reason')),
+            [(50, 'purchase'), (-120, 'booking')]
+        )
+
+    def test_bulk_add_coins_credits_each_user_once(self):
+        other = User.objects.create_user(username='other', password='testpass123', coin_balance=0)
+
+        with self.assertNumQueries(1):
+            User.bulk_add_coins({self.user.pk: 25, other.pk: 40})
+
+        self.user.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual(self.user.coin_balance, 125)
+        self.assertEqual(other.coin_balance, 40)
+
+
+class BalanceSnapshotTests(TestCase):
+    """Tests for balance snapshots, drift checks and ledger compaction."""
+
+    def setUp(self):
+        self.users = [User.objects.create_user(username=f'saver{i}', password='testpass123') for i in range(3)]
+        for i, user in enumerate(self.users):
+            user.add_coins(100 * (i + 1), reason='purchase', reference=f'PS_{i}')
+            user.deduct_coins(30, reason='booking', reference=f'BK-{i}')
+
+    def test_snapshots_add_only_new_entries(self):
+        self.assertEqual(take_snapshots(lag=0), 3)
+        self.users[0].add_coins(5)
+
+        with self.assertNumQueries(10):
+            self.assertEqual(take_snapshots(lag=0), 1)
+
+        self.assertEqual(
+            dict(BalanceSnapshot.objects.values_list('user_id', 'balance')),
+            {self.users[0].pk: 75, self.users[1].pk: 170, self.users[2].pk: 270},
+        )
+        self.assertEqual(take_snapshots(lag=0), 0)
+
+    def test_snapshots_leave_recent_entries_for_the_next_run(self):
+        take_snapshots(lag=0)
+        self.users[1].add_coins(5)
+
+        self.assertEqual(take_snapshots(now=timezone.now() - timedelta(seconds=60), lag=30), 0)
+        self.assertEqual(BalanceSnapshot.objects.get(user=self.users[1]).balance, 170)
+
+    def test_verify_reports_drift_from_snapshot_and_newer_entries(self):
+        take_snapshots(lag=0)
+        self.users[2].add_coins(10)
+        self.assertEqual(verify_balances(), [])
+
+        User.objects.filter(pk=self.users[2].pk).update(coin_balance=500)
+        User.objects.filter(pk=self.users[0].pk).update(coin_balance=0)
+        self.assertEqual(verify_balances(batch_size=1), [
+            Drift(self.users[0].pk, 'saver0', 0, 70),
+            Drift(self.users[2].pk, 'saver2', 500, 280),
+        ])
+
+        with self.assertRaisesMessage(CommandError, '2 balances do not match the ledger'):
+            call_command('verify_balances', workers=1, stdout=StringIO())
+
+    def test_verify_recounts_snapshots_missing_late_commits(self):
+        # An entry whose transaction is still open when the snapshot run passes its id
+        self.users[1].add_coins(40, reason='purchase', reference='PS_LATE')
+        late_id = CoinLedgerEntry.objects.get(reference='PS_LATE').pk
+        CoinLedgerEntry.objects.filter(pk=late_id).delete()
+        self.users[2].add_coins(10)
+        take_snapshots(lag=0)
+        self.assertGreater(BalanceSnapshot.objects.get(user=self.users[1]).last_entry_id, late_id)
+
+        # ...commits afterwards, below the watermark
+        CoinLedgerEntry.objects.create(id=late_id, user=self.users[1], amount=40, reason='purchase', reference='PS_LATE')
+        User.objects.filter(pk=self.users[0].pk).update(coin_balance=0)
+
+        self.assertEqual(verify_balances(), [Drift(self.users[0].pk, 'saver0', 0, 70)])
+        self.assertEqual(BalanceSnapshot.objects.get(user=self.users[1]).balance, 210)
+        self.assertEqual(BalanceSnapshot.objects.get(user=self.users[0]).balance, 70)
+
+    def test_verify_shards_across_worker_processes(self):
+        take_snapshots(lag=0)
+        User.objects.filter(pk=self.users[1].pk).update(coin_balance=1)
+
+        self.assertEqual(verify_balances(workers=2), [Drift(self.users[1].pk, 'saver1', 1, 170)])
+
+    def test_compaction_archives_only_snapshotted_entries(self):
+        take_snapshots(lag=0)
+        self.users[0].add_coins(5)
+        refresh_rollups()
+        coin_flow = list(DailyCoinFlow.objects.order_by('reason').values_list('reason', 'entries', 'credited', 'debited'))
+
+        self.assertEqual(compact_ledger(timezone.now() + timedelta(seconds=1), batch_size=4), 6)
+
+        self.assertEqual(list(CoinLedgerEntry.objects.values_list('amount', flat=True)), [5])
+        self.assertEqual(CoinLedgerArchive.objects.count(), 6)
+        self.assertEqual(verify_balances(), [])
+        refresh_rollups(rebuild=True)
+        self.assertEqual(
+            list(DailyCoinFlow.objects.order_by('reason').values_list('reason', 'entries', 'credited', 'debited')),
+            coin_flow,
+        )
+
+
+class LoadDataGeneratorTests(TestCase):
+    """Tests for the bulk load-data mode of populate_sample_data."""
+
+    def generate(self, seed=7):
+        call_command(
+            'populate_sample_data', users=40, games=6, bookings=90, seed=seed, chunk_size=25, stdout=StringIO()
+        )
+
+    def snapshot(self):
+        return (
+            list(User.objects.order_by('id').values_list('username', 'coin_balance', 'subscription_tier')),
+            list(Booking.objects.order_by('id').values_list('user_id', 'game_id', 'status', 'coins_paid')),
+        )
+
+    def test_generates_requested_rows_with_consistent_balances(self):
+        self.generate()
+
+        self.assertEqual(User.objects.count(), 40)
+        self.assertEqual(Game.objects.count(), 6)
+        self.assertEqual(Booking.objects.count(), 90)
+        self.assertTrue(Transaction.objects.filter(status='success').exists())
+
+        ledger = dict(CoinLedgerEntry.objects.values('user_id').annotate(total=Sum('amount')).values_list('user_id', 'total'))
+        for user_id, balance in User.objects.values_list('id', 'coin_balance'):
+            self.assertEqual(ledger.get(user_id, 0), balance)
+            self.assertGreaterEqual(balance, 0)
+
+        games = Game.objects.annotate(
+            held=Count('bookings', filter=Q(bookings__status__in=['confirmed', 'completed']))
+        )
+        for game in games:
+            self.assertEqual(game.booked_slots, game.held)
+            self.assertLessEqual(game.booked_slots, game.total_slots)
+
+    def test_same_seed_produces_same_data(self):
+        self.generate(seed=3)
+        first = self.snapshot()
+
+        Booking.objects.all().delete()
+        CoinLedgerEntry.objects.all().delete()
+        Transaction.objects.all().delete()
+        Game.objects.all().delete()
+        User.objects.all().delete()
+
+        self.generate(seed=3)
+        second = self.snapshot()
+        self.assertEqual([row[1:] for row in first[0]], [row[1:] for row in second[0]])
+        self.assertEqual([row[2:] for row in first[1]], [row[2:] for row in second[1]])
+
+
+class AccountsAdminQueryTests(AdminQueryCountMixin, TestCase):
+    """Query-count regression tests for the accounts admin changelists."""
+
+    def setUp(self):
+        self.login_admin()
+
+    def test_user_changelist(self):
+        def add_rows(count):
+            start = User.objects.count()
+            User.objects.bulk_create([User(username=f'user{start + i}') for i in range(count)])
+
+        self.assertChangelistQueriesConstant('/admin/accounts/user/', add_rows)
+
+    def test_ledger_changelist(self):
+        def add_rows(count):
+            for _ in range(count):
+                user = User.objects.create(username=f'ledger{User.objects.count()}')
+                user.add_coins(10)
 
-# Create your tests here.
+        self.assertChangelistQueriesConstant('/admin/accounts/coinledgerentry/', add_rows)
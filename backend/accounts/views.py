@@ -90,10 +90,12 @@ def user_dashboard(request):
     user = request.user
     
     # Get user's recent bookings
-    recent_bookings = user.bookings.filter(status='confirmed').order_by('-created_at')[:5]
+    recent_bookings = user.bookings.filter(status='confirmed').select_related('game').order_by('-created_at')[:5]
     
     # Get user's recent transactions
-    recent_transactions = user.transactions.filter(status='success').order_by('-created_at')[:5]
+    recent_transactions = user.transactions.filter(status='success').only(
+        'id', 'user_id', 'transaction_type', 'amount', 'coins_amount', 'status', 'created_at'
+    ).order_by('-created_at')[:5]
     
     return Response({
         'user': UserProfileSerializer(user).data,
@@ -0,0 +1,126 @@
+"""
+Minimal stand-in for the Paystack API, used by the load tests.
+
+It implements the two endpoints the backend calls,
+``POST /transaction/initialize`` and ``GET /transaction/verify/<reference>``.
+It can add an artificial upstream latency. The signed webhook bodies
+Paystack would send are built by payments.testing.
+
+Run it on its own with:
+
+    python -m benchmarks.fake_paystack --port 8765 --latency-ms 50
+
+and start the backend with ``PAYSTACK_API_URL=http://127.0.0.1:8765``.
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakePaystackHandler(BaseHTTPRequestHandler):
+    """Answer initialize and verify calls the way Paystack does."""
+
+    server_version = 'FakePaystack/1.0'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _authorized(self):
+        return self.headers.get('Authorization', '').startswith('Bearer ')
+
+    def do_POST(self):
+        time.sleep(self.server.latency)
+        if self.path.rstrip('/') != '/transaction/initialize':
+            return self._reply(404, {'status': False, 'message': 'Not found'})
+        if not self._authorized():
+            return self._reply(401, {'status': False, 'message': 'Invalid key'})
+
+        length = int(self.headers.get('Content-Length') or 0)
+        data = json.loads(self.rfile.read(length) or b'{}')
+        reference = data.get('reference')
+        with self.server.lock:
+            self.server.charges[reference] = data
+        self._reply(200, {
+            'status': True,
+            'message': 'Authorization URL created',
+            'data': {
+                'authorization_url': f'https://checkout.paystack.test/{reference}',
+                'access_code': f'AC_{reference}',
+                'reference': reference,
+            },
+        })
+
+    def do_GET(self):
+        time.sleep(self.server.latency)
+        prefix = '/transaction/verify/'
+        if not self.path.startswith(prefix):
+            return self._reply(404, {'status': False, 'message': 'Not found'})
+        if not self._authorized():
+            return self._reply(401, {'status': False, 'message': 'Invalid key'})
+
+        reference = self.path[len(prefix):].rstrip('/')
+        with self.server.lock:
+            charge = self.server.charges.get(reference)
+        if charge is None:
+            return self._reply(400, {'status': False, 'message': 'Transaction reference not found'})
+        self._reply(200, {
+            'status': True,
+            'message': 'Verification successful',
+            'data': {
+                'reference': reference,
+                'amount': charge.get('amount'),
+                'status': 'success',
+                'customer': {'email': charge.get('email')},
+            },
+        })
+
+
+class FakePaystackServer(ThreadingHTTPServer):
+    """Threaded fake Paystack server that remembers initialized charges."""
+
+    daemon_threads = True
+
+    def __init__(self, address=('127.0.0.1', 0), latency_ms=0):
+        super().__init__(address, FakePaystackHandler)
+        self.latency = latency_ms / 1000
+        self.charges = {}
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        """Serve from a background thread and return self."""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run a fake Paystack API for load tests.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=float, default=0, help='Artificial latency added to every call')
+    args = parser.parse_args()
+
+    server = FakePaystackServer((args.host, args.port), latency_ms=args.latency_ms)
+    print(f'Fake Paystack listening on {server.url}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,547 @@
+"""
+End-to-end load test for the booking and payment APIs.
+
+The run seeds its own users and games, then drives these phases at the
+configured concurrency:
+
+    login     POST /api/auth/login/
+    browse    GET  /api/games/
+    book      POST /api/games/bookings/create/ (skewed towards a few hot games)
+    cancel    POST /api/games/bookings/<id>/cancel/ (some sent twice at once)
+    payments  POST /api/payments/initialize/ (via the fake Paystack), then
+              signed POST /api/payments/webhook/ deliveries, some duplicated
+              and some racing GET /api/payments/verify/<reference>/
+
+For each phase it reports throughput, latency percentiles and error rates.
+Afterwards it checks invariants against the database: no game is oversold,
+booked_slots matches its bookings, every balance matches the coin ledger,
+and coins are conserved. Results are written as JSON to
+benchmarks/results/, and --compare flags regressions against an earlier run.
+
+Typical use, from the backend directory:
+
+    python -m benchmarks.load_test --spawn-server --users 200 --concurrency 32
+
+Without --spawn-server, start the backend yourself with the same database,
+PAYSTACK_SECRET_KEY, a PAYSTACK_API_URL that points at
+``python -m benchmarks.fake_paystack``, and empty THROTTLE_ANON_RATE and
+THROTTLE_USER_RATE so the rate limits don't reject the simulated users.
+Use PostgreSQL for meaningful numbers; SQLite serializes writers and will
+report lock errors under load.
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from urllib.parse import urlparse
+
+import requests
+
+from benchmarks.fake_paystack import FakePaystackServer
+from payments.testing import charge_event, sign
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / 'results'
+BENCH_PASSWORD = 'bench-pass-123'
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class PhaseStats:
+    """Latency and outcome samples for one phase."""
+
+    def __init__(self, name):
+        self.name = name
+        self.samples = []
+        self.started = None
+        self.finished = None
+
+    def record(self, seconds, outcome):
+        self.samples.append((seconds, outcome))
+
+    def summary(self):
+        latencies = sorted(seconds * 1000 for seconds, _ in self.samples)
+        outcomes = [outcome for _, outcome in self.samples]
+        total = len(outcomes)
+        duration = (self.finished or time.perf_counter()) - (self.started or 0)
+        errors = outcomes.count('error')
+        return {
+            'requests': total,
+            'ok': outcomes.count('ok'),
+            'rejected': outcomes.count('rejected'),
+            'errors': errors,
+            'error_rate': round(errors / total, 4) if total else 0.0,
+            'duration_s': round(duration, 3),
+            'throughput_rps': round(total / duration, 1) if duration > 0 else 0.0,
+            'latency_ms': {
+                'mean': round(sum(latencies) / total, 2) if total else 0.0,
+                'p50': round(percentile(latencies, 0.50), 2),
+                'p90': round(percentile(latencies, 0.90), 2),
+                'p95': round(percentile(latencies, 0.95), 2),
+                'p99': round(percentile(latencies, 0.99), 2),
+                'max': round(latencies[-1], 2) if latencies else 0.0,
+            },
+        }
+
+
+class LoadTest:
+    """Seed data, drive the API phase by phase and check invariants."""
+
+    def __init__(self, args):
+        self.args = args
+        self.base_url = args.base_url.rstrip('/')
+        self.run_id = uuid.uuid4().hex[:8]
+        self.rng = random.Random(args.seed)
+        self.local = threading.local()
+        self.phases = {}
+        self.tokens = {}
+        self.bookings = []
+        self.lock = threading.Lock()
+
+    # HTTP
+
+    def session(self):
+        if not hasattr(self.local, 'session'):
+            self.local.session = requests.Session()
+        return self.local.session
+
+    def call(self, stats, method, path, ok=(200,), rejected=(), token=None, **kwargs):
+        """Time one request and classify it as ok, rejected (expected 4xx) or error."""
+        headers = kwargs.pop('headers', {})
+        if token:
+            headers['Authorization'] = f'Bearer {token}'
+        start = time.perf_counter()
+        try:
+            response = self.session().request(
+                method, self.base_url + path, headers=headers, timeout=self.args.timeout, **kwargs
+            )
+        except requests.RequestException:
+            stats.record(time.perf_counter() - start, 'error')
+            return None
+        elapsed = time.perf_counter() - start
+        if response.status_code in ok:
+            stats.record(elapsed, 'ok')
+        elif response.status_code in rejected:
+            stats.record(elapsed, 'rejected')
+        else:
+            stats.record(elapsed, 'error')
+        return response
+
+    def run_phase(self, name, jobs):
+        """Run callables with the configured concurrency and record the phase."""
+        stats = PhaseStats(name)
+        self.phases[name] = stats
+        stats.started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.args.concurrency) as pool:
+            list(pool.map(lambda job: job(stats), jobs))
+        stats.finished = time.perf_counter()
+        summary = stats.summary()
+        print(
+            f"{name:>9}: {summary['requests']:>6} req  {summary['throughput_rps']:>8} req/s  "
+            f"p50 {summary['latency_ms']['p50']:>8} ms  p95 {summary['latency_ms']['p95']:>8} ms  "
+            f"p99 {summary['latency_ms']['p99']:>8} ms  errors {summary['error_rate']:.2%}"
+        )
+
+    # Seeding
+
+    def seed(self):
+        from django.contrib.auth.hashers import make_password
+        from django.utils import timezone
+
+        from accounts.models import CoinLedgerEntry, User
+        from games.models import Game
+
+        password = make_password(BENCH_PASSWORD)
+        User.objects.bulk_create([
+            User(
+                username=f'bench-{self.run_id}-{index}',
+                email=f'bench-{self.run_id}-{index}@example.com',
+                password=password,
+                coin_balance=self.args.initial_coins,
+            )
+            for index in range(self.args.users)
+        ], batch_size=500)
+        self.users = list(User.objects.filter(username__startswith=f'bench-{self.run_id}-').order_by('pk'))
+        CoinLedgerEntry.objects.bulk_create([
+            CoinLedgerEntry(user=user, amount=user.coin_balance, reason='adjustment', reference='Benchmark opening balance')
+            for user in self.users
+        ], batch_size=500)
+
+        kickoff = timezone.now() + timedelta(days=7)
+        Game.objects.bulk_create([
+            Game(
+                name=f'Bench {self.run_id} #{index}',
+                location='Benchmark Arena',
+                date_time=kickoff + timedelta(hours=index),
+                coin_price=self.rng.choice([200, 300, 500]),
+                total_slots=self.args.slots,
+                created_by=self.users[0],
+            )
+            for index in range(self.args.games)
+        ], batch_size=500)
+        self.game_ids = list(
+            Game.objects.filter(name__startswith=f'Bench {self.run_id} #').order_by('pk').values_list('pk', flat=True)
+        )
+        self.initial_total = self.args.initial_coins * len(self.users)
+        print(f'Seeded {len(self.users)} users and {len(self.game_ids)} games (run {self.run_id})')
+
+    def cleanup(self):
+        from accounts.models import User
+        from games.models import Game
+
+        Game.objects.filter(pk__in=self.game_ids).delete()
+        User.objects.filter(username__startswith=f'bench-{self.run_id}-').delete()
+
+    # Phases
+
+    def login_phase(self):
+        def login(user):
+            def job(stats):
+                response = self.call(
+                    stats, 'post', '/api/auth/login/',
+                    json={'username': user.username, 'password': BENCH_PASSWORD}
+                )
+                if response is not None and response.status_code == 200:
+                    self.tokens[user.pk] = response.json()['tokens']['access']
+            return job
+
+        self.run_phase('login', [login(user) for user in self.users])
+
+    def browse_phase(self):
+        users = [user for user in self.users if user.pk in self.tokens]
+
+        def browse(user):
+            return lambda stats: self.call(stats, 'get', '/api/games/', token=self.tokens[user.pk])
+
+        jobs = [browse(user) for user in users for _ in range(self.args.browse_per_user)]
+        self.run_phase('browse', jobs)
+
+    def pick_game(self):
+        """Skewed choice: most traffic goes to the first fifth of the games."""
+        hot = max(1, len(self.game_ids) // 5)
+        if self.rng.random() < 0.8:
+            return self.game_ids[self.rng.randrange(hot)]
+        return self.rng.choice(self.game_ids)
+
+    def book_phase(self):
+        def book(user, game_id):
+            def job(stats):
+                response = self.call(
+                    stats, 'post', '/api/games/bookings/create/', ok=(201,), rejected=(400,),
+                    token=self.tokens[user.pk], json={'game': game_id}
+                )
+                if response is not None and response.status_code == 201:
+                    with self.lock:
+                        self.bookings.append((user.pk, response.json()['booking']['id']))
+            return job
+
+        jobs = [
+            book(user, self.pick_game())
+            for user in self.users if user.pk in self.tokens
+            for _ in range(self.args.bookings_per_user)
+        ]
+        self.rng.shuffle(jobs)
+        self.run_phase('book', jobs)
+
+    def cancel_phase(self):
+        def cancel(user_id, booking_id):
+            return lambda stats: self.call(
+                stats, 'post', f'/api/games/bookings/{booking_id}/cancel/', rejected=(400,),
+                token=self.tokens[user_id]
+            )
+
+        chosen = [entry for entry in self.bookings if self.rng.random() < self.args.cancel_ratio]
+        jobs = []
+        for user_id, booking_id in chosen:
+            jobs.append(cancel(user_id, booking_id))
+            if self.rng.random() < self.args.duplicate_ratio:
+                jobs.append(cancel(user_id, booking_id))
+        self.rng.shuffle(jobs)
+        self.run_phase('cancel', jobs)
+
+    def payments_phase(self):
+        from subscriptions.models import SubscriptionTier
+
+        tiers = list(SubscriptionTier.objects.filter(is_active=True).values_list('price', 'coins_awarded'))
+        if not tiers:
+            print('  payments: skipped, no active subscription tiers (run populate_sample_data)')
+            return
+        secret = self.args.paystack_secret
+
+        charges = []
+
+        def initialize(user, reference, price, coins):
+            def job(stats):
+                response = self.call(
+                    stats, 'post', '/api/payments/initialize/', token=self.tokens[user.pk],
+                    json={
+                        'transaction_type': 'subscription',
+                        'amount': float(price),
+                        'coins_amount': coins,
+                        'email': user.email,
+                        'reference': reference,
+                    }
+                )
+                if response is not None and response.status_code == 200:
+                    with self.lock:
+                        charges.append((user, reference, int(price * 100)))
+            return job
+
+        jobs = []
+        for index, user in enumerate(user for user in self.users if user.pk in self.tokens):
+            price, coins = self.rng.choice(tiers)
+            jobs.append(initialize(user, f'BENCH-{self.run_id}-{index}', price, coins))
+        self.run_phase('initialize', jobs)
+
+        def deliver(user, reference, amount_kobo):
+            body = charge_event(reference, amount_kobo, user.email)
+            return lambda stats: self.call(
+                stats, 'post', '/api/payments/webhook/', data=body,
+                headers={'Content-Type': 'application/json', 'X-Paystack-Signature': sign(body, secret)}
+            )
+
+        def verify(user, reference):
+            return lambda stats: self.call(
+                stats, 'get', f'/api/payments/verify/{reference}/', token=self.tokens[user.pk]
+            )
+
+        jobs = []
+        for user, reference, amount_kobo in charges:
+            jobs.append(deliver(user, reference, amount_kobo))
+            if self.rng.random() < self.args.duplicate_ratio:
+                jobs.append(deliver(user, reference, amount_kobo))
+            if self.rng.random() < self.args.duplicate_ratio:
+                jobs.append(verify(user, reference))
+        self.rng.shuffle(jobs)
+        self.run_phase('webhook', jobs)
+
+    # Invariants
+
+    def check_invariants(self):
+        from django.db.models import Count, F, Q, Sum
+
+        from accounts.models import CoinLedgerEntry, User
+        from games.models import Booking, Game
+        from payments.models import Transaction
+        from subscriptions.models import SubscriptionTier
+
+        user_ids = [user.pk for user in self.users]
+        results = {}
+
+        oversold = list(
+            Game.objects.filter(pk__in=self.game_ids, booked_slots__gt=F('total_slots')).values_list('pk', flat=True)
+        )
+        results['no_oversold_games'] = {'passed': not oversold, 'games': oversold}
+
+        held = dict(
+            Booking.objects.filter(game_id__in=self.game_ids, status='confirmed')
+            .values('game_id').annotate(total=Sum('slots')).values_list('game_id', 'total')
+        )
+        drifted = [
+            pk for pk, booked in Game.objects.filter(pk__in=self.game_ids).values_list('pk', 'booked_slots')
+            if booked != held.get(pk, 0)
+        ]
+        results['booked_slots_match_bookings'] = {'passed': not drifted, 'games': drifted}
+
+        ledger = dict(
+            CoinLedgerEntry.objects.filter(user_id__in=user_ids)
+            .values('user_id').annotate(total=Sum('amount')).values_list('user_id', 'total')
+        )
+        balances = dict(User.objects.filter(pk__in=user_ids).values_list('pk', 'coin_balance'))
+        mismatched = [pk for pk, balance in balances.items() if balance != ledger.get(pk, 0)]
+        negative = [pk for pk, balance in balances.items() if balance < 0]
+        results['balances_match_ledger'] = {'passed': not mismatched, 'users': mismatched}
+        results['no_negative_balances'] = {'passed': not negative, 'users': negative}
+
+        coins_by_price = dict(SubscriptionTier.objects.values_list('price', 'coins_awarded'))
+        successful = list(
+            Transaction.objects.filter(user_id__in=user_ids, status='success').values_list('reference_id', 'amount')
+        )
+        credited = sum(coins_by_price.get(amount, 0) for _, amount in successful)
+        spent = Booking.objects.filter(user_id__in=user_ids, status='confirmed').aggregate(
+            total=Sum('coins_paid')
+        )['total'] or 0
+        expected = self.initial_total + credited - spent
+        actual = sum(balances.values())
+        results['coins_conserved'] = {
+            'passed': expected == actual, 'expected': expected, 'actual': actual,
+        }
+
+        double_credited = list(
+            CoinLedgerEntry.objects.filter(user_id__in=user_ids, reason='purchase')
+            .values('reference').annotate(times=Count('id')).filter(times__gt=1).values_list('reference', flat=True)
+        )
+        double_refunded = list(
+            CoinLedgerEntry.objects.filter(user_id__in=user_ids, reason='refund')
+            .values('reference').annotate(times=Count('id')).filter(times__gt=1).values_list('reference', flat=True)
+        )
+        results['credited_once'] = {'passed': not double_credited, 'references': double_credited}
+        results['refunded_once'] = {'passed': not double_refunded, 'references': double_refunded}
+
+        for name, result in results.items():
+            print(f"{'PASS' if result['passed'] else 'FAIL'}  {name}")
+        return results
+
+    # Orchestration
+
+    def run(self):
+        started_at = datetime.now().astimezone()
+        self.seed()
+        try:
+            self.login_phase()
+            self.browse_phase()
+            self.book_phase()
+            self.cancel_phase()
+            self.payments_phase()
+            invariants = self.check_invariants()
+        finally:
+            if not self.args.keep_data:
+                self.cleanup()
+
+        return {
+            'run_id': self.run_id,
+            'label': self.args.label,
+            'started_at': started_at.isoformat(),
+            'base_url': self.base_url,
+            'config': {
+                key: getattr(self.args, key) for key in (
+                    'users', 'games', 'slots', 'concurrency', 'browse_per_user', 'bookings_per_user',
+                    'cancel_ratio', 'duplicate_ratio', 'initial_coins', 'seed', 'paystack_latency_ms',
+                )
+            },
+            'phases': {name: stats.summary() for name, stats in self.phases.items()},
+            'invariants': invariants,
+            'passed': all(result['passed'] for result in invariants.values()),
+        }
+
+
+def compare(current, baseline_path, max_regression):
+    """Print per-phase deltas against an earlier result; return False on regression."""
+    baseline = json.loads(Path(baseline_path).read_text())
+    ok = True
+    print(f"\nCompared with {baseline_path} ({baseline.get('label') or baseline.get('run_id')}):")
+    for name, phase in current['phases'].items():
+        before = baseline.get('phases', {}).get(name)
+        if not before:
+            continue
+        p95_change = _change(before['latency_ms']['p95'], phase['latency_ms']['p95'])
+        rps_change = _change(before['throughput_rps'], phase['throughput_rps'])
+        regressed = p95_change > max_regression or -rps_change > max_regression
+        ok = ok and not regressed
+        print(
+            f"{name:>9}: p95 {p95_change:+7.1f}%  throughput {rps_change:+7.1f}%"
+            f"{'  REGRESSION' if regressed else ''}"
+        )
+    return ok
+
+
+def _change(before, after):
+    if not before:
+        return 0.0
+    return (after - before) / before * 100
+
+
+def spawn_server(base_url, paystack_url, secret):
+    """Start runserver against the fake Paystack and wait until it answers."""
+    address = urlparse(base_url)
+    # Every simulated user comes from this machine, so the per-IP and per-user rate limits are off
+    env = dict(
+        os.environ, PAYSTACK_API_URL=paystack_url, PAYSTACK_SECRET_KEY=secret,
+        THROTTLE_ANON_RATE='', THROTTLE_USER_RATE='',
+    )
+    process = subprocess.Popen(
+        [sys.executable, 'manage.py', 'runserver', f'{address.hostname}:{address.port or 80}', '--noreload'],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            if requests.get(f'{base_url}/ping/', timeout=1).status_code == 200:
+                return process
+        except requests.RequestException:
+            time.sleep(0.2)
+    process.terminate()
+    raise SystemExit('Backend did not start within 30 seconds.')
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Load test the booking and payment APIs.')
+    parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+    parser.add_argument('--spawn-server', action='store_true', help='Start runserver and a fake Paystack for the run')
+    parser.add_argument('--paystack-latency-ms', type=float, default=0, help='Latency of the spawned fake Paystack')
+    parser.add_argument('--paystack-secret', default=None, help='Webhook signing key (defaults to PAYSTACK_SECRET_KEY)')
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--games', type=int, default=20)
+    parser.add_argument('--slots', type=int, default=22, help='Slots per game; keep it low to force contention')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--browse-per-user', type=int, default=3)
+    parser.add_argument('--bookings-per-user', type=int, default=3)
+    parser.add_argument('--cancel-ratio', type=float, default=0.2)
+    parser.add_argument('--duplicate-ratio', type=float, default=0.2, help='Share of cancels and webhooks sent twice')
+    parser.add_argument('--initial-coins', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--timeout', type=float, default=30)
+    parser.add_argument('--label', default='', help='Name stored with the results')
+    parser.add_argument('--output', default=None, help='Result file (default: benchmarks/results/<time>-<run>.json)')
+    parser.add_argument('--compare', default=None, help='Earlier result file to compare against')
+    parser.add_argument('--max-regression', type=float, default=20.0, help='Allowed p95/throughput change in percent')
+    parser.add_argument('--keep-data', action='store_true', help='Leave the seeded rows in the database')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.spawn_server and not os.environ.get('PAYSTACK_SECRET_KEY'):
+        os.environ['PAYSTACK_SECRET_KEY'] = 'sk_test_benchmark'
+
+    sys.path.insert(0, str(BACKEND_DIR))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'galactiturf.settings')
+    import django
+    django.setup()
+    from django.conf import settings
+
+    args.paystack_secret = args.paystack_secret or settings.PAYSTACK_SECRET_KEY
+    if not args.paystack_secret:
+        raise SystemExit('Set PAYSTACK_SECRET_KEY (or --paystack-secret) so webhooks can be signed.')
+
+    server = paystack = None
+    if args.spawn_server:
+        paystack = FakePaystackServer(latency_ms=args.paystack_latency_ms).start()
+        server = spawn_server(args.base_url.rstrip('/'), paystack.url, args.paystack_secret)
+
+    try:
+        result = LoadTest(args).run()
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+        if paystack:
+            paystack.shutdown()
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}-{result['run_id']}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2, default=str))
+    print(f'\nResults written to {output}')
+
+    ok = result['passed']
+    if args.compare:
+        ok = compare(result, args.compare, args.max_regression) and ok
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,133 @@
+"""
+Rows/sec of the list serializers, before and after the values() fast path.
+
+For each page size it times fetching, serializing and rendering one page
+of games and of bookings two ways:
+
+    before  ModelSerializer over model instances + DRF JSONRenderer
+    after   ValuesSerializer over .values() rows + FastJSONRenderer
+
+It also checks that both produce identical bytes. The rows are seeded
+inside a transaction that is rolled back, so any database will do:
+
+    python -m benchmarks.serialization --sizes 10,100,1000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import timedelta
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def best_time(func, repeat):
+    """Best wall-clock time of func() over repeat runs."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def seed(rows):
+    from django.utils import timezone
+
+    from accounts.models import User
+    from games.models import Booking, Game
+
+    player = User.objects.create_user(username='bench-serializer', password='testpass123')
+    now = timezone.now()
+    games = Game.objects.bulk_create([
+        Game(
+            name=f'Benchmark game {i}',
+            location='Lagos Sports Complex, Victoria Island',
+            date_time=now + timedelta(days=1, minutes=i),
+            coin_price=500,
+            total_slots=22,
+            booked_slots=i % 22,
+            description='Casual weekend football game for all skill levels.',
+            created_by=player,
+        )
+        for i in range(rows)
+    ], batch_size=1000)
+    Booking.objects.bulk_create([
+        Booking(user=player, game=game, coins_paid=500, booking_reference=f'BK-S{i:08d}')
+        for i, game in enumerate(games)
+    ], batch_size=1000)
+    return player
+
+
+def run(sizes, repeat):
+    from django.db import transaction
+    from rest_framework.renderers import JSONRenderer
+
+    from galactiturf.renderers import FastJSONRenderer
+    from games.models import Booking, Game
+    from games.serializers import (
+        BookingSerializer, BookingValuesSerializer, GameSerializer, GameValuesSerializer,
+    )
+
+    results = []
+    with transaction.atomic():
+        player = seed(max(sizes))
+        cases = [
+            ('games', Game.objects.select_related('created_by').order_by('date_time'),
+             GameSerializer, GameValuesSerializer),
+            ('bookings', Booking.objects.filter(user=player).select_related('user', 'game').order_by('-created_at'),
+             BookingSerializer, BookingValuesSerializer),
+        ]
+        for name, queryset, model_serializer, values_serializer in cases:
+            for size in sizes:
+                def before():
+                    return JSONRenderer().render(model_serializer(list(queryset[:size]), many=True).data)
+
+                def after():
+                    rows = list(values_serializer.values(queryset)[:size])
+                    return FastJSONRenderer().render(values_serializer(rows).data)
+
+                identical = before() == after()
+                before_s, after_s = best_time(before, repeat), best_time(after, repeat)
+                results.append({
+                    'serializer': name,
+                    'page_size': size,
+                    'before_rows_per_s': round(size / before_s),
+                    'after_rows_per_s': round(size / after_s),
+                    'speedup': round(before_s / after_s, 2),
+                    'identical_bytes': identical,
+                })
+        transaction.set_rollback(True)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the values() list serializers.')
+    parser.add_argument('--sizes', default='10,100,1000', help='Comma-separated page sizes')
+    parser.add_argument('--repeat', type=int, default=20, help='Runs per measurement; the best is kept')
+    parser.add_argument('--output', default=None, help='Also write the results to this JSON file')
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, str(BACKEND_DIR))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'galactiturf.settings')
+    import django
+    django.setup()
+
+    sizes = sorted({int(size) for size in args.sizes.split(',') if size.strip()})
+    results = run(sizes, args.repeat)
+
+    print(f"{'serializer':<10} {'page':>6} {'before rows/s':>14} {'after rows/s':>13} {'speedup':>8}  bytes")
+    for row in results:
+        print(
+            f"{row['serializer']:<10} {row['page_size']:>6} {row['before_rows_per_s']:>14} "
+            f"{row['after_rows_per_s']:>13} {row['speedup']:>7}x  {'same' if row['identical_bytes'] else 'DIFFERENT'}"
+        )
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+    return 0 if all(row['identical_bytes'] for row in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,192 @@
+"""
+Worker start-up time: what a cold start imports, and how long until the
+first response.
+
+Two reports, both from the backend directory:
+
+    python -m benchmarks.startup imports [--top 25]
+        Runs ``python -X importtime`` on what a worker does before its
+        first request (import the WSGI app, load the URLconf) and lists
+        the slowest modules and packages by self time. Packages that should
+        only be imported on first use (``LAZY_MODULES``) are listed with the
+        module that imported them, and the exit status is 1 when that
+        module is our own code.
+
+    python -m benchmarks.startup cold-start [--runs 5]
+        Starts gunicorn with gunicorn.conf.py, with and without
+        ``preload_app``, and reports the median time from spawning the
+        master to the first 200 from ``/ping/``.
+
+Both use galactiturf.settings unless DJANGO_SETTINGS_MODULE is set.
+"""
+import argparse
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from collections import defaultdict
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Heavy packages that only a few views need; they must not load at start-up
+LAZY_MODULES = ('requests', 'PIL', 'pyarrow')
+
+FIRST_PARTY = ('accounts', 'galactiturf', 'games', 'payments', 'reports', 'subscriptions')
+
+STARTUP_CODE = (
+    'import galactiturf.wsgi; '
+    'from django.urls import get_resolver; '
+    'get_resolver().url_patterns'
+)
+
+IMPORT_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def startup_env(**extra):
+    env = dict(os.environ, **extra)
+    env.setdefault('DJANGO_SETTINGS_MODULE', 'galactiturf.settings')
+    return env
+
+
+def import_times():
+    """
+    Import the app in a fresh interpreter and return its imports.
+
+    Each entry is (module, self ms, cumulative ms, depth), in the order
+    ``-X importtime`` reports them.
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', STARTUP_CODE],
+        cwd=BACKEND_DIR, env=startup_env(), capture_output=True, text=True,
+    )
+    if result.returncode:
+        raise RuntimeError(f'Start-up import failed:\n{result.stderr[-2000:]}')
+    modules = []
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            modules.append((module, int(self_us) / 1000, int(cumulative_us) / 1000, len(indent) // 2))
+    return modules
+
+
+def by_package(modules):
+    """Total self time per top-level package, slowest first."""
+    totals = defaultdict(float)
+    for module, self_ms, _, _ in modules:
+        totals[module.split('.')[0]] += self_ms
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+
+def lazy_imports(modules):
+    """
+    Map each LAZY_MODULES package imported at start-up to the module that imported it.
+
+    ``-X importtime`` lists a module after everything it imports, one level
+    less indented, so the importer is the next shallower entry.
+    """
+    found = {}
+    for index, (module, _, _, depth) in enumerate(modules):
+        package = module.split('.')[0]
+        if package not in LAZY_MODULES or package in found:
+            continue
+        importer = None
+        for parent, _, _, parent_depth in modules[index + 1:]:
+            if parent_depth < depth and parent.split('.')[0] != package:
+                importer = parent
+                break
+            if parent_depth < depth:
+                depth = parent_depth
+        found[package] = importer
+    return found
+
+
+def first_party(module):
+    return module is not None and module.split('.')[0] in FIRST_PARTY
+
+
+def report_imports(top):
+    modules = import_times()
+    total = sum(self_ms for _, self_ms, _, _ in modules)
+    print(f'{len(modules)} modules imported in {total:.0f} ms\n')
+
+    print(f'{"self ms":>9}  {"cumul ms":>9}  module')
+    for module, self_ms, cumulative_ms, _ in sorted(modules, key=lambda row: row[1], reverse=True)[:top]:
+        print(f'{self_ms:9.1f}  {cumulative_ms:9.1f}  {module}')
+
+    print(f'\n{"self ms":>9}  package')
+    for package, self_ms in by_package(modules)[:top]:
+        print(f'{self_ms:9.1f}  {package}')
+
+    loaded = lazy_imports(modules)
+    if loaded:
+        print('\nImported at start-up but meant to load on first use:')
+        for package, importer in sorted(loaded.items()):
+            print(f'  {package} (by {importer or "the start-up code"})')
+    # Third-party imports (DRF's optional requests support) are out of our hands
+    return 1 if any(first_party(importer) for importer in loaded.values()) else 0
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def time_to_first_byte(preload, workers, timeout=60):
+    """Seconds from spawning gunicorn until /ping/ answers 200."""
+    port = free_port()
+    env = startup_env(PORT=str(port), WEB_CONCURRENCY=str(workers), GUNICORN_PRELOAD='true' if preload else 'false')
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py'],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(f'http://127.0.0.1:{port}/ping/', timeout=5) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.01)
+        raise SystemExit(f'gunicorn did not answer /ping/ within {timeout} seconds.')
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def report_cold_start(runs, workers):
+    print(f'Median time to first /ping/ response over {runs} runs, {workers} workers\n')
+    for preload in (False, True):
+        samples = [time_to_first_byte(preload, workers) * 1000 for _ in range(runs)]
+        label = 'preload' if preload else 'no preload'
+        print(f'{label:>12}  {statistics.median(samples):7.0f} ms  (min {min(samples):.0f}, max {max(samples):.0f})')
+    return 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Measure worker start-up time.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    imports = commands.add_parser('imports', help='Import time per module at start-up')
+    imports.add_argument('--top', type=int, default=25)
+    cold_start = commands.add_parser('cold-start', help='Time to first /ping/ response under gunicorn')
+    cold_start.add_argument('--runs', type=int, default=5)
+    cold_start.add_argument('--workers', type=int, default=2)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.command == 'imports':
+        return report_imports(args.top)
+    return report_cold_start(args.runs, args.workers)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,34 @@
+import pytest
+
+
+@pytest.fixture(autouse=True, scope='session')
+def isolated_settings(django_test_environment):
+    """Run every test with the throttles and API response cache off (see galactiturf.testing)."""
+    from galactiturf.testing import isolated_settings
+
+    with isolated_settings():
+        yield
+
+
+@pytest.fixture(autouse=True)
+def empty_cache(isolated_settings):
+    """Start every test with an empty cache."""
+    from django.core.cache import cache
+
+    cache.clear()
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('perf', 'endpoint performance budgets')
+    group.addoption(
+        '--perf-sizes', default='10,1000',
+        help='Comma-separated row counts to seed for the endpoint budgets (e.g. 10,1000,100000)'
+    )
+    group.addoption(
+        '--perf-repeat', type=int, default=5,
+        help='Requests per endpoint and size; the median latency is used'
+    )
+    group.addoption(
+        '--update-perf-baseline', action='store_true',
+        help='Rewrite perf/budgets.json query counts from this run'
+    )
@@ -0,0 +1,39 @@
+"""
+Moving settled history out of hot tables.
+
+Bookings of finished games, settled payments and old coin ledger entries
+are never changed again, yet every query on their live tables (and every
+index update) pays for them. ``move_rows`` copies such rows into an archive
+table with the same columns and the same ids, then deletes them from the
+live table, a batch per transaction. Each batch commits on its own, so a
+run can be stopped at any point and picked up by the next; a row is only
+ever in one table once its batch commits.
+
+PostgreSQL range partitioning would need the partition key in every
+unique constraint (booking references, payment references), so the
+archive is a plain table instead.
+"""
+from django.db import transaction
+
+
+def move_rows(queryset, archive_model, fields, batch_size, **expressions):
+    """
+    Move the rows of queryset into archive_model, in id order; return how many moved.
+
+    ``fields`` are copied as they are, and ``expressions`` fill the other
+    archive columns (for example from a related row).
+    """
+    model = queryset.model
+    moved = last_id = 0
+    while True:
+        with transaction.atomic():
+            rows = list(
+                queryset.filter(id__gt=last_id).order_by('id').values(*fields, **expressions)[:batch_size]
+            )
+            if not rows:
+                return moved
+            # A run that overlapped this one may have archived some of them already
+            archive_model.objects.bulk_create([archive_model(**row) for row in rows], ignore_conflicts=True)
+            model.objects.filter(id__in=[row['id'] for row in rows]).delete()
+        moved += len(rows)
+        last_id = rows[-1]['id']
@@ -2,6 +2,8 @@
 ASGI config for galactiturf project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+The live slot availability streams are routed before Django (see
+``games.availability``); every other request goes to Django.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
@@ -11,6 +13,11 @@ import os
 
 from django.core.asgi import get_asgi_application
 
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'galactiturf.settings')
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'galactiturf.settings_production')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Imported after setup, since it loads the games models
+from games.availability import events_router  # noqa: E402
+
+application = events_router(django_application)
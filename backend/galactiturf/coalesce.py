@@ -0,0 +1,142 @@
+"""
+Single-flight caching: concurrent misses for the same key compute once.
+
+When a cached value expires under load, every request that misses would
+otherwise run the same queries and serialization at once (a thundering
+herd). ``single_flight`` lets one caller compute while the others wait
+and receive the same value:
+
+* inside a process, callers for a key queue behind the first one, and
+  share its value or exception;
+* across workers, the first caller takes a short lock in the shared cache
+  and the others poll the cache until the value appears. If the holder
+  dies, the lock expires and a waiter computes the value itself.
+
+``CoalescedCacheMixin`` applies this to GET views. The cache key holds a
+version that changes whenever the data shown does (for games, their
+latest ``updated_at`` and their count, which also catches deletions), so
+a write makes a fresh key and cached responses are not served stale.
+"""
+import hashlib
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.response import Response
+
+# How long a computing caller holds the cross-worker lock, and how often waiters poll
+LOCK_SECONDS = 10
+POLL_SECONDS = 0.02
+
+_MISSING = object()
+
+
+class _Flight:
+    """One in-process computation and the callers waiting for it."""
+
+    __slots__ = ('done', 'value', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = _MISSING
+        self.error = None
+
+
+_flights = {}
+_flights_lock = threading.Lock()
+
+
+def _compute_once(key, compute, timeout):
+    """Compute and cache the value, unless another worker is already doing so."""
+    lock_key = f'{key}:lock'
+    token = uuid.uuid4().hex
+    deadline = time.monotonic() + LOCK_SECONDS
+
+    while not cache.add(lock_key, token, LOCK_SECONDS):
+        time.sleep(POLL_SECONDS)
+        value = cache.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        if time.monotonic() > deadline:
+            # The holder is stuck or gone; don't wait for it any longer
+            return compute()
+
+    try:
+        value = compute()
+        cache.set(key, value, timeout)
+        return value
+    finally:
+        if cache.get(lock_key) == token:
+            cache.delete(lock_key)
+
+
+def single_flight(key, compute, timeout):
+    """Return the cached value for key, computing it at most once across concurrent callers."""
+    value = cache.get(key, _MISSING)
+    if value is not _MISSING:
+        return value
+
+    with _flights_lock:
+        flight = _flights.get(key)
+        leader = flight is None
+        if leader:
+            flight = _flights[key] = _Flight()
+
+    if not leader:
+        flight.done.wait(LOCK_SECONDS)
+        if flight.error is not None:
+            raise flight.error
+        if flight.value is not _MISSING:
+            return flight.value
+        return compute()
+
+    try:
+        flight.value = _compute_once(key, compute, timeout)
+        return flight.value
+    except Exception as error:
+        flight.error = error
+        raise
+    finally:
+        with _flights_lock:
+            del _flights[key]
+        flight.done.set()
+
+
+class CoalescedCacheMixin:
+    """
+    GET view mixin that caches response data and coalesces misses.
+
+    Responses are cached per absolute URL (query string included) and per
+    ``get_cache_version()``, for ``API_CACHE_SECONDS``. Errors raised by
+    the view (such as a 404) are shared with the waiting callers but not
+    cached. Views whose output depends on the requesting user must not
+    use it.
+    """
+
+    cache_prefix = None
+
+    def get_cache_version(self):
+        """Return a value that changes whenever the cached data does."""
+        raise NotImplementedError('.get_cache_version() must be overridden')
+
+    def get(self, request, *args, **kwargs):
+        timeout = settings.API_CACHE_SECONDS
+        if not timeout:
+            return super().get(request, *args, **kwargs)
+
+        url = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+        key = f'api:{self.cache_prefix}:{self.get_cache_version()}:{url}'
+        responses = []
+
+        def compute():
+            response = super(CoalescedCacheMixin, self).get(request, *args, **kwargs)
+            responses.append(response)
+            return (response.status_code, response.data)
+
+        status, data = single_flight(key, compute, timeout)
+        # The caller that computed keeps its own response (headers included)
+        if responses:
+            return responses[0]
+        return Response(data, status=status)
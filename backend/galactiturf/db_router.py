@@ -0,0 +1,117 @@
+"""
+Database router that spreads catalogue reads over read replicas.
+
+Reads only go to a replica inside an explicit replica scope, either a view
+using ``ReplicaReadMixin`` or code wrapped in ``read_from_replica()``.
+Everything else, including every write, uses the primary (``default``).
+Once a request writes, it stays on the primary for the rest of that
+request, and ``ReplicaPinMiddleware`` pins the user to the primary for
+``REPLICA_PIN_SECONDS`` so they read their own writes.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+
+PRIMARY_DB = 'default'
+
+_routing_state = ContextVar('db_routing_state', default=None)
+
+
+class RoutingState:
+    """Mutable routing flags for a single request or replica scope."""
+
+    __slots__ = ('use_replica', 'wrote')
+
+    def __init__(self, use_replica=False):
+        self.use_replica = use_replica
+        self.wrote = False
+
+
+def get_replicas():
+    """Return the database aliases configured as read replicas."""
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+def current_state():
+    """Return the routing state of the current request, if any."""
+    return _routing_state.get()
+
+
+@contextmanager
+def routing_scope(use_replica=False):
+    """Run the enclosed block with a fresh routing state."""
+    state = RoutingState(use_replica=use_replica)
+    token = _routing_state.set(state)
+    try:
+        yield state
+    finally:
+        _routing_state.reset(token)
+
+
+def read_from_replica():
+    """Send reads inside the block to a replica (for reporting and exports)."""
+    return routing_scope(use_replica=True)
+
+
+def _pin_key(user_id):
+    return f'db-router:pin:{user_id}'
+
+
+def pin_user_to_primary(user_id):
+    """Keep a user's reads on the primary for the configured window."""
+    seconds = getattr(settings, 'REPLICA_PIN_SECONDS', 5)
+    if seconds > 0:
+        cache.set(_pin_key(user_id), True, seconds)
+
+
+def is_pinned(user):
+    """Check whether a user recently wrote and must read from the primary."""
+    if user is None or not user.is_authenticated:
+        return False
+    return bool(cache.get(_pin_key(user.pk)))
+
+
+class PrimaryReplicaRouter:
+    """Route writes to the primary and scoped reads to a replica."""
+
+    def db_for_read(self, model, **hints):
+        state = _routing_state.get()
+        if state is None or not state.use_replica or state.wrote:
+            return PRIMARY_DB
+        replicas = get_replicas()
+        if not replicas:
+            return PRIMARY_DB
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        state = _routing_state.get()
+        if state is not None:
+            state.wrote = True
+        return PRIMARY_DB
+
+    def allow_relation(self, obj1, obj2, **hints):
+        pool = {PRIMARY_DB, *get_replicas()}
+        if obj1._state.db in pool and obj2._state.db in pool:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return None
+
+
+class ReplicaReadMixin:
+    """
+    View mixin that serves the view's reads from a replica.
+
+    Authentication still hits the primary; the replica is only enabled once
+    we know the user is not pinned by a recent write.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        state = _routing_state.get()
+        if state is not None and not is_pinned(request.user):
+            state.use_replica = True
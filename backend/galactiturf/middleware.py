@@ -1,7 +1,20 @@
 """
-Custom middleware for handling SSL settings dynamically
+Custom middleware for SSL detection, database routing and compression
 """
+import re
+
 from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+
+from .db_router import pin_user_to_primary, routing_scope
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+re_accepts_brotli = re.compile(r'\bbr\b')
 
 
 class SSLMiddleware:
@@ -35,4 +48,80 @@ class SSLMiddleware:
             settings.CSRF_COOKIE_SECURE = False
         
         response = self.get_response(request)
-        return response
\ No newline at end of file
+        return response
+
+
+class ReplicaPinMiddleware:
+    """
+    Middleware that scopes database routing to the request.
+
+    Any request that writes to the primary pins its user to the primary for
+    a short window, so their next reads don't hit a lagging replica.
+    """
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with routing_scope() as state:
+            response = self.get_response(request)
+            
+            user = getattr(request, 'user', None)
+            if state.wrote and user is not None and user.is_authenticated:
+                pin_user_to_primary(user.pk)
+        
+        return response
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    Negotiated Brotli or gzip compression for API payloads.
+
+    Only the content types in COMPRESSIBLE_CONTENT_TYPES are compressed,
+    which keeps HTML pages with CSRF tokens out of reach of BREACH-style
+    attacks. Brotli is used when the client accepts it and the ``brotli``
+    package is installed. Otherwise Django's gzip handling applies.
+    Streaming responses are compressed chunk by chunk.
+    """
+    
+    def process_response(self, request, response):
+        content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+        if content_type not in settings.COMPRESSIBLE_CONTENT_TYPES:
+            return response
+        
+        accepts = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        if brotli is None or getattr(response, 'is_async', False) or not re_accepts_brotli.search(accepts):
+            return super().process_response(request, response)
+        
+        if not response.streaming and len(response.content) < 200:
+            return response
+        if response.has_header('Content-Encoding'):
+            return response
+        
+        patch_vary_headers(response, ('Accept-Encoding',))
+        quality = settings.BROTLI_QUALITY
+        if response.streaming:
+            response.streaming_content = self.compress_stream(response.streaming_content, quality)
+            del response.headers['Content-Length']
+        else:
+            compressed = brotli.compress(response.content, quality=quality)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+        
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = 'br'
+        return response
+    
+    @staticmethod
+    def compress_stream(chunks, quality):
+        """Brotli-compress a byte iterator, flushing after every chunk."""
+        compressor = brotli.Compressor(quality=quality)
+        for chunk in chunks:
+            data = compressor.process(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
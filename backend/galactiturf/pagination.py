@@ -0,0 +1,41 @@
+"""
+Pagination helpers for large tables.
+"""
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that uses the planner's row estimate for large, unfiltered
+    tables on PostgreSQL instead of running COUNT(*) over the whole table.
+    
+    Filtered querysets, small tables and other databases get an exact count.
+    """
+    
+    @cached_property
+    def count(self):
+        estimate = self._estimated_count()
+        threshold = getattr(settings, 'ADMIN_ESTIMATED_COUNT_THRESHOLD', 100000)
+        if estimate is not None and estimate >= threshold:
+            return estimate
+        return super().count
+    
+    def _estimated_count(self):
+        query = getattr(self.object_list, 'query', None)
+        if query is None or query.where or query.distinct:
+            return None
+        
+        connection = connections[self.object_list.db]
+        if connection.vendor != 'postgresql':
+            return None
+        
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [query.model._meta.db_table]
+            )
+            row = cursor.fetchone()
+        return row[0] if row and row[0] > 0 else None
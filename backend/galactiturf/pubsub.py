@@ -0,0 +1,178 @@
+"""
+In-process publish/subscribe for server-sent events, with an optional
+Redis backend shared by every worker.
+
+Subscribers are async consumers (one per open event stream) that belong
+to the worker's event loop. Publishers are ordinary sync code, usually a
+transaction's ``on_commit`` callback running in a request thread. A
+publish hands each subscriber the message through
+``loop.call_soon_threadsafe``, and an idle subscriber waits on an
+``asyncio.Event``, so thousands of open streams cost no CPU between
+messages.
+
+Messages carry a key (such as a game id) and each subscriber keeps only
+the latest message per key until it reads them. A slow client therefore
+receives the current state rather than a growing backlog, and memory per
+subscriber is bounded by the number of keys.
+
+With ``REDIS_URL`` set, publishes go through a Redis channel instead, and
+each worker runs one listener that fans the messages out to its own
+subscribers. Writes made in any worker, or in a management command,
+then reach every stream.
+"""
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+REDIS_CHANNEL = 'galactiturf:events'
+
+# Seconds before a failed Redis listener reconnects
+REDIS_RETRY_SECONDS = 1
+
+
+class Subscription:
+    """The pending messages of one subscriber, keyed so newer ones replace older ones."""
+
+    def __init__(self, broker, topics, loop):
+        self.broker = broker
+        self.topics = topics
+        self.loop = loop
+        self.pending = {}
+        self.ready = asyncio.Event()
+        self.closed = False
+
+    def deliver(self, key, message):
+        # Always called on the subscriber's event loop
+        self.pending[key] = message
+        self.ready.set()
+
+    async def get(self, timeout):
+        """Wait up to timeout seconds and return the pending messages (possibly none)."""
+        try:
+            await asyncio.wait_for(self.ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        self.ready.clear()
+        messages, self.pending = list(self.pending.values()), {}
+        return messages
+
+    def close(self):
+        """Unsubscribe, and wake a reader waiting in ``get``."""
+        self.closed = True
+        self.ready.set()
+        self.broker.unsubscribe(self)
+
+
+class LocalBroker:
+    """Fan messages out to the subscribers in this process."""
+
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._all = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self, topics):
+        """Subscribe the running event loop to the given topics."""
+        subscription = Subscription(self, topics, asyncio.get_running_loop())
+        with self._lock:
+            self._all.add(subscription)
+            for topic in topics:
+                self._subscribers[topic].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            if subscription not in self._all:
+                return
+            self._all.discard(subscription)
+            for topic in subscription.topics:
+                self._subscribers[topic].discard(subscription)
+                if not self._subscribers[topic]:
+                    del self._subscribers[topic]
+
+    def subscriber_count(self):
+        return len(self._all)
+
+    def has_subscribers(self):
+        """Whether publishing can reach anyone (always true for a shared backend)."""
+        return bool(self._all)
+
+    def publish(self, topics, key, message):
+        self.fan_out(topics, key, message)
+
+    def fan_out(self, topics, key, message):
+        with self._lock:
+            subscriptions = {
+                subscription for topic in topics for subscription in self._subscribers.get(topic, ())
+            }
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, key, message)
+            except RuntimeError:
+                # The subscriber's loop has shut down
+                self.unsubscribe(subscription)
+
+
+class RedisBroker(LocalBroker):
+    """Publish through Redis so subscribers in every worker receive the message."""
+
+    def __init__(self, url):
+        super().__init__()
+        self.url = url
+        self._client = None
+        self._listener = None
+
+    def subscribe(self, topics):
+        subscription = super().subscribe(topics)
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.get_running_loop().create_task(self._listen())
+        return subscription
+
+    def has_subscribers(self):
+        return True
+
+    def publish(self, topics, key, message):
+        if self._client is None:
+            import redis
+            self._client = redis.Redis.from_url(self.url)
+        self._client.publish(REDIS_CHANNEL, json.dumps([list(topics), key, message]))
+
+    async def _listen(self):
+        import redis.asyncio
+
+        while True:
+            client = redis.asyncio.Redis.from_url(self.url)
+            try:
+                async with client.pubsub() as pubsub:
+                    await pubsub.subscribe(REDIS_CHANNEL)
+                    async for item in pubsub.listen():
+                        if item['type'] == 'message':
+                            topics, key, message = json.loads(item['data'])
+                            self.fan_out(topics, key, message)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception('Event listener lost its Redis connection; reconnecting')
+                await asyncio.sleep(REDIS_RETRY_SECONDS)
+            finally:
+                await client.aclose()
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """Return the process-wide broker, using Redis when ``REDIS_URL`` is set."""
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = RedisBroker(settings.REDIS_URL) if settings.REDIS_URL else LocalBroker()
+    return _broker
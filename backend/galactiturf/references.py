@@ -0,0 +1,107 @@
+"""
+Short, time-ordered, checksummed references (such as booking references).
+
+A reference is a prefix and 14 Crockford base32 characters, for example
+``BK-0K3WZ8D1F7M2QX``:
+
+* 9 characters of milliseconds since 2024-01-01, so references sort by
+  creation time and new ones land at the right edge of the unique index
+  instead of on random pages;
+* 4 characters (20 bits) of sequence, random at the start of each
+  millisecond and then incremented, so one process never repeats a
+  reference and two processes only collide if they draw the same
+  sequence in the same millisecond;
+* 1 check character (Luhn mod 32), so a mistyped character or swapped
+  neighbours (bar ``0Z``) are rejected before any query runs.
+
+Crockford's alphabet has no I, L, O or U, so a reference reads out
+unambiguously. ``normalize_reference`` undoes the usual typing slips (lower
+case, I or L for 1, O for 0). The unique constraint stays the final
+guard: callers retry with a fresh reference if one is already taken.
+"""
+import secrets
+import threading
+import time
+
+ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+VALUES = {char: value for value, char in enumerate(ALPHABET)}
+TYPO_FIXES = str.maketrans({'I': '1', 'L': '1', 'O': '0'})
+
+EPOCH_MS = 1704067200000  # 2024-01-01T00:00:00Z
+TIME_CHARS = 9
+SEQUENCE_CHARS = 4
+SEQUENCE_LIMIT = 32 ** SEQUENCE_CHARS
+# Random starting points stay in the lower half, leaving room to count up
+SEQUENCE_START_BITS = 5 * SEQUENCE_CHARS - 1
+BODY_CHARS = TIME_CHARS + SEQUENCE_CHARS + 1
+
+_lock = threading.Lock()
+_last_ms = 0
+_sequence = 0
+
+
+def _encode(value, length):
+    chars = []
+    for _ in range(length):
+        value, digit = divmod(value, 32)
+        chars.append(ALPHABET[digit])
+    return ''.join(reversed(chars))
+
+
+def check_character(payload):
+    """The Luhn mod 32 check character of a Crockford base32 string."""
+    total, factor = 0, 2
+    for char in reversed(payload):
+        addend = factor * VALUES[char]
+        total += addend // 32 + addend % 32
+        factor = 3 - factor
+    return ALPHABET[-total % 32]
+
+
+def _next_ids(count):
+    """Reserve count (millisecond, sequence) pairs, strictly increasing."""
+    global _last_ms, _sequence
+    ids = []
+    with _lock:
+        for _ in range(count):
+            now = int(time.time() * 1000) - EPOCH_MS
+            if now > _last_ms:
+                _last_ms, _sequence = now, secrets.randbits(SEQUENCE_START_BITS)
+            else:
+                _sequence += 1
+                if _sequence == SEQUENCE_LIMIT:
+                    # This millisecond is used up; borrow the next one
+                    _last_ms, _sequence = _last_ms + 1, secrets.randbits(SEQUENCE_START_BITS)
+            ids.append((_last_ms, _sequence))
+    return ids
+
+
+def new_references(prefix, count):
+    """Generate count distinct references, in ascending order."""
+    references = []
+    for ms, sequence in _next_ids(count):
+        payload = _encode(ms, TIME_CHARS) + _encode(sequence, SEQUENCE_CHARS)
+        references.append(f'{prefix}-{payload}{check_character(payload)}')
+    return references
+
+
+def new_reference(prefix):
+    """Generate one reference."""
+    return new_references(prefix, 1)[0]
+
+
+def normalize_reference(reference):
+    """Upper-case a typed reference and fix look-alike characters in its body."""
+    prefix, dash, body = reference.strip().upper().rpartition('-')
+    return f'{prefix}{dash}{body.translate(TYPO_FIXES)}'
+
+
+def is_valid_reference(reference, prefix):
+    """Check the shape and check character of a normalized reference."""
+    head, _, body = reference.rpartition('-')
+    return (
+        head == prefix
+        and len(body) == BODY_CHARS
+        and all(char in VALUES for char in body)
+        and check_character(body[:-1]) == body[-1]
+    )
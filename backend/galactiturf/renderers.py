@@ -0,0 +1,43 @@
+"""
+JSON renderer backed by orjson.
+
+The output matches DRF's ``JSONRenderer`` byte for byte for the payloads
+this API produces. It is compact, UTF-8, escapes U+2028/U+2029, and uses
+DRF's formatting for datetimes, dates, times, UUIDs, lazy strings and
+Decimals. Responses it cannot reproduce exactly fall back to the stdlib
+renderer: pretty-printed (``indent``) output and integers beyond 64 bits.
+Floats in exponent notation are the one known difference: orjson writes
+``1e-07`` as ``1e-7``. The API does not return raw floats.
+
+If orjson is not installed this is plain ``JSONRenderer``.
+"""
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """Drop-in ``JSONRenderer`` that encodes with orjson when it can."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Same strict-javascript-subset escaping as JSONRenderer
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
@@ -0,0 +1,135 @@
+"""
+Fast read-only serialization from ``.values()`` rows.
+
+A ``ValuesSerializer`` wraps an existing ``ModelSerializer`` and compiles
+its fields once into a plan of ORM lookups and converters. Rows are then
+built straight from ``.values()`` dicts, without instantiating models or
+walking DRF fields per row. The output is the same as the wrapped
+serializer's:
+
+* plain columns (integers, strings, booleans, choices, foreign-key ids)
+  are copied as-is;
+* other model fields (datetimes, decimals, ...) go through the DRF
+  field's own ``to_representation``;
+* ``ReadOnlyField`` sources that are model properties are evaluated by the
+  property against the row, so their logic is not duplicated. Columns a
+  property needs but the serializer does not output belong in
+  ``property_sources``.
+
+Method fields, nested serializers and file fields are not supported.
+"""
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework import serializers
+from rest_framework.response import Response
+
+# Fields whose to_representation() is the identity for database values
+IDENTITY_FIELDS = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.ChoiceField,
+    serializers.IntegerField,
+    serializers.PrimaryKeyRelatedField,
+    serializers.ReadOnlyField,
+)
+
+
+class _Row:
+    """Attribute access over a values() row, for evaluating model properties."""
+
+    __slots__ = ('_row',)
+
+    def __init__(self, row):
+        self._row = row
+
+    def __getattr__(self, name):
+        try:
+            return self._row[name]
+        except KeyError:
+            raise AttributeError(name)
+
+
+class ValuesSerializer:
+    """Read-only serializer for lists of ``.values()`` rows."""
+
+    serializer_class = None
+    property_sources = ()
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    @classmethod
+    def get_plan(cls):
+        """Compile (and cache) the field plan of the wrapped serializer."""
+        plan = cls.__dict__.get('_plan')
+        if plan is None:
+            plan = cls._plan = cls._compile()
+        return plan
+
+    @classmethod
+    def _compile(cls):
+        serializer = cls.serializer_class()
+        model = serializer.Meta.model
+        lookups = list(cls.property_sources)
+        steps = []
+
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            attrs = field.source_attrs
+            prop = getattr(model, attrs[0], None) if len(attrs) == 1 else None
+            if isinstance(prop, property):
+                steps.append((name, None, prop.fget, None))
+                continue
+            if isinstance(field, (serializers.SerializerMethodField, serializers.BaseSerializer,
+                                  serializers.FileField, serializers.ManyRelatedField)):
+                raise ImproperlyConfigured(
+                    f'{cls.__name__} cannot serialize {name!r} ({type(field).__name__}) from values().'
+                )
+            lookup = '__'.join(attrs)
+            lookups.append(lookup)
+            convert = None if isinstance(field, IDENTITY_FIELDS) else field.to_representation
+            steps.append((name, lookup, None, convert))
+
+        return lookups, steps
+
+    @classmethod
+    def values(cls, queryset):
+        """Return ``queryset.values()`` with exactly the columns the plan needs."""
+        lookups, _ = cls.get_plan()
+        return queryset.values(*dict.fromkeys(lookups))
+
+    @property
+    def data(self):
+        _, steps = self.get_plan()
+        data = []
+        for row in self.rows:
+            item = {}
+            view = None
+            for name, lookup, getter, convert in steps:
+                if getter is not None:
+                    if view is None:
+                        view = _Row(row)
+                    item[name] = getter(view)
+                    continue
+                value = row[lookup]
+                item[name] = value if convert is None or value is None else convert(value)
+            data.append(item)
+        return data
+
+
+class ValuesListMixin:
+    """List view mixin that builds responses with ``values_serializer_class``."""
+
+    values_serializer_class = None
+
+    def get_values_queryset(self):
+        """The rows to list, as ``.values()`` of the filtered queryset."""
+        return self.values_serializer_class.values(self.filter_queryset(self.get_queryset()))
+
+    def list(self, request, *args, **kwargs):
+        serializer_class = self.values_serializer_class
+        queryset = self.get_values_queryset()
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(serializer_class(page).data)
+        return Response(serializer_class(queryset).data)
@@ -32,13 +32,16 @@ INSTALLED_APPS = [
     'games',
     'subscriptions',
     'payments',
+    'reports',
 ]
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'galactiturf.middleware.CompressionMiddleware',  # Brotli/gzip for API payloads
     'galactiturf.middleware.SSLMiddleware',  # Custom SSL middleware
+    'galactiturf.middleware.ReplicaPinMiddleware',  # Read-your-writes replica routing
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -75,6 +78,31 @@ DATABASES = {
     )
 }
 
+# Read replicas, e.g. DATABASE_REPLICA_URLS=postgres://...,postgres://...
+DATABASE_REPLICA_URLS = config('DATABASE_REPLICA_URLS', default='', cast=lambda v: [s.strip() for s in v.split(',') if s.strip()])
+for index, url in enumerate(DATABASE_REPLICA_URLS, start=1):
+    DATABASES[f'replica{index}'] = dj_database_url.parse(url)
+    DATABASES[f'replica{index}']['TEST'] = {'MIRROR': 'default'}
+
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['galactiturf.db_router.PrimaryReplicaRouter']
+
+# How long a user reads from the primary after writing
+REPLICA_PIN_SECONDS = config('REPLICA_PIN_SECONDS', default=5, cast=int)
+
+# Cache (shared across workers when REDIS_URL is set)
+REDIS_URL = config('REDIS_URL', default='')
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+if REDIS_URL:
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': REDIS_URL,
+    }
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 AUTH_PASSWORD_VALIDATORS = [
@@ -126,6 +154,21 @@ REST_FRAMEWORK = {
     ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
+    'DEFAULT_RENDERER_CLASSES': (
+        'galactiturf.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    # Token buckets in the shared cache (see galactiturf.throttling); an empty rate disables one
+    'DEFAULT_THROTTLE_CLASSES': (
+        'galactiturf.throttling.AnonTokenBucketThrottle',
+        'galactiturf.throttling.UserTokenBucketThrottle',
+    ),
+    'DEFAULT_THROTTLE_RATES': {
+        'anon': config('THROTTLE_ANON_RATE', default='120/min'),
+        'user': config('THROTTLE_USER_RATE', default='600/min'),
+    },
+    # Render's proxy appends the client address to X-Forwarded-For
+    'NUM_PROXIES': config('NUM_PROXIES', default=1, cast=int),
 }
 
 # JWT settings
@@ -147,6 +190,41 @@ CORS_ALLOW_CREDENTIALS = True
 # Paystack settings
 PAYSTACK_SECRET_KEY = config('PAYSTACK_SECRET_KEY')
 PAYSTACK_PUBLIC_KEY = config('PAYSTACK_PUBLIC_KEY')
+# Point at a fake Paystack server for load tests (see benchmarks/fake_paystack.py)
+PAYSTACK_API_URL = config('PAYSTACK_API_URL', default='https://api.paystack.co')
+
+# Response compression (see galactiturf.middleware.CompressionMiddleware)
+COMPRESSIBLE_CONTENT_TYPES = ['application/json', 'application/x-ndjson', 'text/csv']
+BROTLI_QUALITY = config('BROTLI_QUALITY', default=5, cast=int)
+
+# Rows fetched and encoded per batch by streaming JSON responses
+STREAM_CHUNK_SIZE = config('STREAM_CHUNK_SIZE', default=1000, cast=int)
+
+# Finance exports (see payments.exports): rows per cursor fetch, rows per Parquet row group
+EXPORT_CHUNK_SIZE = config('EXPORT_CHUNK_SIZE', default=10000, cast=int)
+EXPORT_ROW_GROUP_SIZE = config('EXPORT_ROW_GROUP_SIZE', default=20000, cast=int)
+
+# Seconds before the last rollup watermark that refresh_rollups rescans, for late commits
+ROLLUP_OVERLAP_SECONDS = config('ROLLUP_OVERLAP_SECONDS', default=300, cast=int)
+
+# Seconds of newest ledger entries take_snapshots leaves for the next run, for late commits
+LEDGER_SNAPSHOT_LAG_SECONDS = config('LEDGER_SNAPSHOT_LAG_SECONDS', default=300, cast=int)
+
+# Seconds game list and detail responses stay cached (see galactiturf.coalesce); 0 disables
+API_CACHE_SECONDS = config('API_CACHE_SECONDS', default=30, cast=int)
+
+# Live slot availability streams (see games.availability): keep-alive interval and open streams per worker
+SLOT_EVENTS_HEARTBEAT_SECONDS = config('SLOT_EVENTS_HEARTBEAT_SECONDS', default=15, cast=int)
+SLOT_EVENTS_MAX_SUBSCRIBERS = config('SLOT_EVENTS_MAX_SUBSCRIBERS', default=5000, cast=int)
+
+# Seconds a checkout hold keeps its slots before they return to the game (see games.holds)
+SLOT_HOLD_SECONDS = config('SLOT_HOLD_SECONDS', default=300, cast=int)
+
+# Minutes after kick-off before a game is marked completed
+GAME_DURATION_MINUTES = config('GAME_DURATION_MINUTES', default=120, cast=int)
+
+# Days ahead that recurring game series are scheduled into games (see games.series)
+GAME_SERIES_HORIZON_DAYS = config('GAME_SERIES_HORIZON_DAYS', default=28, cast=int)
 
 # Frontend URL for payment callbacks
 FRONTEND_URL = config('FRONTEND_URL')
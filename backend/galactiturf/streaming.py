@@ -0,0 +1,84 @@
+"""
+Streaming JSON responses for large, unpaginated outputs.
+
+Rows are pulled from an iterator (normally ``queryset.iterator()``) and
+encoded in batches, so peak memory depends on the batch size, not on the
+number of rows. The bytes match what ``FastJSONRenderer`` would produce for
+the fully built object.
+
+Under ASGI (the uvicorn workers), Django 4.2 reads a synchronous
+streaming body with ``sync_to_async(list)``, holding the whole body in
+memory before sending a byte. ``ChunkedStreamingResponse`` pulls one
+chunk at a time instead, so exports stay flat in memory on either server.
+Every chunk is pulled in the same copied context, so a generator that
+sets a context variable before one yield can reset it after another.
+"""
+import contextvars
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import StreamingHttpResponse
+
+from .renderers import FastJSONRenderer
+
+
+def stream_chunk_size():
+    """Rows fetched and encoded per batch."""
+    return getattr(settings, 'STREAM_CHUNK_SIZE', 1000)
+
+
+def stream_json(rows, head=None, key=None, chunk_size=None):
+    """
+    Yield the JSON encoding of ``rows`` in chunks.
+
+    Without ``key`` the output is a JSON array. With ``key`` it is an
+    object holding the ``head`` items followed by ``key: [rows...]``.
+    """
+    render = FastJSONRenderer().render
+    chunk_size = chunk_size or stream_chunk_size()
+
+    if key is None:
+        yield b'['
+    else:
+        prefix = render(head or {})[:-1]
+        yield prefix + (b',' if head else b'') + render(key) + b':['
+
+    rows = iter(rows)
+    separator = b''
+    while True:
+        batch = list(islice(rows, chunk_size))
+        if not batch:
+            break
+        yield separator + render(batch)[1:-1]
+        separator = b','
+
+    yield b']' if key is None else b']}'
+
+
+class ChunkedStreamingResponse(StreamingHttpResponse):
+    """Streaming response whose synchronous iterator an ASGI server also reads a chunk at a time."""
+
+    async def __aiter__(self):
+        if self.is_async:
+            async for part in super().__aiter__():
+                yield part
+            return
+        parts = iter(self.streaming_content)
+        done = object()
+        # sync_to_async copies the context per call; run every next() in this one instead
+        context = contextvars.copy_context()
+        while True:
+            # Thread-sensitive, so every chunk is read on the same database connection (server-side cursors)
+            part = await sync_to_async(context.run, thread_sensitive=True)(next, parts, done)
+            if part is done:
+                return
+            yield part
+
+
+class StreamingJSONResponse(ChunkedStreamingResponse):
+    """Streaming HTTP response that encodes rows with ``stream_json``."""
+
+    def __init__(self, rows, head=None, key=None, chunk_size=None, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(stream_json(rows, head=head, key=key, chunk_size=chunk_size), **kwargs)
@@ -0,0 +1,81 @@
+"""
+Shared test helpers.
+
+Every test starts with an empty cache, and runs with the API throttles
+and the game response cache switched off (``isolated_settings``), under
+``manage.py test`` (``TestRunner``) and pytest (``conftest.py``) alike.
+Otherwise throttle buckets, cached responses and holds would carry over
+from one test into the next. The tests of the throttles and the cache
+turn them back on with ``override_settings``.
+"""
+import unittest
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import CaptureQueriesContext
+
+from accounts.models import User
+
+
+def isolated_settings():
+    """Settings override turning off the throttles and the API response cache."""
+    return override_settings(
+        REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {'anon': '', 'user': ''}},
+        API_CACHE_SECONDS=0,
+    )
+
+
+class CacheClearingResult:
+    """Test result mixin emptying the cache before each test."""
+
+    def startTest(self, test):
+        cache.clear()
+        super().startTest(test)
+
+
+class TestRunner(DiscoverRunner):
+    """Test runner applying ``isolated_settings`` to the whole run, and an empty cache to each test."""
+
+    def get_resultclass(self):
+        base = super().get_resultclass() or unittest.TextTestResult
+        return type(base.__name__, (CacheClearingResult, base), {})
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.isolation = isolated_settings()
+        self.isolation.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.isolation.disable()
+        super().teardown_test_environment(**kwargs)
+
+
+class AdminQueryCountMixin:
+    """Mixin for guarding admin changelists against per-row queries."""
+
+    def login_admin(self):
+        # The manifest storage needs collectstatic, which tests don't run
+        storage = override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+        storage.enable()
+        self.addCleanup(storage.disable)
+
+        admin = User.objects.create_superuser(username='staff', email='staff@example.com', password='testpass123')
+        self.client.force_login(admin)
+        return admin
+
+    def changelist_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def assertChangelistQueriesConstant(self, url, add_rows):
+        """Assert a changelist runs the same queries for 1 and for 20 extra rows."""
+        add_rows(1)
+        few = self.changelist_queries(url)
+        add_rows(19)
+        many = self.changelist_queries(url)
+        self.assertEqual(few, many, f'{url} runs extra queries per row')
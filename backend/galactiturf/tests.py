@@ -0,0 +1,242 @@
+import asyncio
+import gzip
+import json
+import threading
+import time
+import unittest
+from datetime import timedelta
+
+from django.conf import settings
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.models import User
+from games.models import Game
+from .coalesce import single_flight
+from .pubsub import LocalBroker
+from .references import is_valid_reference, new_reference, new_references, normalize_reference
+from .streaming import stream_json
+from .throttling import take_token
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+
+class StreamJSONTests(TestCase):
+    """Tests for the chunked JSON encoder."""
+
+    def test_matches_json_for_any_chunking(self):
+        rows = [{'id': index, 'name': f'row {index}'} for index in range(7)]
+        for chunk_size in (1, 3, 7, 100):
+            body = b''.join(stream_json(iter(rows), head={'total': 7}, key='rows', chunk_size=chunk_size))
+            self.assertEqual(json.loads(body), {'total': 7, 'rows': rows})
+            self.assertEqual(json.loads(b''.join(stream_json(iter(rows), chunk_size=chunk_size))), rows)
+
+    def test_empty_inputs(self):
+        self.assertEqual(b''.join(stream_json([])), b'[]')
+        self.assertEqual(b''.join(stream_json([], key='rows')), b'{"rows":[]}')
+
+
+class CompressionMiddlewareTests(TestCase):
+    """Tests for negotiated API response compression."""
+
+    def setUp(self):
+        creator = User.objects.create_user(username='creator', password='testpass123')
+        for index in range(5):
+            Game.objects.create(
+                name=f'Game {index}', location='Lagos Sports Complex', coin_price=500, total_slots=22,
+                date_time=timezone.now() + timedelta(days=1 + index), created_by=creator
+            )
+
+    def test_gzip_for_json(self):
+        response = self.client.get('/api/games/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(json.loads(gzip.decompress(response.content))['count'], 5)
+
+    @unittest.skipIf(brotli is None, 'brotli is not installed')
+    def test_brotli_preferred_when_accepted(self):
+        response = self.client.get('/api/games/', HTTP_ACCEPT_ENCODING='gzip, deflate, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(json.loads(brotli.decompress(response.content))['count'], 5)
+
+    @unittest.skipIf(brotli is None, 'brotli is not installed')
+    def test_streamed_json_is_compressed_chunk_by_chunk(self):
+        user = User.objects.create_user(username='player', password='testpass123')
+        token = RefreshToken.for_user(user).access_token
+        response = self.client.get(
+            '/api/subscriptions/history/', HTTP_ACCEPT_ENCODING='br', HTTP_AUTHORIZATION=f'Bearer {token}'
+        )
+        self.assertEqual(response['Content-Encoding'], 'br')
+        body = brotli.decompress(b''.join(response.streaming_content))
+        self.assertEqual(json.loads(body)['subscription_history'], [])
+
+    @override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+    def test_small_and_non_json_responses_untouched(self):
+        self.assertFalse(self.client.get('/ping/', HTTP_ACCEPT_ENCODING='gzip').has_header('Content-Encoding'))
+        response = self.client.get('/admin/login/', HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+
+def throttle_rates(anon='', user=''):
+    return override_settings(REST_FRAMEWORK={
+        **settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {'anon': anon, 'user': user},
+    })
+
+
+class TokenBucketThrottleTests(TestCase):
+    """Tests for the shared token-bucket throttles."""
+
+    def test_bucket_bursts_then_refills(self):
+        self.assertEqual([take_token('bucket', 1.0, 2, now=100) for _ in range(2)], [0, 0])
+        self.assertAlmostEqual(take_token('bucket', 1.0, 2, now=100), 1.0)
+        self.assertAlmostEqual(take_token('bucket', 1.0, 2, now=100.5), 0.5)
+        self.assertEqual(take_token('bucket', 1.0, 2, now=101), 0)
+
+    @throttle_rates(anon='3/min')
+    def test_anonymous_requests_limited_per_ip(self):
+        statuses = [self.client.get('/api/games/').status_code for _ in range(4)]
+        self.assertEqual(statuses, [200, 200, 200, 429])
+        self.assertIn('Retry-After', self.client.get('/api/games/'))
+        self.assertEqual(self.client.get('/api/games/', REMOTE_ADDR='10.0.0.2').status_code, 200)
+
+    @throttle_rates(user='2/min')
+    def test_users_have_their_own_buckets(self):
+        first, second = APIClient(), APIClient()
+        first.force_authenticate(User.objects.create_user(username='first', password='testpass123'))
+        second.force_authenticate(User.objects.create_user(username='second', password='testpass123'))
+
+        self.assertEqual([first.get('/api/games/').status_code for _ in range(3)], [200, 200, 429])
+        self.assertEqual(second.get('/api/games/').status_code, 200)
+        self.assertEqual(self.client.get('/api/games/').status_code, 200)
+
+    @throttle_rates(anon='1/min')
+    @override_settings(PAYSTACK_SECRET_KEY='sk_test_webhook')
+    def test_webhook_and_ping_not_throttled(self):
+        statuses = [self.client.post('/api/payments/webhook/', {}, content_type='application/json').status_code for _ in range(3)]
+        self.assertEqual(statuses, [400, 400, 400])
+        self.assertEqual([self.client.get('/ping/').status_code for _ in range(3)], [200, 200, 200])
+
+
+class SingleFlightTests(SimpleTestCase):
+    """Tests for coalescing concurrent cache misses."""
+
+    def run_concurrently(self, compute, callers=8):
+        results, errors = [], []
+        start = threading.Barrier(callers)
+
+        def call():
+            start.wait()
+            try:
+                results.append(single_flight('flight', compute, 60))
+            except Exception as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=call) for _ in range(callers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results, errors
+
+    def test_concurrent_misses_compute_once(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.1)
+            return {'games': [1, 2, 3]}
+
+        results, errors = self.run_concurrently(compute)
+        self.assertEqual((len(calls), errors), (1, []))
+        self.assertEqual(len(results), 8)
+        self.assertTrue(all(result is results[0] for result in results))
+        self.assertEqual(single_flight('flight', compute, 60), {'games': [1, 2, 3]})
+        self.assertEqual(len(calls), 1)
+
+    def test_errors_are_shared_but_not_cached(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.1)
+            raise ValueError('database unavailable')
+
+        results, errors = self.run_concurrently(compute)
+        self.assertEqual((len(calls), results), (1, []))
+        self.assertEqual(len(errors), 8)
+        self.assertEqual(single_flight('flight', lambda: 'recovered', 60), 'recovered')
+
+
+class LocalBrokerTests(SimpleTestCase):
+    """Tests for the in-process event broker."""
+
+    def test_subscribers_get_the_latest_message_per_key(self):
+        async def scenario():
+            broker = LocalBroker()
+            games = broker.subscribe(['games'])
+            one_game = broker.subscribe(['games.1'])
+            broker.publish(['games', 'games.1'], 1, 'first')
+            broker.publish(['games', 'games.1'], 1, 'second')
+            broker.publish(['games', 'games.2'], 2, 'other game')
+            return await games.get(1), await one_game.get(1), await one_game.get(0.01)
+
+        games, one_game, idle = asyncio.run(scenario())
+        self.assertEqual(sorted(games), ['other game', 'second'])
+        self.assertEqual((one_game, idle), (['second'], []))
+
+    def test_publishing_from_another_thread(self):
+        async def scenario():
+            broker = LocalBroker()
+            subscription = broker.subscribe(['games'])
+            thread = threading.Thread(target=broker.publish, args=(['games'], 1, 'booked'))
+            thread.start()
+            messages = await subscription.get(5)
+            thread.join()
+            return messages
+
+        self.assertEqual(asyncio.run(scenario()), ['booked'])
+
+    def test_close_unsubscribes_and_wakes_the_reader(self):
+        async def scenario():
+            broker = LocalBroker()
+            subscription = broker.subscribe(['games'])
+            reader = asyncio.create_task(subscription.get(60))
+            await asyncio.sleep(0)
+            subscription.close()
+            subscription.close()
+            return await reader, subscription.closed, broker.has_subscribers()
+
+        self.assertEqual(asyncio.run(scenario()), ([], True, False))
+
+
+class ReferenceTests(SimpleTestCase):
+    """Tests for the time-ordered reference generator."""
+
+    def test_references_are_distinct_and_time_ordered(self):
+        references = new_references('BK', 5000) + [new_reference('BK')]
+        self.assertEqual(len(set(references)), len(references))
+        self.assertEqual(references, sorted(references))
+        self.assertTrue(all(len(reference) == 17 for reference in references))
+        self.assertTrue(all(is_valid_reference(reference, 'BK') for reference in references))
+
+    def test_check_character_catches_typos(self):
+        reference = new_reference('BK')
+        body = reference[3:]
+        for i in range(len(body) - 1):
+            swapped = body[:i] + body[i + 1] + body[i] + body[i + 2:]
+            # Like any Luhn check, it misses swapping the first and last symbols
+            if swapped != body and {body[i], body[i + 1]} != {'0', 'Z'}:
+                self.assertFalse(is_valid_reference(f'BK-{swapped}', 'BK'))
+            for char in '0123456789ABCDEFGHJKMNPQRSTVWXYZ':
+                if char != body[i]:
+                    self.assertFalse(is_valid_reference(f'BK-{body[:i]}{char}{body[i + 1:]}', 'BK'))
+        self.assertFalse(is_valid_reference(reference, 'TX'))
+
+    def test_normalize_fixes_look_alikes(self):
+        reference = new_reference('BK')
+        typed = ' ' + reference.lower().replace('1', 'l').replace('0', 'o') + ' '
+        self.assertEqual(normalize_reference(typed), reference)
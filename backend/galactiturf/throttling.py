@@ -0,0 +1,125 @@
+"""
+Token-bucket throttles kept in the shared cache.
+
+A rate of ``N/period`` is a bucket holding up to N tokens that refills
+evenly over the period, so a client can burst N requests at once (the
+wake-up helper fires several on every page load) and is then limited to
+the steady rate. Buckets live in the default cache, so with ``REDIS_URL``
+set every worker shares them.
+
+Each bucket is stored as one timestamp, the time at which it will be full
+again (GCRA, which behaves exactly like a token bucket). On Redis the
+check and update run as a single Lua script, so concurrent workers can't
+both spend the last token. Other cache backends read and write the value
+under a process lock, which is exact for the per-process local-memory
+cache and close enough elsewhere.
+"""
+import math
+import threading
+import time
+
+from django.core.cache import cache
+from django.core.cache.backends.redis import RedisCache
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+# KEYS[1]: bucket key. ARGV: now, seconds per token, seconds of burst.
+# Returns the seconds to wait, or '0' after taking a token.
+TAKE_TOKEN_SCRIPT = """
+local now = tonumber(ARGV[1])
+local interval = tonumber(ARGV[2])
+local burst = tonumber(ARGV[3])
+local full_at = tonumber(redis.call('GET', KEYS[1]) or ARGV[1])
+if full_at < now then full_at = now end
+full_at = full_at + interval
+if full_at - now > burst then
+    return tostring(full_at - now - burst)
+end
+redis.call('SET', KEYS[1], tostring(full_at), 'PX', math.ceil((full_at - now) * 1000))
+return '0'
+"""
+
+_local_lock = threading.Lock()
+
+
+def parse_rate(rate):
+    """Turn ``'120/min'`` into (seconds per token, bucket size)."""
+    count, period = rate.split('/')
+    count = int(count)
+    return PERIODS[period[0]] / count, count
+
+
+def take_token(key, interval, size, now=None):
+    """Take a token from a bucket; return 0, or the seconds until one is free."""
+    now = time.time() if now is None else now
+    burst = interval * size
+
+    if isinstance(cache, RedisCache):
+        key = cache.make_and_validate_key(key)
+        client = cache._cache.get_client(key, write=True)
+        return float(client.eval(TAKE_TOKEN_SCRIPT, 1, key, now, interval, burst))
+
+    with _local_lock:
+        full_at = max(cache.get(key, now), now) + interval
+        if full_at - now > burst:
+            return full_at - now - burst
+        cache.set(key, full_at, math.ceil(full_at - now))
+    return 0
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Throttle that spends one token per request from a shared bucket.
+
+    The rate for ``scope`` comes from ``DEFAULT_THROTTLE_RATES``; an empty
+    rate turns the throttle off.
+    """
+
+    scope = None
+
+    def __init__(self):
+        self.wait_seconds = None
+
+    def get_cache_key(self, request, view):
+        """Return the bucket for this request, or None to leave it unthrottled."""
+        raise NotImplementedError('.get_cache_key() must be overridden')
+
+    def allow_request(self, request, view):
+        # Read on every request so override_settings applies in tests
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+        if not rate:
+            return True
+        key = self.get_cache_key(request, view)
+        if key is None:
+            return True
+
+        interval, size = parse_rate(rate)
+        self.wait_seconds = take_token(f'throttle:{self.scope}:{key}', interval, size)
+        return not self.wait_seconds
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class AnonTokenBucketThrottle(TokenBucketThrottle):
+    """Per-IP bucket for anonymous requests."""
+
+    scope = 'anon'
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return None
+        return self.get_ident(request)
+
+
+class UserTokenBucketThrottle(TokenBucketThrottle):
+    """Per-user bucket for authenticated requests."""
+
+    scope = 'user'
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return request.user.pk
+        return None
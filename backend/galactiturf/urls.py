@@ -27,6 +27,7 @@ urlpatterns = [
     path('api/games/', include('games.urls')),
     path('api/subscriptions/', include('subscriptions.urls')),
     path('api/payments/', include('payments.urls')),
+    path('api/reports/', include('reports.urls')),
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('health/', views.health_check, name='health_check'),
     path('ping/', views.ping, name='ping'),
@@ -45,6 +45,9 @@ def health_check(request):
 def ping(request):
     """
     Simple ping endpoint for quick health checks.
+    
+    A plain Django view, so the API throttles never apply: uptime checks
+    and the frontend's wake-up helper can ping it as often as they like.
     """
     return JsonResponse({
         'pong': timezone.now().isoformat(),
@@ -1,5 +1,32 @@
-from django.contrib import admin
-from .models import Game, Booking
+from collections import Counter
+
+from django.contrib import admin, messages
+from galactiturf.admin_exports import JSONExportMixin
+from galactiturf.admin_search import IndexedSearchMixin
+from galactiturf.pagination import EstimatedCountPaginator
+from .models import Game, GameSeries, Booking, BookingArchive, SlotHold, Venue, WaitlistEntry, SchedulerCheckpoint, normalize_reference
+from .refunds import cancel_game
+from .series import materialize
+from .venues import normalize_venue_name
+
+
+@admin.register(Venue)
+class VenueAdmin(admin.ModelAdmin):
+    """Admin configuration for Venue model."""
+    
+    list_display = ['name', 'latitude', 'longitude', 'capacity', 'created_at']
+    # Prefix search, served on PostgreSQL by the index of migration 0014
+    search_fields = ['^normalized_name']
+    ordering = ['normalized_name']
+    readonly_fields = ['normalized_name', 'created_at']
+    
+    def get_search_results(self, request, queryset, search_term):
+        # Searches match the folded name, so spelling and case don't matter
+        return super().get_search_results(request, queryset, normalize_venue_name(search_term))
+    
+    def save_model(self, request, obj, form, change):
+        obj.normalized_name = normalize_venue_name(obj.name)
+        super().save_model(request, obj, form, change)
 
 
 @admin.register(Game)
@@ -7,17 +34,24 @@ class GameAdmin(admin.ModelAdmin):
     """Admin configuration for Game model."""
     
     list_display = ['name', 'location', 'date_time', 'coin_price', 'total_slots', 'booked_slots', 'available_slots', 'status', 'created_by']
-    list_filter = ['status', 'date_time', 'created_by']
-    search_fields = ['name', 'location', 'description']
+    list_filter = ['status', 'date_time']
+    list_select_related = ['created_by']
+    # Prefix searches, served on PostgreSQL by the indexes of migration 0014
+    search_fields = ['^name', '^location']
+    raw_id_fields = ['created_by']
+    autocomplete_fields = ['venue']
     ordering = ['date_time']
-    readonly_fields = ['created_at', 'updated_at']
+    readonly_fields = ['held_slots', 'series', 'occurrence', 'created_at', 'updated_at']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ['cancel_and_refund']
     
     fieldsets = (
         ('Basic Information', {
-            'fields': ('name', 'location', 'description')
+            'fields': ('name', 'location', 'venue', 'description', 'series', 'occurrence')
         }),
         ('Game Details', {
-            'fields': ('date_time', 'coin_price', 'total_slots', 'booked_slots', 'status')
+            'fields': ('date_time', 'coin_price', 'total_slots', 'booked_slots', 'held_slots', 'status')
         }),
         ('Metadata', {
             'fields': ('created_by', 'created_at', 'updated_at'),
@@ -29,21 +63,104 @@ class GameAdmin(admin.ModelAdmin):
         """Display available slots."""
         return obj.available_slots
     available_slots.short_description = 'Available Slots'
+    
+    @admin.action(description='Cancel selected games and refund bookings')
+    def cancel_and_refund(self, request, queryset):
+        """Cancel games and refund all confirmed bookings in bulk."""
+        cancelled, bookings, coins = 0, 0, 0
+        for game_id in queryset.values_list('pk', flat=True):
+            result = cancel_game(game_id)
+            if result is not None:
+                cancelled += 1
+                bookings += result[0]
+                coins += result[1]
+        
+        self.message_user(
+            request,
+            f'Cancelled {cancelled} games and refunded {coins} coins across {bookings} bookings.',
+            messages.SUCCESS
+        )
+
+
+@admin.register(GameSeries)
+class GameSeriesAdmin(admin.ModelAdmin):
+    """Admin configuration for GameSeries model."""
+    
+    list_display = ['name', 'location', 'frequency', 'interval', 'weekdays', 'start_time', 'start_date', 'end_date', 'is_active']
+    list_filter = ['is_active', 'frequency']
+    # Prefix searches, served on PostgreSQL by the indexes of migration 0014
+    search_fields = ['^name', '^location']
+    raw_id_fields = ['created_by']
+    autocomplete_fields = ['venue']
+    readonly_fields = ['created_at', 'updated_at']
+    actions = ['materialize_games']
+    
+    fieldsets = (
+        ('Game Template', {
+            'fields': ('name', 'location', 'venue', 'description', 'coin_price', 'total_slots')
+        }),
+        ('Recurrence', {
+            'fields': ('frequency', 'interval', 'weekdays', 'start_date', 'start_time', 'end_date', 'is_active')
+        }),
+        ('Metadata', {
+            'fields': ('created_by', 'created_at', 'updated_at'),
+            'classes': ('collapse',)
+        }),
+    )
+    
+    def save_model(self, request, obj, form, change):
+        """Save the series and bring its upcoming games in line with it."""
+        super().save_model(request, obj, form, change)
+        self.report(request, materialize(obj))
+    
+    @admin.action(description='Schedule upcoming games of selected series')
+    def materialize_games(self, request, queryset):
+        """Materialize the selected series now rather than at the next scheduled run."""
+        totals = Counter()
+        for series in queryset:
+            totals.update(materialize(series))
+        self.report(request, totals)
+    
+    def report(self, request, counts):
+        message = (
+            f"{counts['created']} games created, {counts['updated'] + counts['moved']} updated "
+            f"and {counts['cancelled']} cancelled."
+        )
+        if counts['kept']:
+            message += f" {counts['kept']} games no longer in the series have bookings; cancel them to refund."
+        self.message_user(request, message, messages.WARNING if counts['kept'] else messages.SUCCESS)
 
 
 @admin.register(Booking)
-class BookingAdmin(admin.ModelAdmin):
+class BookingAdmin(IndexedSearchMixin, JSONExportMixin, admin.ModelAdmin):
     """Admin configuration for Booking model."""
     
-    list_display = ['booking_reference', 'user', 'game', 'status', 'coins_paid', 'created_at']
+    list_display = ['booking_reference', 'user', 'game', 'status', 'slots', 'coins_paid', 'created_at']
     list_filter = ['status', 'created_at']
-    search_fields = ['booking_reference', 'user__username', 'game__name']
+    list_select_related = ['user', 'game']
+    # Terms starting with BK- search the reference index (see IndexedSearchMixin)
+    search_fields = ['=user__username']
+    reference_field = 'booking_reference'
+    autocomplete_fields = ['user', 'game']
     ordering = ['-created_at']
     readonly_fields = ['booking_reference', 'created_at', 'updated_at']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ['export_as_json']
+    export_fields = [
+        'id', 'booking_reference', 'user_id', 'user__username', 'game_id', 'game__name',
+        'status', 'slots', 'coins_paid', 'created_at', 'updated_at'
+    ]
+    
+    def normalize_reference(self, term):
+        return normalize_reference(term)
+    
+    def is_reference(self, term):
+        return term.upper().startswith('BK-')
     
     fieldsets = (
         ('Booking Information', {
-            'fields': ('booking_reference', 'user', 'game', 'status', 'coins_paid')
+            'fields': ('booking_reference', 'user', 'game', 'status', 'slots', 'coins_paid')
         }),
         ('Additional Information', {
             'fields': ('notes',)
@@ -53,3 +170,61 @@ class BookingAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
     )
+
+
+@admin.register(BookingArchive)
+class BookingArchiveAdmin(IndexedSearchMixin, admin.ModelAdmin):
+    """Admin configuration for BookingArchive model."""
+    
+    list_display = ['booking_reference', 'user', 'game', 'status', 'slots', 'coins_paid', 'created_at', 'archived_at']
+    list_filter = ['status']
+    list_select_related = ['user', 'game']
+    search_fields = ['=user__username']
+    reference_field = 'booking_reference'
+    ordering = ['-id']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    readonly_fields = [
+        'id', 'booking_reference', 'user', 'game', 'status', 'slots', 'coins_paid', 'notes',
+        'created_at', 'updated_at', 'archived_at',
+    ]
+    
+    def normalize_reference(self, term):
+        return normalize_reference(term)
+    
+    def is_reference(self, term):
+        return term.upper().startswith('BK-')
+
+
+@admin.register(SlotHold)
+class SlotHoldAdmin(admin.ModelAdmin):
+    """Admin configuration for SlotHold model."""
+    
+    list_display = ['game', 'user', 'slots', 'expires_at', 'created_at']
+    list_select_related = ['game', 'user']
+    raw_id_fields = ['game', 'user']
+    ordering = ['expires_at']
+    readonly_fields = ['token', 'created_at']
+
+
+@admin.register(WaitlistEntry)
+class WaitlistEntryAdmin(admin.ModelAdmin):
+    """Admin configuration for WaitlistEntry model."""
+    
+    list_display = ['user', 'game', 'status', 'created_at', 'resolved_at']
+    list_filter = ['status', 'created_at']
+    list_select_related = ['user', 'game']
+    search_fields = ['=user__username']
+    autocomplete_fields = ['user', 'game']
+    ordering = ['created_at']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    readonly_fields = ['created_at', 'resolved_at']
+
+
+@admin.register(SchedulerCheckpoint)
+class SchedulerCheckpointAdmin(admin.ModelAdmin):
+    """Admin configuration for SchedulerCheckpoint model."""
+    
+    list_display = ['name', 'phase', 'cursor', 'last_run_at', 'updated_at']
+    readonly_fields = ['name', 'phase', 'cursor', 'last_run_at', 'updated_at']
@@ -0,0 +1,25 @@
+"""
+Archiving bookings of long-finished games.
+
+Once a game is completed or cancelled its bookings never change again.
+``archive_bookings`` moves them into ``BookingArchive`` (see
+galactiturf.archive), so the live booking table, which every booking,
+cancellation and availability query reads, only holds recent games.
+Archived bookings still show in the user's booking list, detail, summary
+and reference lookups, and count in the reporting rollups.
+"""
+from galactiturf.archive import move_rows
+from .models import Booking, BookingArchive
+
+FINISHED_GAME_STATUSES = ['completed', 'cancelled']
+
+BOOKING_FIELDS = [
+    'id', 'user_id', 'game_id', 'status', 'slots', 'coins_paid', 'booking_reference',
+    'notes', 'created_at', 'updated_at',
+]
+
+
+def archive_bookings(before, batch_size=1000):
+    """Archive the bookings of finished games played before ``before``; return how many moved."""
+    finished = Booking.objects.filter(game__status__in=FINISHED_GAME_STATUSES, game__date_time__lt=before)
+    return move_rows(finished, BookingArchive, BOOKING_FIELDS, batch_size)
@@ -0,0 +1,191 @@
+"""
+Live slot availability over server-sent events.
+
+Code that changes a game's inventory or status calls ``slots_changed``.
+Once the transaction commits, the games' current ``available_slots`` and
+status are published as one ``slots`` event per game. The event goes to
+the catalogue topic (every game) and to that game's topic:
+
+    event: slots
+    data: {"game":12,"available_slots":3,"status":"upcoming"}
+
+Clients subscribe with EventSource to ``/api/games/events/`` (the
+catalogue) or ``/api/games/<id>/events/`` (one game). A stream opens with
+the current state (a ``snapshot`` event for the catalogue, a ``slots``
+event for one game), then relays changes as they happen, with a comment
+line every ``SLOT_EVENTS_HEARTBEAT_SECONDS`` to keep proxies from closing
+it.
+
+The streams are served by ``events_router``, a small ASGI app in front of
+Django, rather than by a Django view. Under Django 4.2 a streaming
+response holds a thread for as long as it is open and never learns that
+the client has left. Here an idle stream is a coroutine waiting on an
+event, and it ends as soon as the client disconnects.
+"""
+import asyncio
+import logging
+import re
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections, transaction
+
+from galactiturf.pubsub import get_broker
+from .models import Game
+
+logger = logging.getLogger(__name__)
+
+CATALOGUE_TOPIC = 'games'
+
+EVENTS_PATH = re.compile(r'^/api/games/(?:(?P<game>\d+)/)?events/$')
+
+# Milliseconds EventSource waits before reconnecting
+RECONNECT_MS = 1000
+
+try:
+    import orjson
+
+    def _dumps(data):
+        return orjson.dumps(data).decode()
+except ImportError:  # pragma: no cover - optional dependency
+    import json
+
+    def _dumps(data):
+        return json.dumps(data, separators=(',', ':'))
+
+
+def game_topic(game_id):
+    return f'games.{game_id}'
+
+
+def sse_event(event, data):
+    return f'event: {event}\ndata: {_dumps(data)}\n\n'
+
+
+def _availability(pk, total_slots, booked_slots, held_slots, status):
+    return {'game': pk, 'available_slots': max(total_slots - booked_slots - held_slots, 0), 'status': status}
+
+
+def availability_rows(game_ids=None):
+    """Current availability of the given games, or of every upcoming game."""
+    if game_ids is None:
+        games = Game.objects.filter(status='upcoming')
+    else:
+        games = Game.objects.filter(pk__in=game_ids)
+    return [
+        _availability(*row)
+        for row in games.order_by('pk').values_list('pk', 'total_slots', 'booked_slots', 'held_slots', 'status')
+    ]
+
+
+def publish_availability(game_ids):
+    """Publish the current availability of the given games."""
+    broker = get_broker()
+    if not broker.has_subscribers():
+        return
+    try:
+        for row in availability_rows(game_ids):
+            broker.publish([CATALOGUE_TOPIC, game_topic(row['game'])], row['game'], sse_event('slots', row))
+    except Exception:
+        # A lost event only delays the display; it must never fail the write
+        logger.exception('Could not publish slot availability for games %s', game_ids)
+
+
+def slots_changed(*game_ids):
+    """Publish the availability of these games once the current transaction commits."""
+    game_ids = list(game_ids)
+    transaction.on_commit(lambda: publish_availability(game_ids))
+
+
+def stream_snapshot(game_id=None):
+    """The opening event of a stream, or None if the game doesn't exist."""
+    try:
+        if game_id is None:
+            return sse_event('snapshot', {'games': availability_rows()})
+        rows = availability_rows([game_id])
+        return sse_event('slots', rows[0]) if rows else None
+    finally:
+        # Streams stay open for minutes; they must not hold a database connection meanwhile
+        connections.close_all()
+
+
+def _cors_headers(scope):
+    """The CORS headers django-cors-headers would add for this request's Origin."""
+    origin = dict(scope['headers']).get(b'origin', b'').decode('latin-1')
+    if origin not in settings.CORS_ALLOWED_ORIGINS:
+        return []
+    headers = [(b'access-control-allow-origin', origin.encode('latin-1')), (b'vary', b'origin')]
+    if settings.CORS_ALLOW_CREDENTIALS:
+        headers.append((b'access-control-allow-credentials', b'true'))
+    return headers
+
+
+async def _respond(send, status, body, headers=()):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json'), *headers],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def _close_on_disconnect(receive, subscription):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+    subscription.close()
+
+
+async def serve_events(scope, receive, send, game_id=None):
+    """Stream slot availability for the catalogue, or one game, until the client disconnects."""
+    cors = _cors_headers(scope)
+    if scope['method'] != 'GET':
+        body = b'{"detail":"Method not allowed."}'
+        return await _respond(send, 405, body, [(b'allow', b'GET'), *cors])
+
+    broker = get_broker()
+    if broker.subscriber_count() >= settings.SLOT_EVENTS_MAX_SUBSCRIBERS:
+        body = b'{"error":"Too many live updates are open. Please try again shortly."}'
+        return await _respond(send, 503, body, [(b'retry-after', b'5'), *cors])
+
+    # Subscribe before reading the snapshot, so no change can fall between the two
+    subscription = broker.subscribe([CATALOGUE_TOPIC if game_id is None else game_topic(game_id)])
+    watcher = asyncio.create_task(_close_on_disconnect(receive, subscription))
+    try:
+        snapshot = await sync_to_async(stream_snapshot, thread_sensitive=False)(game_id)
+        if snapshot is None:
+            return await _respond(send, 404, b'{"detail":"Not found."}', cors)
+
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [
+                (b'content-type', b'text/event-stream'),
+                (b'cache-control', b'no-cache'),
+                (b'x-content-type-options', b'nosniff'),
+                # Stop nginx-style proxies from buffering the stream
+                (b'x-accel-buffering', b'no'),
+                *cors,
+            ],
+        })
+        chunk = f'retry: {RECONNECT_MS}\n\n{snapshot}'
+        while not subscription.closed:
+            await send({'type': 'http.response.body', 'body': chunk.encode(), 'more_body': True})
+            messages = await subscription.get(settings.SLOT_EVENTS_HEARTBEAT_SECONDS)
+            chunk = ''.join(messages) or ': keep-alive\n\n'
+    finally:
+        watcher.cancel()
+        subscription.close()
+
+
+def events_router(application):
+    """Wrap an ASGI application so the slot availability streams are served without Django's view stack."""
+
+    async def router(scope, receive, send):
+        if scope['type'] == 'http':
+            match = EVENTS_PATH.match(scope['path'])
+            if match:
+                game_id = match['game'] and int(match['game'])
+                return await serve_events(scope, receive, send, game_id)
+        return await application(scope, receive, send)
+
+    return router
@@ -0,0 +1,108 @@
+"""
+"Games near me" search over venue coordinates, without PostGIS.
+
+The globe is cut into a grid of ``GRID_DEGREES`` cells, numbered row by
+row, and each venue stores the number of the cell it lies in
+(``Venue.grid_cell``, indexed together with its coordinates). A search
+for games within ``radius`` km of a point then runs as:
+
+1. a bounding-box prefilter in SQL: the box around the circle covers a
+   few rows of cells, and each row is one contiguous ``grid_cell`` range,
+   so the index answers it with one range scan per row, before the exact
+   latitude/longitude bounds trim the corners;
+2. the exact great-circle (haversine) distance from the point to each
+   candidate venue, computed in Python. There are only as many candidates
+   as venues in the box, however many games they host;
+3. one query for the upcoming games at the venues within the radius,
+   soonest first, through the (venue, status, date_time) index.
+
+The same SQL runs on SQLite and PostgreSQL.
+"""
+import math
+
+from django.db.models import Q
+
+from .models import Venue
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+# About 11 km north to south; a 10 km search touches 3 rows of cells
+GRID_DEGREES = 0.1
+GRID_ROWS = round(180 / GRID_DEGREES)
+GRID_COLUMNS = round(360 / GRID_DEGREES)
+
+MAX_RADIUS_KM = 100
+
+
+def _row(latitude):
+    return min(math.floor((latitude + 90) / GRID_DEGREES), GRID_ROWS - 1)
+
+
+def _column(longitude):
+    return math.floor((longitude + 180) / GRID_DEGREES) % GRID_COLUMNS
+
+
+def grid_cell(latitude, longitude):
+    """The number of the grid cell a point lies in."""
+    return _row(latitude) * GRID_COLUMNS + _column(longitude)
+
+
+def bounding_box(latitude, longitude, radius_km):
+    """
+    The box around a circle: (south, north, longitude ranges).
+
+    There are two longitude ranges when the box crosses the antimeridian,
+    and one covering every longitude when it reaches a pole.
+    """
+    spread = radius_km / KM_PER_DEGREE
+    south, north = max(latitude - spread, -90.0), min(latitude + spread, 90.0)
+    # Meridians converge, so a km spans the most longitude at the box's edge nearest a pole
+    widest = max(abs(south), abs(north))
+    if widest >= 90 or spread / math.cos(math.radians(widest)) >= 180:
+        return south, north, [(-180.0, 180.0)]
+    width = spread / math.cos(math.radians(widest))
+    west, east = longitude - width, longitude + width
+    if west < -180:
+        return south, north, [(west + 360, 180.0), (-180.0, east)]
+    if east > 180:
+        return south, north, [(west, 180.0), (-180.0, east - 360)]
+    return south, north, [(west, east)]
+
+
+def cell_ranges(south, north, longitude_ranges):
+    """The [first, last] grid_cell ranges covering a box, one per row of cells and longitude range."""
+    ranges = []
+    for row in range(_row(south), _row(north) + 1):
+        for west, east in longitude_ranges:
+            first, last = _column(west), _column(min(east, 180 - GRID_DEGREES / 2))
+            ranges.append((row * GRID_COLUMNS + first, row * GRID_COLUMNS + last))
+    return ranges
+
+
+def haversine_km(latitude, longitude, other_latitude, other_longitude):
+    """Great-circle distance between two points in km."""
+    phi, other_phi = math.radians(latitude), math.radians(other_latitude)
+    half_dphi = (other_phi - phi) / 2
+    half_dlambda = math.radians(other_longitude - longitude) / 2
+    a = math.sin(half_dphi) ** 2 + math.cos(phi) * math.cos(other_phi) * math.sin(half_dlambda) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def venues_within(latitude, longitude, radius_km):
+    """{venue_id: distance in km} for the venues within radius_km of a point."""
+    south, north, longitude_ranges = bounding_box(latitude, longitude, radius_km)
+    in_box = Q()
+    for first, last in cell_ranges(south, north, longitude_ranges):
+        in_box |= Q(grid_cell__range=(first, last))
+    longitudes = Q()
+    for west, east in longitude_ranges:
+        longitudes |= Q(longitude__range=(west, east))
+    candidates = Venue.objects.filter(in_box, longitudes, latitude__range=(south, north))
+
+    within = {}
+    for venue_id, venue_latitude, venue_longitude in candidates.values_list('pk', 'latitude', 'longitude'):
+        km = haversine_km(latitude, longitude, venue_latitude, venue_longitude)
+        if km <= radius_km:
+            within[venue_id] = km
+    return within
@@ -0,0 +1,181 @@
+"""
+Short-lived slot holds for checkout.
+
+A hold reserves slots in a game for ``SLOT_HOLD_SECONDS`` while the user
+checks out, then is confirmed into a booking or lapses. During a rush the
+last slots go to whoever reserved them first, instead of failing for
+everyone but the fastest payer.
+
+``Game.held_slots`` counts the slots of holds not yet released, so
+``available_slots`` accounts for holds without a query. Holds are rows
+(the durable store), mirrored into the cache under their token so clients
+can poll a hold's countdown without touching the database; a cache miss
+falls back to the row.
+
+Expired holds are released lazily, when a game runs short of slots, and
+in batches by ``release_expired_holds`` (the ``expire_slot_holds``
+command). A full game takes waiters even when it is only full because of
+holds, so slots given back by a release or a lapse go to the waitlist
+first, once the release commits. Every change to a game's holds happens
+under its row lock, so a hold is released or confirmed exactly once.
+"""
+import secrets
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, F, Sum, Value, When
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import Booking, BookingError, Game, SlotHold, WaitlistEntry, promote_waitlist_safely, publish_slots
+
+
+def cache_key(token):
+    return f'hold:{token}'
+
+
+def hold_data(hold):
+    """The cached (and returned) representation of a hold."""
+    return {
+        'token': hold.token,
+        'user': hold.user_id,
+        'game': hold.game_id,
+        'slots': hold.slots,
+        'expires_at': hold.expires_at.isoformat(),
+    }
+
+
+def _cache_hold(hold):
+    seconds = (hold.expires_at - timezone.now()).total_seconds()
+    if seconds > 0:
+        cache.set(cache_key(hold.token), hold_data(hold), seconds)
+
+
+def get_hold(token):
+    """Return an unexpired hold's data, from the cache when possible, or None."""
+    data = cache.get(cache_key(token))
+    if data is None:
+        hold = SlotHold.objects.filter(token=token, expires_at__gt=timezone.now()).first()
+        if hold is None:
+            return None
+        data = hold_data(hold)
+        _cache_hold(hold)
+    return data
+
+
+def hold_slots(user, game, slots=1):
+    """Reserve slots in a game for a user until ``SLOT_HOLD_SECONDS`` from now."""
+    now = timezone.now()
+    with transaction.atomic():
+        game = Game.objects.select_for_update().get(pk=game.pk)
+        if not game.is_upcoming:
+            raise BookingError("This game is not available for booking.")
+        if Booking.objects.filter(user=user, game=game, status='confirmed').exists():
+            raise BookingError("You already have a booking for this game.")
+        if game.held_slots:
+            # Also frees the user's own lapsed hold, so they can hold again
+            game.held_slots -= release_expired_holds([game.pk], now).get(game.pk, 0)
+        if SlotHold.objects.filter(user=user, game=game).exists():
+            raise BookingError("You already hold slots in this game.")
+        if game.available_slots < slots:
+            raise BookingError("Not enough slots left in this game.")
+        if not user.has_sufficient_coins(game.coin_price * slots):
+            raise BookingError("Insufficient coins to book this game.")
+
+        hold = SlotHold.objects.create(
+            token=secrets.token_urlsafe(16),
+            user=user,
+            game=game,
+            slots=slots,
+            expires_at=now + timedelta(seconds=settings.SLOT_HOLD_SECONDS),
+        )
+        Game.objects.filter(pk=game.pk).update(held_slots=F('held_slots') + slots, updated_at=now)
+        game.held_slots += slots
+        publish_slots(game.pk)
+        transaction.on_commit(lambda: _cache_hold(hold))
+    return hold
+
+
+def _claim(user, token, now):
+    """Lock the hold's game and delete the hold; return the hold, or None if it is gone or expired."""
+    hold = SlotHold.objects.filter(token=token, user=user).first()
+    if hold is None:
+        return None
+    # Lock the game first: releases of expired holds take the same lock
+    Game.objects.select_for_update().filter(pk=hold.game_id).first()
+    deleted, _ = SlotHold.objects.filter(pk=hold.pk, expires_at__gt=now).delete()
+    transaction.on_commit(lambda: cache.delete(cache_key(token)))
+    return hold if deleted else None
+
+
+def confirm_hold(user, token, notes=''):
+    """Turn a user's hold into a booking and deduct the coins."""
+    with transaction.atomic():
+        hold = _claim(user, token, timezone.now())
+        if hold is None:
+            raise BookingError("This hold has expired. Please try booking again.")
+        return Booking.book(user, hold.game, slots=hold.slots, notes=notes, hold=hold)
+
+
+def release_hold(user, token):
+    """Give a user's held slots back to the game; return whether there was a hold."""
+    with transaction.atomic():
+        hold = _claim(user, token, timezone.now())
+        if hold is None:
+            return False
+        Game.objects.filter(pk=hold.game_id).update(
+            held_slots=Greatest(F('held_slots') - hold.slots, 0), updated_at=timezone.now()
+        )
+        publish_slots(hold.game_id)
+        promote_waitlists([hold.game_id])
+    return True
+
+
+def release_expired_holds(game_ids, now=None):
+    """
+    Give the slots of the given games' expired holds back.
+
+    Runs a fixed number of queries for any number of games and holds.
+    Returns {game_id: slots released}.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        list(Game.objects.select_for_update().filter(pk__in=game_ids).order_by('pk').values_list('pk', flat=True))
+        expired = SlotHold.objects.filter(game_id__in=game_ids, expires_at__lte=now)
+        released = dict(expired.order_by().values_list('game_id').annotate(slots=Sum('slots')))
+        if not released:
+            return {}
+        expired.delete()
+        Game.objects.filter(pk__in=released).update(
+            held_slots=Greatest(
+                F('held_slots') - Case(*(When(pk=pk, then=Value(slots)) for pk, slots in released.items())),
+                0,
+            ),
+            updated_at=now,
+        )
+        publish_slots(*released)
+        promote_waitlists(released)
+    return released
+
+
+def promote_waitlists(game_ids):
+    """Offer the slots given back in these games to their waitlists once the transaction commits."""
+    waiting = WaitlistEntry.objects.filter(game_id__in=game_ids, status='waiting')
+    for game_id in waiting.order_by('game_id').values_list('game_id', flat=True).distinct():
+        transaction.on_commit(lambda game_id=game_id: promote_waitlist_safely(game_id))
+
+
+def sweep_expired_holds(batch_size=500, now=None):
+    """Release every expired hold, ``batch_size`` games per transaction; return the slots released."""
+    now = now or timezone.now()
+    total = 0
+    while True:
+        game_ids = list(
+            SlotHold.objects.filter(expires_at__lte=now)
+            .order_by().values_list('game_id', flat=True).distinct()[:batch_size]
+        )
+        if not game_ids:
+            return total
+        total += sum(release_expired_holds(game_ids, now).values())
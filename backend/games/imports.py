@@ -0,0 +1,206 @@
+"""
+Bulk import of games from CSV or JSON.
+
+``GameCreateSerializer`` validates and saves one game per request, with a
+venue lookup, an INSERT and a slot publish each. An import of thousands
+of games instead:
+
+1. reads every row (``read_rows``): CSV with a header row, or a JSON list
+   of objects, with the fields ``GameCreateSerializer`` takes;
+2. validates all of them in one pass (``validate_rows``). Each column is
+   parsed and checked row by row in Python, but the database is only
+   asked in bulk: venue capacities in one query, and duplicates of
+   existing games (same name, location and kick-off) in one query per
+   chunk of rows. Duplicates within the file are caught too;
+3. inserts the valid rows with ``bulk_create`` in chunks, all in one
+   transaction, and matches the venues of just those games with
+   ``assign_venues``.
+
+A bad row never stops the others. It is reported with its row number
+(the first game is row 1, whatever the format) and its errors per field,
+in the shape DRF uses.
+"""
+import csv
+import io
+import json
+import re
+from collections import namedtuple
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Game, Venue, publish_slots
+from .venues import assign_venues, normalize_venue_name
+
+FIELDS = ['name', 'location', 'date_time', 'coin_price', 'total_slots', 'description']
+TEXT_LIMITS = {'name': 200, 'location': 200}
+
+# Rows per import, rows per INSERT and per duplicate lookup
+MAX_ROWS = 10000
+IMPORT_CHUNK = 1000
+
+WHOLE_NUMBER = re.compile(r'^-?\d+$')
+
+# Range of the IntegerField columns the numbers are stored in
+MAX_INTEGER = 2147483647
+
+ImportResult = namedtuple('ImportResult', ['created', 'errors'])
+
+
+class GameImportError(Exception):
+    """Raised for an import that can't be read as a list of games at all."""
+
+
+def read_rows(data, file_format):
+    """The games in a CSV or JSON import, as a list of dicts."""
+    if isinstance(data, bytes):
+        try:
+            data = data.decode('utf-8-sig')
+        except UnicodeDecodeError:
+            raise GameImportError('The file must be UTF-8 text.')
+    if file_format == 'csv':
+        return list(csv.DictReader(io.StringIO(data)))
+    if file_format == 'json':
+        try:
+            rows = json.loads(data)
+        except ValueError:
+            raise GameImportError('The file is not valid JSON.')
+        # Either a list of games, or {"games": [...]}
+        return check_rows(rows.get('games') if isinstance(rows, dict) else rows)
+    raise GameImportError(f'Unknown format {file_format!r}; use csv or json.')
+
+
+def check_rows(rows):
+    """Make sure an import is a list of objects, and not too long a one."""
+    if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+        raise GameImportError('Send a list of games, each an object.')
+    if len(rows) > MAX_ROWS:
+        raise GameImportError(f'Import at most {MAX_ROWS} games at a time.')
+    return rows
+
+
+def _whole_number(value):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    text = '' if value is None else str(value).strip()
+    if not WHOLE_NUMBER.match(text):
+        return None
+    try:
+        return int(text)
+    except ValueError:
+        # More digits than int() converts from a string
+        return None
+
+
+def _parse_date_time(value):
+    try:
+        parsed = parse_datetime(str(value or '').strip())
+    except ValueError:
+        return None
+    if parsed is not None and timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def validate_rows(rows, now=None):
+    """
+    Check every row of an import.
+
+    Returns (games, errors): the field values of each valid row, and a
+    ``{'row': n, 'errors': {field: [messages]}}`` entry per invalid one.
+    """
+    now = now or timezone.now()
+    problems = {}
+
+    def fail(index, field, message):
+        problems.setdefault(index, {}).setdefault(field, []).append(message)
+
+    games = [{} for _ in rows]
+    for field, limit in TEXT_LIMITS.items():
+        for index, row in enumerate(rows):
+            value = str(row.get(field) or '').strip()
+            if not value:
+                fail(index, field, 'This field is required.')
+            elif len(value) > limit:
+                fail(index, field, f'Ensure this field has no more than {limit} characters.')
+            games[index][field] = value
+
+    for index, row in enumerate(rows):
+        date_time = _parse_date_time(row.get('date_time'))
+        if date_time is None:
+            fail(index, 'date_time', 'Enter a date and time such as 2026-11-05T19:30:00+01:00.')
+        elif date_time <= now:
+            fail(index, 'date_time', 'Games must start in the future.')
+        games[index]['date_time'] = date_time
+
+    for field, least in [('coin_price', 0), ('total_slots', 1)]:
+        for index, row in enumerate(rows):
+            number = _whole_number(row.get(field))
+            if number is None:
+                fail(index, field, 'A whole number is required.')
+            elif number < least:
+                fail(index, field, f'Ensure this value is greater than or equal to {least}.')
+            elif number > MAX_INTEGER:
+                fail(index, field, f'Ensure this value is less than or equal to {MAX_INTEGER}.')
+            games[index][field] = number
+
+    for index, row in enumerate(rows):
+        games[index]['description'] = str(row.get('description') or '').strip()
+
+    # Venue capacities, for every location at once
+    venues = {index: normalize_venue_name(game['location']) for index, game in enumerate(games) if index not in problems}
+    capacities = dict(
+        Venue.objects.filter(normalized_name__in=set(venues.values()), capacity__isnull=False)
+        .values_list('normalized_name', 'capacity')
+    )
+    for index, venue in venues.items():
+        if venue in capacities and games[index]['total_slots'] > capacities[venue]:
+            fail(index, 'total_slots', f"{games[index]['location']} takes at most {capacities[venue]} players.")
+
+    # Duplicates within the file, then of existing games, a chunk of rows per query
+    first_row = {}
+    for index, game in enumerate(games):
+        if index not in problems:
+            key = (game['name'], game['location'], game['date_time'])
+            if key in first_row:
+                fail(index, 'non_field_errors', f'Same game as row {first_row[key] + 1}.')
+            else:
+                first_row[key] = index
+    keys = list(first_row)
+    for start in range(0, len(keys), IMPORT_CHUNK):
+        chunk = keys[start:start + IMPORT_CHUNK]
+        existing = set(
+            Game.objects.exclude(status='cancelled')
+            .filter(name__in={name for name, _, _ in chunk}, date_time__in={date_time for _, _, date_time in chunk})
+            .values_list('name', 'location', 'date_time')
+        )
+        for key in existing.intersection(chunk):
+            fail(first_row[key], 'non_field_errors', 'A game with this name, location and date_time already exists.')
+
+    errors = [{'row': index + 1, 'errors': problems[index]} for index in sorted(problems)]
+    return [game for index, game in enumerate(games) if index not in problems], errors
+
+
+def import_games(rows, created_by, chunk_size=IMPORT_CHUNK, dry_run=False):
+    """
+    Create a game for every valid row of an import, in one transaction.
+
+    Returns the number of games created (or, for a dry run, that would
+    be) and the errors of the rows left out.
+    """
+    games, errors = validate_rows(check_rows(rows))
+    if dry_run or not games:
+        return ImportResult(len(games), errors)
+
+    with transaction.atomic():
+        created = Game.objects.bulk_create(
+            [Game(created_by=created_by, **game) for game in games], batch_size=chunk_size
+        )
+        created_ids = [game.pk for game in created if game.pk is not None]
+        for start in range(0, len(created_ids), chunk_size):
+            assign_venues(Game.objects.filter(pk__in=created_ids[start:start + chunk_size]))
+        publish_slots(*created_ids)
+    return ImportResult(len(created), errors)
@@ -0,0 +1,85 @@
+"""
+Batch lifecycle transitions for games and their bookings.
+
+Every phase is a set-based UPDATE applied to primary-key chunks, each in
+its own short transaction, so no lock is held for longer than one chunk.
+Progress is checkpointed after every chunk. The predicates are
+idempotent, so an interrupted run resumes where it stopped and
+overlapping runs cannot double-apply a transition.
+"""
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Booking, Game, SchedulerCheckpoint, WaitlistEntry, publish_slots
+
+CHECKPOINT_NAME = 'game_lifecycle'
+
+
+def lifecycle_phases(now):
+    """Return (phase, queryset, changes) for each transition, in order."""
+    game_ends_before = now - timedelta(minutes=settings.GAME_DURATION_MINUTES)
+    return [
+        (
+            'start_games',
+            Game.objects.filter(status='upcoming', date_time__lte=now),
+            {'status': 'ongoing', 'updated_at': now},
+        ),
+        (
+            'complete_games',
+            Game.objects.filter(status='ongoing', date_time__lte=game_ends_before),
+            {'status': 'completed', 'updated_at': now},
+        ),
+        (
+            'complete_bookings',
+            Booking.objects.filter(status='confirmed', game__status='completed'),
+            {'status': 'completed', 'updated_at': now},
+        ),
+        (
+            'expire_waitlists',
+            WaitlistEntry.objects.filter(status='waiting').exclude(game__status='upcoming'),
+            {'status': 'lapsed', 'resolved_at': now},
+        ),
+    ]
+
+
+def advance_lifecycle(chunk_size=1000, pause=0.0, now=None, log=None):
+    """
+    Move games, bookings and waitlist entries through their lifecycle.
+
+    Returns a dict of rows updated per phase.
+    """
+    now = now or timezone.now()
+    checkpoint, _ = SchedulerCheckpoint.objects.get_or_create(name=CHECKPOINT_NAME)
+    totals = {}
+
+    for phase, queryset, changes in lifecycle_phases(now):
+        # Resume an interrupted phase from its last checkpointed key
+        cursor = checkpoint.cursor if checkpoint.phase == phase else 0
+        totals[phase] = 0
+
+        while True:
+            ids = list(
+                queryset.filter(pk__gt=cursor).order_by('pk').values_list('pk', flat=True)[:chunk_size]
+            )
+            if not ids:
+                break
+
+            with transaction.atomic():
+                updated = queryset.filter(pk__in=ids).update(**changes)
+                if queryset.model is Game:
+                    publish_slots(*ids)
+                cursor = ids[-1]
+                checkpoint.save_progress(phase, cursor)
+
+            totals[phase] += updated
+            if log:
+                log(f'{phase}: {totals[phase]} rows updated (up to id {cursor})')
+            if pause:
+                time.sleep(pause)
+
+    checkpoint.mark_completed(now)
+    return totals
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from games.lifecycle import advance_lifecycle
+
+
+class Command(BaseCommand):
+    help = 'Move games and bookings through upcoming -> ongoing -> completed (safe to run every minute)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Rows updated per transaction')
+        parser.add_argument('--pause', type=float, default=0.0, help='Seconds to sleep between chunks')
+
+    def handle(self, *args, **options):
+        totals = advance_lifecycle(
+            chunk_size=options['chunk_size'],
+            pause=options['pause'],
+            log=self.stdout.write if options['verbosity'] > 1 else None,
+        )
+
+        summary = ', '.join(f'{phase}: {count}' for phase, count in totals.items())
+        self.stdout.write(self.style.SUCCESS(f'Lifecycle advanced ({summary})'))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from games.models import Game
+from games.refunds import cancel_game
+
+
+class Command(BaseCommand):
+    help = 'Cancel games and refund every confirmed booking'
+
+    def add_arguments(self, parser):
+        parser.add_argument('game_ids', nargs='+', type=int, help='IDs of the games to cancel')
+
+    def handle(self, *args, **options):
+        for game_id in options['game_ids']:
+            try:
+                result = cancel_game(game_id)
+            except Game.DoesNotExist:
+                raise CommandError(f'Game {game_id} does not exist')
+
+            if result is None:
+                self.stdout.write(f'Game {game_id} is already cancelled or completed')
+                continue
+
+            bookings, coins = result
+            self.stdout.write(
+                self.style.SUCCESS(f'Cancelled game {game_id}: refunded {coins} coins across {bookings} bookings')
+            )
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from games.holds import sweep_expired_holds
+
+
+class Command(BaseCommand):
+    help = 'Return the slots of expired checkout holds to their games (safe to run every minute)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Games released per transaction')
+
+    def handle(self, *args, **options):
+        released = sweep_expired_holds(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Released {released} held slots'))
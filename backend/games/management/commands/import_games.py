@@ -0,0 +1,35 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import User
+from games.imports import IMPORT_CHUNK, GameImportError, import_games, read_rows
+
+
+class Command(BaseCommand):
+    help = 'Create games in bulk from a CSV or JSON file, reporting the rows that fail'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV file with a header row, or JSON list of games')
+        parser.add_argument('--format', dest='file_format', choices=['csv', 'json'], help='Defaults to the file extension')
+        parser.add_argument('--created-by', required=True, help='Username of the admin the games are created by')
+        parser.add_argument('--chunk-size', type=int, default=IMPORT_CHUNK, help='Games per INSERT')
+        parser.add_argument('--dry-run', action='store_true', help='Only validate the file')
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        try:
+            creator = User.objects.get(username=options['created_by'])
+        except User.DoesNotExist:
+            raise CommandError(f"No user named {options['created_by']!r}")
+        try:
+            rows = read_rows(path.read_bytes(), options['file_format'] or path.suffix.lstrip('.').lower())
+            result = import_games(rows, creator, chunk_size=options['chunk_size'], dry_run=options['dry_run'])
+        except (OSError, GameImportError) as e:
+            raise CommandError(str(e))
+
+        for error in result.errors:
+            for field, messages in error['errors'].items():
+                self.stderr.write(f"Row {error['row']}: {field}: {' '.join(messages)}")
+        verb = 'would be created' if options['dry_run'] else 'created'
+        self.stdout.write(self.style.SUCCESS(f'{result.created} games {verb}, {len(result.errors)} rows rejected'))
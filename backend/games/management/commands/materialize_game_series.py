@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from games.series import materialize_series
+
+
+class Command(BaseCommand):
+    help = 'Schedule the games of recurring series over the coming days (safe to run repeatedly)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None, help='Days ahead to schedule (default GAME_SERIES_HORIZON_DAYS)')
+
+    def handle(self, *args, **options):
+        totals = materialize_series(horizon_days=options['days'])
+
+        summary = ', '.join(f'{change}: {totals[change]}' for change in ['created', 'updated', 'moved', 'cancelled', 'kept'])
+        self.stdout.write(self.style.SUCCESS(f'Game series materialized ({summary})'))
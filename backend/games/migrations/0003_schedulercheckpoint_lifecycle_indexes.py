@@ -0,0 +1,32 @@
+# Generated by Django 4.2.7 on 2026-10-18 22:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0002_booking_slots_waitlistentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SchedulerCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Name of the scheduled job', max_length=50, unique=True)),
+                ('phase', models.CharField(blank=True, help_text='Phase the job was working on', max_length=50)),
+                ('cursor', models.BigIntegerField(default=0, help_text='Last primary key processed in the current phase')),
+                ('last_run_at', models.DateTimeField(blank=True, help_text='When the job last completed', null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['game', 'status'], name='games_booking_game_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='game',
+            index=models.Index(fields=['status', 'date_time'], name='games_game_status_date_idx'),
+        ),
+    ]
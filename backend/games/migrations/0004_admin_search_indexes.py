@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 22:55
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0003_schedulercheckpoint_lifecycle_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(django.db.models.functions.text.Upper('booking_reference'), name='games_booking_ref_upper'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 23:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0005_booking_export_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='game',
+            index=models.Index(fields=['updated_at'], name='games_game_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.7 on 2026-10-19 00:02
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('games', '0006_game_rollup_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='game',
+            name='held_slots',
+            field=models.IntegerField(default=0, help_text='Number of slots reserved by checkout holds'),
+        ),
+        migrations.CreateModel(
+            name='SlotHold',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(help_text='Secret the client confirms or releases the hold with', max_length=32, unique=True)),
+                ('slots', models.PositiveSmallIntegerField(default=1, help_text='Number of slots held')),
+                ('expires_at', models.DateTimeField(help_text='When the held slots return to the game')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('game', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='slot_holds', to='games.game')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='slot_holds', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['expires_at', 'game'], name='games_slothold_expiry_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='slothold',
+            constraint=models.UniqueConstraint(fields=('user', 'game'), name='games_slothold_one_per_user'),
+        ),
+    ]
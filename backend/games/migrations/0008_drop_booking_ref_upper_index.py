@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-19 00:12
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0007_slothold_game_held_slots'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='booking',
+            name='games_booking_ref_upper',
+        ),
+    ]
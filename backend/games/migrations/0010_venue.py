@@ -0,0 +1,39 @@
+# Generated by Django 4.2.7 on 2026-10-19 00:27
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0009_history_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Venue',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Display name of the venue', max_length=200)),
+                ('normalized_name', models.CharField(help_text='Name folded for matching locations', max_length=200, unique=True)),
+                ('latitude', models.FloatField(blank=True, null=True)),
+                ('longitude', models.FloatField(blank=True, null=True)),
+                ('capacity', models.PositiveIntegerField(blank=True, help_text='Most players a game here can take', null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='game',
+            name='venue',
+            field=models.ForeignKey(blank=True, help_text='Venue the location names; matched from the location when left empty', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='games', to='games.venue'),
+        ),
+        migrations.AddIndex(
+            model_name='game',
+            index=models.Index(fields=['venue', 'status', 'date_time'], name='games_game_venue_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='game',
+            index=models.Index(fields=['venue', 'updated_at'], name='games_game_venue_updated_idx'),
+        ),
+    ]
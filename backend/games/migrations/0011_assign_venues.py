@@ -0,0 +1,77 @@
+"""
+Create a Venue for each distinct Game.location and point the games at it.
+
+Location strings are folded as games.venues.normalize_venue_name does
+(copied here, so later changes to it can't change this migration), and
+spellings that fold together share one venue, named after the spelling
+most games use. The migration is not atomic: each batch of location
+strings commits on its own, and an interrupted run resumes with the games
+that still have no venue.
+"""
+import re
+import unicodedata
+
+from django.db import migrations, transaction
+from django.db.models import Case, Count, Value, When
+
+BATCH_SIZE = 500
+
+NON_WORD = re.compile(r'[\W_]+')
+
+
+def normalize(name):
+    text = unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode()
+    return NON_WORD.sub(' ', text).strip().casefold()
+
+
+def assign_venues(apps, schema_editor):
+    Game = apps.get_model('games', 'Game')
+    Venue = apps.get_model('games', 'Venue')
+    db = schema_editor.connection.alias
+
+    locations = list(
+        Game.objects.using(db).filter(venue__isnull=True).exclude(location='')
+        .values('location').annotate(games=Count('id')).order_by('-games', 'location')
+        .values_list('location', flat=True)
+    )
+    for start in range(0, len(locations), BATCH_SIZE):
+        batch = {location: normalize(location) for location in locations[start:start + BATCH_SIZE]}
+        spellings = {}
+        for location, normalized in batch.items():
+            if normalized:
+                spellings.setdefault(normalized, location.strip())
+
+        with transaction.atomic(using=db):
+            Venue.objects.using(db).bulk_create(
+                [Venue(name=name, normalized_name=normalized) for normalized, name in spellings.items()],
+                ignore_conflicts=True,
+            )
+            venue_ids = dict(
+                Venue.objects.using(db).filter(normalized_name__in=spellings).values_list('normalized_name', 'pk')
+            )
+            matched = {location: venue_ids[normalized] for location, normalized in batch.items() if normalized}
+            if matched:
+                Game.objects.using(db).filter(location__in=matched, venue__isnull=True).update(
+                    venue=Case(*(When(location=location, then=Value(pk)) for location, pk in matched.items()))
+                )
+
+
+def clear_venues(apps, schema_editor):
+    Game = apps.get_model('games', 'Game')
+    Venue = apps.get_model('games', 'Venue')
+    db = schema_editor.connection.alias
+    Game.objects.using(db).update(venue=None)
+    Venue.objects.using(db).all().delete()
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('games', '0010_venue'),
+    ]
+
+    operations = [
+        migrations.RunPython(assign_venues, clear_venues),
+    ]
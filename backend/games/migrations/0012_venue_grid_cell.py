@@ -0,0 +1,64 @@
+"""
+Add Venue.grid_cell, and place the venues that already have coordinates.
+
+The cell numbering is games.geo.grid_cell's, copied here so later changes
+to it can't change this migration. The migration is not atomic: each
+batch of venues commits on its own, and an interrupted run resumes with
+the venues still unplaced.
+"""
+import math
+
+from django.db import migrations, models, transaction
+
+BATCH_SIZE = 1000
+
+GRID_DEGREES = 0.1
+GRID_ROWS = round(180 / GRID_DEGREES)
+GRID_COLUMNS = round(360 / GRID_DEGREES)
+
+
+def grid_cell(latitude, longitude):
+    row = min(math.floor((latitude + 90) / GRID_DEGREES), GRID_ROWS - 1)
+    column = math.floor((longitude + 180) / GRID_DEGREES) % GRID_COLUMNS
+    return row * GRID_COLUMNS + column
+
+
+def place_venues(apps, schema_editor):
+    Venue = apps.get_model('games', 'Venue')
+    db = schema_editor.connection.alias
+
+    unplaced = Venue.objects.using(db).filter(
+        grid_cell__isnull=True, latitude__isnull=False, longitude__isnull=False
+    ).order_by('pk')
+    last_id = 0
+    while True:
+        venues = list(unplaced.filter(pk__gt=last_id).only('pk', 'latitude', 'longitude')[:BATCH_SIZE])
+        if not venues:
+            return
+        for venue in venues:
+            venue.grid_cell = grid_cell(venue.latitude, venue.longitude)
+        with transaction.atomic(using=db):
+            Venue.objects.using(db).bulk_update(venues, ['grid_cell'])
+        last_id = venues[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('games', '0011_assign_venues'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='venue',
+            name='grid_cell',
+            field=models.IntegerField(blank=True, help_text='Grid cell of the coordinates (see games.geo)', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='venue',
+            index=models.Index(fields=['grid_cell', 'latitude', 'longitude'], name='games_venue_grid_idx'),
+        ),
+        migrations.RunPython(place_venues, migrations.RunPython.noop),
+    ]
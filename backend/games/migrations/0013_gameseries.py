@@ -0,0 +1,63 @@
+# Generated by Django 4.2.7 on 2026-10-19 00:48
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('games', '0012_venue_grid_cell'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GameSeries',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text="Name of the series' games", max_length=200)),
+                ('location', models.CharField(help_text="Location of the series' games", max_length=200)),
+                ('description', models.TextField(blank=True, help_text="Description of the series' games")),
+                ('coin_price', models.IntegerField(help_text='Price in coins to book a game of the series')),
+                ('total_slots', models.IntegerField(help_text='Total number of slots in each game')),
+                ('frequency', models.CharField(choices=[('daily', 'Daily'), ('weekly', 'Weekly')], default='weekly', max_length=10)),
+                ('interval', models.PositiveSmallIntegerField(default=1, help_text='Every this many days or weeks')),
+                ('weekdays', models.CharField(blank=True, help_text="Days of a weekly series, such as MO,TH (the start date's day when empty)", max_length=20)),
+                ('start_date', models.DateField(help_text='Date of the first game')),
+                ('start_time', models.TimeField(help_text='Kick-off time of every game')),
+                ('end_date', models.DateField(blank=True, help_text='No games after this date', null=True)),
+                ('is_active', models.BooleanField(default=True, help_text='Inactive series stop scheduling games')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'game series',
+            },
+        ),
+        migrations.AddField(
+            model_name='game',
+            name='occurrence',
+            field=models.DateField(blank=True, help_text='Date of the series occurrence this game is', null=True),
+        ),
+        migrations.AddField(
+            model_name='gameseries',
+            name='created_by',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='created_series', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='gameseries',
+            name='venue',
+            field=models.ForeignKey(blank=True, help_text='Venue the location names; matched from the location when left empty', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='series', to='games.venue'),
+        ),
+        migrations.AddField(
+            model_name='game',
+            name='series',
+            field=models.ForeignKey(blank=True, help_text='Series this game was scheduled from', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='games', to='games.gameseries'),
+        ),
+        migrations.AddConstraint(
+            model_name='game',
+            constraint=models.UniqueConstraint(fields=('series', 'occurrence'), name='games_game_series_occurrence_uniq'),
+        ),
+    ]
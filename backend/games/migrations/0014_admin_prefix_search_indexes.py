@@ -0,0 +1,50 @@
+"""
+Indexes for the admin's ``^name``, ``^location`` and venue name searches.
+
+On PostgreSQL a ``^`` search runs ``UPPER(column::text) LIKE UPPER('term%')``.
+Only an index on that same expression, built with ``text_pattern_ops``,
+can answer it. Django can't declare such an index portably, because
+SQLite has no operator classes. So these indexes are created on
+PostgreSQL only, and CONCURRENTLY, so writes to games carry on while
+they build. On SQLite the migration does nothing.
+"""
+from django.db import migrations
+
+INDEXES = [
+    ('games_venue_name_prefix', 'games_venue', 'normalized_name'),
+    ('games_game_name_prefix', 'games_game', 'name'),
+    ('games_game_location_prefix', 'games_game', 'location'),
+    ('games_series_name_prefix', 'games_gameseries', 'name'),
+    ('games_series_location_prefix', 'games_gameseries', 'location'),
+]
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    quote = schema_editor.quote_name
+    for name, table, column in INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {quote(name)} '
+            f'ON {quote(table)} (UPPER({quote(column)}::text) text_pattern_ops)'
+        )
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _, _ in INDEXES:
+        schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {schema_editor.quote_name(name)}')
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('games', '0013_gameseries'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
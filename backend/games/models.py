@@ -1,8 +1,188 @@
-from django.db import models
+import logging
+import re
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, models, transaction
+from django.db.models import F, Q
+from django.db.models.functions import Greatest
 from django.conf import settings
+from django.utils import timezone
+
+from galactiturf.references import is_valid_reference, new_reference, new_references, normalize_reference
+
+logger = logging.getLogger(__name__)
+
+
+class BookingError(Exception):
+    """Raised when a booking cannot be made."""
+
+
+def publish_slots(*game_ids):
+    """Push the games' slot availability to live subscribers after commit."""
+    # games.availability imports this module, so it is imported here
+    from .availability import slots_changed
+    slots_changed(*game_ids)
+
+
+BOOKING_REFERENCE_PREFIX = 'BK'
+
+# Fresh references tried before a reference collision is given up on
+REFERENCE_ATTEMPTS = 3
+
+# References issued before galactiturf.references: BK- and 8 hex digits
+LEGACY_BOOKING_REFERENCE = re.compile(r'^BK-[0-9A-F]{8}$')
+
+
+def generate_booking_reference():
+    """Generate a new booking reference (see galactiturf.references)."""
+    return new_reference(BOOKING_REFERENCE_PREFIX)
+
+
+def generate_booking_references(count):
+    """Generate distinct booking references for a batch of bookings."""
+    return new_references(BOOKING_REFERENCE_PREFIX, count)
+
+
+def parse_booking_reference(reference):
+    """Normalize a typed booking reference, or return None if it can't be one."""
+    reference = normalize_reference(reference)
+    if LEGACY_BOOKING_REFERENCE.match(reference) or is_valid_reference(reference, BOOKING_REFERENCE_PREFIX):
+        return reference
+    return None
+
+
+def reference_taken(error, references):
+    """Whether an IntegrityError came from a booking reference that already exists."""
+    return isinstance(error, IntegrityError) and Booking.objects.filter(booking_reference__in=references).exists()
+
+
+class Venue(models.Model):
+    """Model for a place games are played (see games.venues)."""
+    
+    name = models.CharField(max_length=200, help_text="Display name of the venue")
+    normalized_name = models.CharField(max_length=200, unique=True, help_text="Name folded for matching locations")
+    latitude = models.FloatField(blank=True, null=True)
+    longitude = models.FloatField(blank=True, null=True)
+    capacity = models.PositiveIntegerField(blank=True, null=True, help_text="Most players a game here can take")
+    grid_cell = models.IntegerField(blank=True, null=True, help_text="Grid cell of the coordinates (see games.geo)")
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        indexes = [
+            # Covers the nearby search's bounding-box prefilter
+            models.Index(fields=['grid_cell', 'latitude', 'longitude'], name='games_venue_grid_idx'),
+        ]
+    
+    def __str__(self):
+        return self.name
+    
+    def save(self, *args, **kwargs):
+        """Save the venue, placing its coordinates in the search grid."""
+        from .geo import grid_cell
+        
+        if self.latitude is None or self.longitude is None:
+            self.grid_cell = None
+        else:
+            self.grid_cell = grid_cell(self.latitude, self.longitude)
+        super().save(*args, **kwargs)
+    
+    @classmethod
+    def for_location(cls, location):
+        """Return the venue a location string names, creating it if needed (None for a blank location)."""
+        from .venues import normalize_venue_name
+        
+        normalized = normalize_venue_name(location)
+        if not normalized:
+            return None
+        venue, _ = cls.objects.get_or_create(normalized_name=normalized, defaults={'name': location.strip()})
+        return venue
+
 
+class VenueMatchMixin:
+    """
+    Keeps a model's ``venue`` matched to its free-text ``location``.
+    
+    The venue is looked up when it is empty, and again when the location is
+    edited without the venue being changed alongside it.
+    """
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        loaded = dict(zip(field_names, values))
+        if 'location' in loaded and 'venue_id' in loaded:
+            instance._loaded_location = (loaded['location'], loaded['venue_id'])
+        return instance
+    
+    def match_venue(self, update_fields=None):
+        """Point the venue at the location's; return the update_fields to save with."""
+        loaded = getattr(self, '_loaded_location', None)
+        moved = loaded is not None and self.location != loaded[0] and self.venue_id == loaded[1]
+        if moved or (self.venue_id is None and self.location):
+            self.venue = Venue.for_location(self.location)
+            if update_fields is not None and 'location' in update_fields:
+                update_fields = {*update_fields, 'venue'}
+        self._loaded_location = (self.location, self.venue_id)
+        return update_fields
+
+
+class GameSeries(VenueMatchMixin, models.Model):
+    """Model for a recurring game, materialized into games ahead of time (see games.series)."""
+    
+    FREQUENCY_CHOICES = [
+        ('daily', 'Daily'),
+        ('weekly', 'Weekly'),
+    ]
+    
+    name = models.CharField(max_length=200, help_text="Name of the series' games")
+    location = models.CharField(max_length=200, help_text="Location of the series' games")
+    venue = models.ForeignKey(
+        Venue, on_delete=models.PROTECT, blank=True, null=True, related_name='series',
+        help_text="Venue the location names; matched from the location when left empty"
+    )
+    description = models.TextField(blank=True, help_text="Description of the series' games")
+    coin_price = models.IntegerField(help_text="Price in coins to book a game of the series")
+    total_slots = models.IntegerField(help_text="Total number of slots in each game")
+    frequency = models.CharField(max_length=10, choices=FREQUENCY_CHOICES, default='weekly')
+    interval = models.PositiveSmallIntegerField(default=1, help_text="Every this many days or weeks")
+    weekdays = models.CharField(
+        max_length=20, blank=True,
+        help_text="Days of a weekly series, such as MO,TH (the start date's day when empty)"
+    )
+    start_date = models.DateField(help_text="Date of the first game")
+    start_time = models.TimeField(help_text="Kick-off time of every game")
+    end_date = models.DateField(blank=True, null=True, help_text="No games after this date")
+    is_active = models.BooleanField(default=True, help_text="Inactive series stop scheduling games")
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='created_series')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name_plural = 'game series'
+    
+    def __str__(self):
+        return f"{self.name} - {self.get_frequency_display()}"
+    
+    def clean(self):
+        """Check the recurrence rule can be followed."""
+        from .series import parse_weekdays
+        
+        try:
+            parse_weekdays(self.weekdays)
+        except ValueError as error:
+            raise ValidationError({'weekdays': str(error)})
+        if self.interval is not None and self.interval < 1:
+            raise ValidationError({'interval': "Interval must be at least 1."})
+        if self.start_date and self.end_date and self.end_date < self.start_date:
+            raise ValidationError({'end_date': "The series can't end before it starts."})
+    
+    def save(self, *args, **kwargs):
+        """Save the series, matching its venue to the location."""
+        kwargs['update_fields'] = self.match_venue(kwargs.get('update_fields'))
+        super().save(*args, **kwargs)
 
-class Game(models.Model):
+
+class Game(VenueMatchMixin, models.Model):
     """Model for football games."""
     
     STATUS_CHOICES = [
@@ -14,53 +194,87 @@ class Game(models.Model):
     
     name = models.CharField(max_length=200, help_text="Name of the game/event")
     location = models.CharField(max_length=200, help_text="Location of the game")
+    venue = models.ForeignKey(
+        Venue, on_delete=models.PROTECT, blank=True, null=True, related_name='games',
+        help_text="Venue the location names; matched from the location when left empty"
+    )
     date_time = models.DateTimeField(help_text="Date and time of the game")
     coin_price = models.IntegerField(help_text="Price in coins to book this game")
     total_slots = models.IntegerField(help_text="Total number of available slots")
     booked_slots = models.IntegerField(default=0, help_text="Number of booked slots")
+    held_slots = models.IntegerField(default=0, help_text="Number of slots reserved by checkout holds")
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='upcoming')
     description = models.TextField(blank=True, help_text="Description of the game")
     created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='created_games')
+    series = models.ForeignKey(
+        GameSeries, on_delete=models.SET_NULL, blank=True, null=True, related_name='games',
+        help_text="Series this game was scheduled from"
+    )
+    occurrence = models.DateField(blank=True, null=True, help_text="Date of the series occurrence this game is")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['date_time']
+        constraints = [
+            # One game per occurrence, however often or concurrently a series is materialized
+            models.UniqueConstraint(fields=['series', 'occurrence'], name='games_game_series_occurrence_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'date_time'], name='games_game_status_date_idx'),
+            models.Index(fields=['updated_at'], name='games_game_updated_idx'),
+            # Venue-scoped lists and cache versions
+            models.Index(fields=['venue', 'status', 'date_time'], name='games_game_venue_idx'),
+            models.Index(fields=['venue', 'updated_at'], name='games_game_venue_updated_idx'),
+        ]
     
     def __str__(self):
         return f"{self.name} - {self.location} - {self.date_time.strftime('%Y-%m-%d %H:%M')}"
     
+    def save(self, *args, **kwargs):
+        """Save the game, matching its venue to the location, and publish its availability (new games, admin edits)."""
+        kwargs['update_fields'] = self.match_venue(kwargs.get('update_fields'))
+        super().save(*args, **kwargs)
+        publish_slots(self.pk)
+    
     @property
     def available_slots(self):
-        """Calculate available slots."""
-        return self.total_slots - self.booked_slots
+        """Calculate available slots (neither booked nor held)."""
+        return self.total_slots - self.booked_slots - self.held_slots
     
     @property
     def is_full(self):
-        """Check if the game is fully booked."""
-        return self.booked_slots >= self.total_slots
+        """Check if the game is fully booked or held."""
+        return self.booked_slots + self.held_slots >= self.total_slots
     
     @property
     def is_upcoming(self):
         """Check if the game is upcoming."""
-        from django.utils import timezone
         return self.date_time > timezone.now() and self.status == 'upcoming'
     
-    def book_slot(self):
-        """Book a slot for this game."""
-        if self.available_slots > 0:
-            self.booked_slots += 1
-            self.save()
-            return True
-        return False
+    def book_slot(self, count=1):
+        """Book slots for this game."""
+        booked = Game.objects.filter(
+            pk=self.pk, booked_slots__lte=F('total_slots') - F('held_slots') - count
+        ).update(
+            booked_slots=F('booked_slots') + count,
+            updated_at=timezone.now()
+        )
+        self.refresh_from_db(fields=['booked_slots', 'updated_at'])
+        if booked:
+            publish_slots(self.pk)
+        return bool(booked)
     
-    def cancel_slot(self):
-        """Cancel a slot for this game."""
-        if self.booked_slots > 0:
-            self.booked_slots -= 1
-            self.save()
-            return True
-        return False
+    def cancel_slot(self, count=1):
+        """Cancel slots for this game."""
+        cancelled = Game.objects.filter(pk=self.pk, booked_slots__gt=0).update(
+            booked_slots=Greatest(F('booked_slots') - count, 0),
+            updated_at=timezone.now()
+        )
+        self.refresh_from_db(fields=['booked_slots', 'updated_at'])
+        if cancelled:
+            publish_slots(self.pk)
+        return bool(cancelled)
 
 
 class Booking(models.Model):
@@ -75,6 +289,7 @@ class Booking(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='bookings')
     game = models.ForeignKey(Game, on_delete=models.CASCADE, related_name='bookings')
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='confirmed')
+    slots = models.PositiveSmallIntegerField(default=1, help_text="Number of slots held by this booking")
     coins_paid = models.IntegerField(help_text="Number of coins paid for this booking")
     booking_reference = models.CharField(max_length=50, unique=True, help_text="Unique booking reference")
     notes = models.TextField(blank=True, help_text="Additional notes for the booking")
@@ -82,27 +297,236 @@ class Booking(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
-        ordering = ['-created_at']
         unique_together = ['user', 'game']
+        indexes = [
+            models.Index(fields=['game', 'status'], name='games_booking_game_status_idx'),
+            models.Index(fields=['created_at', 'id'], name='games_booking_created_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.username} - {self.game.name} - {self.status}"
     
     def save(self, *args, **kwargs):
-        """Generate booking reference if not provided."""
-        if not self.booking_reference:
-            import uuid
-            self.booking_reference = f"BK-{uuid.uuid4().hex[:8].upper()}"
-        super().save(*args, **kwargs)
+        """Save the booking, generating a reference (and retrying on a collision) if none is set."""
+        if self.booking_reference:
+            return super().save(*args, **kwargs)
+        
+        for attempt in range(REFERENCE_ATTEMPTS):
+            self.booking_reference = generate_booking_reference()
+            try:
+                # A savepoint, so a collision doesn't break the caller's transaction
+                with transaction.atomic():
+                    return super().save(*args, **kwargs)
+            except IntegrityError as error:
+                if attempt + 1 == REFERENCE_ATTEMPTS or not reference_taken(error, [self.booking_reference]):
+                    self.booking_reference = ''
+                    raise
+    
+    @classmethod
+    def book(cls, user, game, slots=1, notes='', hold=None):
+        """
+        Book slots in a game for a user and deduct the coins.
+        
+        The game row is locked for the whole booking so concurrent bookings
+        can never oversell it, and coins are deducted with a conditional
+        UPDATE so the balance can never go negative. A claimed ``hold``
+        (see games.holds) turns its held slots into booked ones.
+        """
+        from accounts.models import CoinLedgerEntry, User
+        from .holds import release_expired_holds
+        
+        held = hold.slots if hold else 0
+        with transaction.atomic():
+            game = Game.objects.select_for_update().get(pk=game.pk)
+            if not game.is_upcoming:
+                raise BookingError("This game is not available for booking.")
+            if game.available_slots + held < slots and game.held_slots > held:
+                # Slots are short; free any holds that have lapsed before giving up
+                game.held_slots -= release_expired_holds([game.pk]).get(game.pk, 0)
+            if game.available_slots + held < slots:
+                raise BookingError("Not enough slots left in this game.")
+            
+            cost = game.coin_price * slots
+            debited = User.objects.filter(pk=user.pk, coin_balance__gte=cost).update(
+                coin_balance=F('coin_balance') - cost
+            )
+            if not debited:
+                raise BookingError("Insufficient coins to book this game.")
+            
+            Game.objects.filter(pk=game.pk).update(
+                booked_slots=F('booked_slots') + slots,
+                held_slots=F('held_slots') - held,
+                updated_at=timezone.now()
+            )
+            game.booked_slots += slots
+            game.held_slots -= held
+            publish_slots(game.pk)
+            
+            # A cancelled booking keeps its (user, game) row, so rebooking reuses it
+            booking = cls.objects.filter(user=user, game=game).first()
+            if booking is None:
+                booking = cls(user=user, game=game)
+            elif booking.status == 'confirmed':
+                raise BookingError("You already have a booking for this game.")
+            booking.status = 'confirmed'
+            booking.slots = slots
+            booking.coins_paid = cost
+            booking.notes = notes
+            booking.save()
+            
+            CoinLedgerEntry.objects.create(
+                user=user, amount=-cost, reason='booking', reference=booking.booking_reference
+            )
+        
+        user.coin_balance -= cost
+        return booking
     
     def cancel_booking(self):
-        """Cancel the booking and refund coins."""
-        if self.status == 'confirmed':
+        """Cancel the booking, refund coins and promote the waitlist."""
+        if self.status != 'confirmed':
+            return False
+        
+        with transaction.atomic():
+            # Only the request that flips the row refunds, even if two cancel at once
+            claimed = Booking.objects.filter(pk=self.pk, status='confirmed').update(
+                status='cancelled', updated_at=timezone.now()
+            )
+            if not claimed:
+                return False
             self.status = 'cancelled'
-            self.save()
             # Refund coins to user
-            self.user.add_coins(self.coins_paid)
+            self.user.add_coins(self.coins_paid, reason='refund', reference=self.booking_reference)
             # Cancel slot in game
-            self.game.cancel_slot()
-            return True
-        return False
+            self.game.cancel_slot(self.slots)
+            # Hand the freed slots to the waitlist once the cancellation commits
+            transaction.on_commit(lambda: promote_waitlist_safely(self.game_id))
+        return True
+
+
+class BookingArchive(models.Model):
+    """Model to keep bookings of long-finished games (see games.archive)."""
+    
+    id = models.BigIntegerField(primary_key=True, help_text="ID the booking had in the live table")
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='archived_bookings')
+    game = models.ForeignKey(Game, on_delete=models.CASCADE, related_name='archived_bookings')
+    status = models.CharField(max_length=20, choices=Booking.STATUS_CHOICES)
+    slots = models.PositiveSmallIntegerField(default=1)
+    coins_paid = models.IntegerField()
+    booking_reference = models.CharField(max_length=50, db_index=True)
+    notes = models.TextField(blank=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='games_bookingarch_created_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.booking_reference} - {self.status} (archived)"
+
+
+class SlotHold(models.Model):
+    """Model for slots reserved for a user for a few minutes while they check out."""
+    
+    token = models.CharField(max_length=32, unique=True, help_text="Secret the client confirms or releases the hold with")
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='slot_holds')
+    game = models.ForeignKey(Game, on_delete=models.CASCADE, related_name='slot_holds')
+    slots = models.PositiveSmallIntegerField(default=1, help_text="Number of slots held")
+    expires_at = models.DateTimeField(help_text="When the held slots return to the game")
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['expires_at', 'game'], name='games_slothold_expiry_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'game'], name='games_slothold_one_per_user'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user_id} - {self.game_id} - {self.slots} until {self.expires_at:%H:%M:%S}"
+    
+    @property
+    def is_expired(self):
+        """Check if the hold has lapsed (whether or not it has been released yet)."""
+        return self.expires_at <= timezone.now()
+
+
+class WaitlistEntry(models.Model):
+    """Model for a user queued for a slot in a full game."""
+    
+    STATUS_CHOICES = [
+        ('waiting', 'Waiting'),
+        ('promoted', 'Promoted'),
+        ('lapsed', 'Lapsed'),
+        ('cancelled', 'Cancelled'),
+    ]
+    
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='waitlist_entries')
+    game = models.ForeignKey(Game, on_delete=models.CASCADE, related_name='waitlist_entries')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='waiting')
+    created_at = models.DateTimeField(auto_now_add=True)
+    resolved_at = models.DateTimeField(blank=True, null=True, help_text="When the entry was promoted, lapsed or cancelled")
+    
+    class Meta:
+        ordering = ['created_at', 'id']
+        verbose_name_plural = 'waitlist entries'
+        indexes = [
+            models.Index(fields=['game', 'status', 'created_at', 'id'], name='games_waitlist_queue_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'game'],
+                condition=Q(status='waiting'),
+                name='games_waitlist_one_waiting_entry',
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.game.name} - {self.status}"
+    
+    @property
+    def position(self):
+        """Position of a waiting entry in its game's queue (1-based)."""
+        ahead = WaitlistEntry.objects.filter(game_id=self.game_id, status='waiting').filter(
+            Q(created_at__lt=self.created_at) | Q(created_at=self.created_at, id__lt=self.id)
+        ).count()
+        return ahead + 1
+
+
+def promote_waitlist_safely(game_id):
+    """Promote a game's waitlist, logging instead of failing the caller."""
+    from .waitlist import promote_waitlist
+    
+    try:
+        promote_waitlist(game_id)
+    except Exception:
+        logger.exception("Waitlist promotion failed for game %s", game_id)
+
+
+class SchedulerCheckpoint(models.Model):
+    """Model to record the progress of scheduled batch jobs."""
+    
+    name = models.CharField(max_length=50, unique=True, help_text="Name of the scheduled job")
+    phase = models.CharField(max_length=50, blank=True, help_text="Phase the job was working on")
+    cursor = models.BigIntegerField(default=0, help_text="Last primary key processed in the current phase")
+    last_run_at = models.DateTimeField(blank=True, null=True, help_text="When the job last completed")
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.name} - {self.phase or 'idle'} - {self.cursor}"
+    
+    def save_progress(self, phase, cursor):
+        """Record the last processed row of a phase."""
+        self.phase = phase
+        self.cursor = cursor
+        self.save(update_fields=['phase', 'cursor', 'updated_at'])
+    
+    def mark_completed(self, when):
+        """Reset progress after a full run."""
+        self.phase = ''
+        self.cursor = 0
+        self.last_run_at = when
+        self.save(update_fields=['phase', 'cursor', 'last_run_at', 'updated_at'])
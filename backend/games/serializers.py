@@ -1,5 +1,9 @@
 from rest_framework import serializers
-from .models import Game, Booking
+from galactiturf.serializers import ValuesSerializer
+from .models import Game, GameSeries, Booking, BookingError, SlotHold, Venue, WaitlistEntry
+from .series import WEEKDAYS, parse_weekdays
+from .venues import normalize_venue_name
+from . import holds
 
 
 class GameSerializer(serializers.ModelSerializer):
@@ -13,7 +17,7 @@ class GameSerializer(serializers.ModelSerializer):
     class Meta:
         model = Game
         fields = [
-            'id', 'name', 'location', 'date_time', 'coin_price',
+            'id', 'name', 'location', 'venue', 'series', 'date_time', 'coin_price',
             'total_slots', 'booked_slots', 'available_slots',
             'status', 'description', 'created_by', 'is_full',
             'is_upcoming', 'created_at'
@@ -21,15 +25,73 @@ class GameSerializer(serializers.ModelSerializer):
         read_only_fields = ['created_by', 'created_at']
 
 
+class GameValuesSerializer(ValuesSerializer):
+    """Fast read-only GameSerializer for list responses."""
+    
+    serializer_class = GameSerializer
+    property_sources = ('held_slots',)
+
+
 class GameCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating games (admin only)."""
     
     class Meta:
         model = Game
         fields = [
-            'name', 'location', 'date_time', 'coin_price',
+            'name', 'location', 'venue', 'date_time', 'coin_price',
             'total_slots', 'description'
         ]
+    
+    def validate(self, attrs):
+        """Keep the game within its venue's capacity."""
+        return validate_venue_capacity(attrs)
+
+
+class GameSeriesSerializer(serializers.ModelSerializer):
+    """Serializer for creating recurring game series (admin only)."""
+    
+    class Meta:
+        model = GameSeries
+        fields = [
+            'id', 'name', 'location', 'venue', 'description', 'coin_price', 'total_slots',
+            'frequency', 'interval', 'weekdays', 'start_date', 'start_time', 'end_date', 'is_active'
+        ]
+        # Form posts leave out unticked boxes; a series is active unless it says otherwise
+        extra_kwargs = {'is_active': {'default': True}}
+    
+    def validate_interval(self, value):
+        """Series repeat at least every day or week."""
+        if value < 1:
+            raise serializers.ValidationError("Interval must be at least 1.")
+        return value
+    
+    def validate_weekdays(self, value):
+        """Store weekdays as upper-case two-letter days, such as MO,TH."""
+        try:
+            days = parse_weekdays(value)
+        except ValueError as error:
+            raise serializers.ValidationError(str(error))
+        return ','.join(day for number, day in enumerate(WEEKDAYS) if number in days)
+    
+    def validate(self, attrs):
+        """Check the dates, and keep the series' games within the venue's capacity."""
+        if attrs.get('end_date') and attrs['end_date'] < attrs['start_date']:
+            raise serializers.ValidationError({'end_date': "The series can't end before it starts."})
+        return validate_venue_capacity(attrs)
+
+
+def validate_venue_capacity(attrs):
+    """Check a game's (or series') slots fit its venue, and set the venue if it already exists."""
+    venue = attrs.get('venue') or Venue.objects.filter(
+        normalized_name=normalize_venue_name(attrs['location'])
+    ).first()
+    if venue and venue.capacity and attrs['total_slots'] > venue.capacity:
+        raise serializers.ValidationError({
+            'total_slots': f"{venue.name} takes at most {venue.capacity} players."
+        })
+    # A new location's venue is created when the game is saved, so rejected requests leave none behind
+    attrs['venue'] = venue
+    return attrs
 
 
 class BookingSerializer(serializers.ModelSerializer):
@@ -44,12 +106,18 @@ class BookingSerializer(serializers.ModelSerializer):
         model = Booking
         fields = [
             'id', 'user', 'game', 'game_name', 'game_location',
-            'game_date_time', 'status', 'coins_paid',
+            'game_date_time', 'status', 'slots', 'coins_paid',
             'booking_reference', 'notes', 'created_at'
         ]
         read_only_fields = ['user', 'booking_reference', 'created_at']
 
 
+class BookingValuesSerializer(ValuesSerializer):
+    """Fast read-only BookingSerializer for list responses."""
+    
+    serializer_class = BookingSerializer
+
+
 class BookingCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating bookings."""
     
@@ -59,8 +127,9 @@ class BookingCreateSerializer(serializers.ModelSerializer):
     
     def validate_game(self, value):
         """Validate that the game can be booked."""
-        if value.is_full:
-            raise serializers.ValidationError("This game is fully booked.")
+        # With holds outstanding, Booking.book decides once lapsed ones are released
+        if value.is_full and not value.held_slots:
+            raise serializers.ValidationError("This game is fully booked. You can join its waitlist instead.")
         
         if not value.is_upcoming:
             raise serializers.ValidationError("This game is not available for booking.")
@@ -75,28 +144,62 @@ class BookingCreateSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         """Create a booking and deduct coins."""
         user = self.context['request'].user
-        game = validated_data['game']
-        
-        # Check if user has sufficient coins
-        if not user.has_sufficient_coins(game.coin_price):
-            raise serializers.ValidationError("Insufficient coins to book this game.")
-        
-        # Deduct coins from user
-        if not user.deduct_coins(game.coin_price):
-            raise serializers.ValidationError("Failed to deduct coins.")
-        
-        # Book slot in game
-        if not game.book_slot():
-            # Refund coins if booking fails
-            user.add_coins(game.coin_price)
-            raise serializers.ValidationError("Failed to book slot.")
         
-        # Create booking
-        booking = Booking.objects.create(
-            user=user,
-            game=game,
-            coins_paid=game.coin_price,
-            notes=validated_data.get('notes', '')
-        )
-        
-        return booking
\ No newline at end of file
+        try:
+            return Booking.book(
+                user,
+                validated_data['game'],
+                slots=validated_data.get('slots', 1),
+                notes=validated_data.get('notes', '')
+            )
+        except BookingError as e:
+            raise serializers.ValidationError(str(e))
+
+
+class GroupBookingCreateSerializer(BookingCreateSerializer):
+    """Serializer for booking several slots of a game in one go."""
+    
+    slots = serializers.IntegerField(min_value=1, max_value=50)
+    
+    class Meta(BookingCreateSerializer.Meta):
+        fields = ['game', 'slots', 'notes']
+    
+    def validate(self, attrs):
+        """Validate that the game has enough free slots for the group."""
+        if attrs['slots'] > attrs['game'].available_slots and not attrs['game'].held_slots:
+            raise serializers.ValidationError(
+                f"Only {attrs['game'].available_slots} slots left in this game."
+            )
+        return attrs
+
+
+class SlotHoldCreateSerializer(serializers.ModelSerializer):
+    """Serializer for holding slots in a game during checkout."""
+    
+    slots = serializers.IntegerField(min_value=1, max_value=50, default=1)
+    
+    class Meta:
+        model = SlotHold
+        fields = ['game', 'slots']
+    
+    def create(self, validated_data):
+        """Hold the slots for the requesting user."""
+        try:
+            return holds.hold_slots(self.context['request'].user, validated_data['game'], validated_data['slots'])
+        except BookingError as e:
+            raise serializers.ValidationError(str(e))
+
+
+class WaitlistEntrySerializer(serializers.ModelSerializer):
+    """Serializer for WaitlistEntry model."""
+    
+    game_name = serializers.ReadOnlyField(source='game.name')
+    game_date_time = serializers.ReadOnlyField(source='game.date_time')
+    
+    class Meta:
+        model = WaitlistEntry
+        fields = [
+            'id', 'game', 'game_name', 'game_date_time', 'status',
+            'created_at', 'resolved_at'
+        ]
+        read_only_fields = fields
@@ -0,0 +1,173 @@
+"""
+Recurring games: materializing a ``GameSeries`` into games.
+
+A series holds a game template (name, location, price, slots) and a
+recurrence rule: every ``interval`` days, or every ``interval`` weeks on
+``weekdays``, at ``start_time``, from ``start_date`` until ``end_date``.
+``materialize`` turns the rule's occurrences over the next
+``GAME_SERIES_HORIZON_DAYS`` into ordinary games, so booking, holds,
+caching and the lifecycle job treat them like any other game.
+
+A run only writes what differs, so running it again changes nothing:
+
+* occurrences without a game are created with one ``bulk_create``. The
+  unique (series, occurrence) constraint makes overlapping runs harmless,
+  and an occurrence whose game was cancelled is not scheduled again;
+* edits to the template reach every upcoming game of the series with a
+  single UPDATE, filtered to the games that still differ. Slots never
+  drop below what is already booked or held;
+* games whose occurrence moved (a new kick-off time) are updated with one
+  ``bulk_update``;
+* upcoming games the rule no longer produces (a paused or shortened
+  series, other weekdays) are cancelled if nobody ever booked them, and
+  freed from their occurrence so the date can be scheduled again. Games
+  with bookings are left for an admin to cancel and refund.
+
+``materialize_series`` runs it for every series from a daily job, which
+is what moves the horizon forward.
+"""
+from collections import Counter
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef, Q, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import Booking, Game, GameSeries, publish_slots
+
+WEEKDAYS = ['MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU']
+
+TEMPLATE_FIELDS = ['name', 'location', 'venue_id', 'description', 'coin_price']
+
+
+def parse_weekdays(value):
+    """The weekday numbers (Monday is 0) in a string such as ``MO,TH``; raises ValueError on an unknown day."""
+    days = set()
+    for day in value.upper().replace(' ', '').split(','):
+        if day:
+            if day not in WEEKDAYS:
+                raise ValueError(f'{day} is not one of {",".join(WEEKDAYS)}.')
+            days.add(WEEKDAYS.index(day))
+    return days
+
+
+def occurrence_dates(series, first, last):
+    """The dates from first to last (inclusive) the series' rule produces."""
+    first = max(first, series.start_date)
+    if series.end_date:
+        last = min(last, series.end_date)
+    if series.frequency == 'daily':
+        # Round up to the next date on the rule's step
+        steps = -(-(first - series.start_date).days // series.interval)
+        day = series.start_date + timedelta(days=steps * series.interval)
+        while day <= last:
+            yield day
+            day += timedelta(days=series.interval)
+        return
+
+    weekdays = parse_weekdays(series.weekdays) or {series.start_date.weekday()}
+    first_monday = series.start_date - timedelta(days=series.start_date.weekday())
+    day = first
+    while day <= last:
+        if day.weekday() in weekdays and (day - first_monday).days // 7 % series.interval == 0:
+            yield day
+        day += timedelta(days=1)
+
+
+def kick_off(series, day):
+    """When the series' game on a date starts."""
+    return timezone.make_aware(datetime.combine(day, series.start_time))
+
+
+def materialize(series, now=None, horizon_days=None):
+    """
+    Bring the upcoming games of a series in line with its rule and template.
+
+    Returns a Counter of games created, updated, moved and cancelled, and
+    of games kept (no longer in the rule, but booked).
+    """
+    now = now or timezone.now()
+    horizon_days = settings.GAME_SERIES_HORIZON_DAYS if horizon_days is None else horizon_days
+    today = timezone.localdate(now)
+
+    wanted = {}
+    if series.is_active:
+        for day in occurrence_dates(series, today, today + timedelta(days=horizon_days)):
+            if kick_off(series, day) > now:
+                wanted[day] = kick_off(series, day)
+
+    counts = Counter()
+    upcoming = Game.objects.filter(series=series, status='upcoming', date_time__gt=now)
+    changed = []
+    with transaction.atomic():
+        scheduled = list(upcoming.values_list('pk', 'occurrence', 'date_time'))
+
+        # Dropped from the rule: cancel, unless someone has booked
+        dropped = [pk for pk, day, _ in scheduled if day not in wanted]
+        if dropped:
+            unbooked = upcoming.filter(pk__in=dropped, held_slots=0).exclude(
+                Exists(Booking.objects.filter(game=OuterRef('pk')))
+            )
+            cancelled = list(unbooked.values_list('pk', flat=True))
+            counts['cancelled'] = Game.objects.filter(pk__in=cancelled).update(
+                status='cancelled', occurrence=None, updated_at=now
+            )
+            counts['kept'] = len(dropped) - counts['cancelled']
+            changed.extend(cancelled)
+
+        # Template edits, in one statement for every game that differs
+        template = {field: getattr(series, field) for field in TEMPLATE_FIELDS}
+        slots = Greatest(F('booked_slots') + F('held_slots'), Value(series.total_slots))
+        stale = upcoming.filter(occurrence__in=wanted).exclude(Q(**template) & Q(total_slots=slots))
+        updated = list(stale.values_list('pk', flat=True))
+        if updated:
+            counts['updated'] = Game.objects.filter(pk__in=updated).update(
+                total_slots=slots, updated_at=now, **template
+            )
+            changed.extend(updated)
+
+        # Rescheduled occurrences
+        moved = [
+            Game(pk=pk, date_time=wanted[day], updated_at=now)
+            for pk, day, date_time in scheduled
+            if day in wanted and date_time != wanted[day]
+        ]
+        Game.objects.bulk_update(moved, ['date_time', 'updated_at'])
+        counts['moved'] = len(moved)
+        changed.extend(game.pk for game in moved)
+
+        # New occurrences; any game for an occurrence, even a cancelled one, means it is taken
+        taken = set(Game.objects.filter(series=series, occurrence__in=wanted).values_list('occurrence', flat=True))
+        new = [day for day in wanted if day not in taken]
+        if new:
+            Game.objects.bulk_create(
+                [
+                    Game(
+                        series=series, occurrence=day, date_time=wanted[day], total_slots=series.total_slots,
+                        created_by_id=series.created_by_id, **template
+                    )
+                    for day in new
+                ],
+                ignore_conflicts=True,
+            )
+            created = list(Game.objects.filter(series=series, occurrence__in=new).values_list('pk', flat=True))
+            counts['created'] = len(created)
+            changed.extend(created)
+
+        if changed:
+            publish_slots(*changed)
+    return counts
+
+
+def materialize_series(now=None, horizon_days=None):
+    """Materialize every active series, and wind down the games of inactive ones; return the totals."""
+    now = now or timezone.now()
+    series = GameSeries.objects.filter(
+        Q(is_active=True) | Q(games__status='upcoming', games__date_time__gt=now)
+    ).distinct().order_by('pk')
+    totals = Counter()
+    for each in series.iterator():
+        totals.update(materialize(each, now, horizon_days))
+    return totals
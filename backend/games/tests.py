@@ -1,3 +1,1094 @@
-from django.test import TestCase
+import io
+import json
+import tempfile
+from datetime import date, time, timedelta
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from asgiref.testing import ApplicationCommunicator
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db.models import F
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from accounts.models import CoinLedgerEntry, User
+from galactiturf.renderers import FastJSONRenderer
+from galactiturf.pubsub import get_broker
+from galactiturf.testing import AdminQueryCountMixin
+from galactiturf.db_router import (
+    PrimaryReplicaRouter, is_pinned, read_from_replica, routing_scope,
+)
+from .availability import events_router
+from .holds import confirm_hold, get_hold, hold_slots, release_hold, sweep_expired_holds
+from .lifecycle import advance_lifecycle
+from reports.models import GameStats
+from reports.rollups import refresh_rollups
+from .archive import archive_bookings
+from .geo import bounding_box, grid_cell, haversine_km
+from .imports import import_games, validate_rows
+from .models import (
+    Booking, BookingArchive, BookingError, Game, GameSeries, SchedulerCheckpoint, SlotHold, Venue, WaitlistEntry,
+    generate_booking_reference,
+)
+from .refunds import cancel_game
+from .series import materialize, materialize_series, occurrence_dates
+from .serializers import BookingSerializer, BookingValuesSerializer, GameCreateSerializer, GameSerializer, GameValuesSerializer
+from .venues import assign_venues, normalize_venue_name
+from .waitlist import join_waitlist, promote_waitlist
+
+
+def make_game(creator, **kwargs):
+    """Create an upcoming game for tests."""
+    data = {
+        'name': 'Weekend Warriors',
+        'location': 'Lagos Sports Complex',
+        'date_time': timezone.now() + timedelta(days=2),
+        'coin_price': 500,
+        'total_slots': 22,
+        'created_by': creator,
+    }
+    data.update(kwargs)
+    return Game.objects.create(**data)
+
+
+class PrimaryReplicaRouterTests(TestCase):
+    """Tests for read-replica routing."""
+
+    def setUp(self):
+        self.router = PrimaryReplicaRouter()
+
+    @override_settings(DATABASE_REPLICAS=['replica1'])
+    def test_reads_use_primary_outside_replica_scope(self):
+        self.assertEqual(self.router.db_for_read(Game), 'default')
+        with routing_scope():
+            self.assertEqual(self.router.db_for_read(Game), 'default')
+
+    @override_settings(DATABASE_REPLICAS=['replica1'])
+    def test_scoped_reads_use_replica_until_first_write(self):
+        with read_from_replica():
+            self.assertEqual(self.router.db_for_read(Game), 'replica1')
+            self.assertEqual(self.router.db_for_write(Game), 'default')
+            self.assertEqual(self.router.db_for_read(Game), 'default')
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_scoped_reads_fall_back_to_primary_without_replicas(self):
+        with read_from_replica():
+            self.assertEqual(self.router.db_for_read(Game), 'default')
+
+
+class ReadYourWritesTests(TestCase):
+    """Tests for pinning users to the primary after a write."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='player', password='testpass123', coin_balance=1000)
+        self.game = make_game(self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_write_pins_user_to_primary(self):
+        self.assertFalse(is_pinned(self.user))
+        response = self.client.post('/api/games/bookings/create/', {'game': self.game.id})
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(is_pinned(self.user))
+
+    def test_read_does_not_pin_user(self):
+        response = self.client.get('/api/games/')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(is_pinned(self.user))
+
+    @override_settings(REPLICA_PIN_SECONDS=0)
+    def test_pinning_can_be_disabled(self):
+        self.client.post('/api/games/bookings/create/', {'game': self.game.id})
+        self.assertFalse(is_pinned(self.user))
+
+
+class WaitlistTests(TestCase):
+    """Tests for the waitlist engine."""
+
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin', password='testpass123')
+        self.game = make_game(self.admin, total_slots=2, coin_price=100)
+        self.players = [
+            User.objects.create_user(username=f'player{i}', password='testpass123', coin_balance=500)
+            for i in range(2)
+        ]
+        for player in self.players:
+            Booking.book(player, self.game)
+        self.game.refresh_from_db()
+
+    def make_waiter(self, username, coins=500):
+        waiter = User.objects.create_user(username=username, password='testpass123', coin_balance=coins)
+        join_waitlist(waiter, self.game)
+        return waiter
+
+    def test_cancellation_promotes_oldest_waiter(self):
+        first = self.make_waiter('first')
+        second = self.make_waiter('second')
+
+        booking = Booking.objects.get(user=self.players[0], game=self.game)
+        with self.captureOnCommitCallbacks(execute=True):
+            booking.cancel_booking()
+
+        self.assertTrue(Booking.objects.filter(user=first, game=self.game, status='confirmed').exists())
+        self.assertFalse(Booking.objects.filter(user=second, game=self.game).exists())
+        first.refresh_from_db()
+        self.assertEqual(first.coin_balance, 400)
+        self.game.refresh_from_db()
+        self.assertEqual(self.game.booked_slots, 2)
+        self.assertEqual(WaitlistEntry.objects.get(user=first).status, 'promoted')
+        self.assertEqual(WaitlistEntry.objects.get(user=second).status, 'waiting')
+
+    def test_waiters_who_cannot_pay_lapse(self):
+        broke = self.make_waiter('broke')
+        rich = self.make_waiter('rich')
+        User.objects.filter(pk=broke.pk).update(coin_balance=0)
+
+        Game.objects.filter(pk=self.game.pk).update(booked_slots=1)
+        self.assertEqual(promote_waitlist(self.game.pk), 1)
+
+        self.assertEqual(WaitlistEntry.objects.get(user=broke).status, 'lapsed')
+        self.assertEqual(WaitlistEntry.objects.get(user=rich).status, 'promoted')
+
+    def test_promotion_query_count_does_not_grow_with_batch(self):
+        def promote(waiters):
+            Game.objects.filter(pk=self.game.pk).update(total_slots=F('booked_slots') + waiters)
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(promote_waitlist(self.game.pk), waiters)
+            return len(queries)
+
+        Game.objects.filter(pk=self.game.pk).update(booked_slots=F('total_slots'))
+        self.make_waiter('solo')
+        single = promote(1)
+
+        self.game.refresh_from_db()
+        for i in range(10):
+            self.make_waiter(f'waiter{i}')
+        self.assertEqual(promote(10), single)
+
+    def test_rebooking_after_cancellation_reuses_booking(self):
+        booking = Booking.objects.get(user=self.players[0], game=self.game)
+        booking.cancel_booking()
+
+        rebooked = Booking.book(self.players[0], self.game)
+        self.assertEqual(rebooked.pk, booking.pk)
+        self.assertEqual(rebooked.status, 'confirmed')
+
+
+class GroupBookingTests(TestCase):
+    """Tests for booking several slots at once."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='captain', password='testpass123', coin_balance=1000)
+        self.game = make_game(self.user, total_slots=5, coin_price=100)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_group_booking_charges_and_books_all_slots(self):
+        response = self.client.post('/api/games/bookings/bulk/', {'game': self.game.id, 'slots': 4})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['booking']['slots'], 4)
+        self.user.refresh_from_db()
+        self.game.refresh_from_db()
+        self.assertEqual(self.user.coin_balance, 600)
+        self.assertEqual(self.game.booked_slots, 4)
+
+    def test_group_booking_cannot_oversell(self):
+        response = self.client.post('/api/games/bookings/bulk/', {'game': self.game.id, 'slots': 6})
+        self.assertEqual(response.status_code, 400)
+        self.game.refresh_from_db()
+        self.assertEqual(self.game.booked_slots, 0)
+
+    def test_reference_collision_retries_with_a_fresh_reference(self):
+        taken = Booking.book(self.user, make_game(self.user)).booking_reference
+        fresh = generate_booking_reference()
+        with mock.patch('games.models.generate_booking_reference', side_effect=[taken, fresh]):
+            booking = Booking.book(self.user, self.game, slots=2)
+        self.assertEqual(booking.booking_reference, fresh)
+        self.game.refresh_from_db()
+        self.assertEqual(self.game.booked_slots, 2)
+
+    def test_cancelling_group_booking_frees_all_slots(self):
+        booking = Booking.book(self.user, self.game, slots=3)
+        booking.cancel_booking()
+        self.user.refresh_from_db()
+        self.game.refresh_from_db()
+        self.assertEqual(self.game.booked_slots, 0)
+        self.assertEqual(self.user.coin_balance, 1000)
+
+    def test_concurrent_cancellations_refund_once(self):
+        booking = Booking.book(self.user, self.game, slots=2)
+        stale = Booking.objects.get(pk=booking.pk)
+
+        self.assertTrue(booking.cancel_booking())
+        self.assertFalse(stale.cancel_booking())
+
+        self.user.refresh_from_db()
+        self.game.refresh_from_db()
+        self.assertEqual(self.user.coin_balance, 1000)
+        self.assertEqual(self.game.booked_slots, 0)
+
+
+class BookingSummaryTests(TestCase):
+    """Tests for the booking summary endpoint."""
+
+    def test_summary_counts_bookings_in_one_query(self):
+        user = User.objects.create_user(username='player', password='testpass123', coin_balance=2000)
+        games = [make_game(user, coin_price=100 * (i + 1)) for i in range(3)]
+        for game in games:
+            Booking.book(user, game)
+        Booking.objects.filter(game=games[0]).update(status='cancelled')
+        client = APIClient()
+        client.force_authenticate(user)
+
+        with self.assertNumQueries(1):
+            response = client.get('/api/games/bookings/summary/')
+
+        self.assertEqual(response.data['total_bookings'], 3)
+        self.assertEqual(response.data['confirmed_bookings'], 2)
+        self.assertEqual(response.data['cancelled_bookings'], 1)
+        self.assertEqual(response.data['total_coins_spent'], 500)
+
+
+class FastListSerializationTests(TestCase):
+    """The values() serializers and orjson renderer must match DRF byte for byte."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='Zoë', password='testpass123', coin_balance=10000)
+        kickoff = timezone.now().replace(microsecond=123456) + timedelta(days=3)
+        self.games = [
+            make_game(self.user, name='Line\u2028separator “quoted”', date_time=kickoff),
+            make_game(self.user, name='Full house', total_slots=1, date_time=kickoff.replace(microsecond=0)),
+            make_game(self.user, name='Past', description='', status='completed', date_time=kickoff - timedelta(days=9)),
+        ]
+        Booking.book(self.user, self.games[0], notes='Bringing boots ⚽')
+        Booking.book(self.user, self.games[1])
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def assertSameBytes(self, drf_data, fast_data):
+        self.assertEqual(JSONRenderer().render(drf_data), FastJSONRenderer().render(fast_data))
+
+    def test_game_rows_match_model_serializer(self):
+        queryset = Game.objects.order_by('id')
+        self.assertSameBytes(
+            GameSerializer(queryset, many=True).data,
+            GameValuesSerializer(GameValuesSerializer.values(queryset)).data
+        )
+
+    def test_booking_rows_match_model_serializer(self):
+        queryset = Booking.objects.order_by('id')
+        self.assertSameBytes(
+            BookingSerializer(queryset, many=True).data,
+            BookingValuesSerializer(BookingValuesSerializer.values(queryset)).data
+        )
+
+    def test_list_endpoint_bytes_unchanged(self):
+        request = Request(APIRequestFactory().get('/api/games/bookings/'))
+        paginator = PageNumberPagination()
+        page = paginator.paginate_queryset(Booking.objects.order_by('-created_at'), request)
+        expected = JSONRenderer().render(paginator.get_paginated_response(BookingSerializer(page, many=True).data).data)
+
+        self.assertEqual(self.client.get('/api/games/bookings/').content, expected)
+
+    def test_renderer_matches_drf_for_error_payloads(self):
+        response = self.client.post('/api/games/bookings/create/', {'game': self.games[1].id})
+        self.assertEqual(response.status_code, 400)
+        self.assertSameBytes(response.data, response.data)
+
+
+@override_settings(API_CACHE_SECONDS=30)
+class GameResponseCacheTests(TestCase):
+    """Tests for the cached game list and detail responses."""
+
+    def setUp(self):
+        self.player = User.objects.create_user(username='player', password='testpass123', coin_balance=1000)
+        self.game = make_game(self.player)
+        self.client = APIClient()
+
+    def test_cached_until_a_game_changes(self):
+        url = f'/api/games/{self.game.pk}/'
+        self.assertEqual(self.client.get(url).data['booked_slots'], 0)
+        # A hit only reads the latest updated_at and the count
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(url).data['booked_slots'], 0)
+
+        Booking.book(self.player, self.game)
+        self.assertEqual(self.client.get(url).data['booked_slots'], 1)
+        self.assertEqual(self.client.get('/api/games/').data['results'][0]['booked_slots'], 1)
+
+    def test_deleting_a_game_refreshes_the_list(self):
+        other = make_game(self.player, location='Abuja Arena')
+        self.assertEqual(self.client.get('/api/games/').data['count'], 2)
+
+        # The newest updated_at is the other game's, so only the count changes
+        self.assertGreater(other.updated_at, self.game.updated_at)
+        self.game.delete()
+        self.assertEqual(self.client.get('/api/games/').data['count'], 1)
+
+    def test_query_strings_cached_separately(self):
+        make_game(self.player, location='Abuja Arena')
+        self.assertEqual(self.client.get('/api/games/').data['count'], 2)
+        self.assertEqual(self.client.get('/api/games/?location=abuja').data['count'], 1)
+
+    def test_venue_lists_only_change_with_their_venue(self):
+        other = make_game(self.player, location='Abuja Arena')
+        abuja = f'/api/games/?venue={other.venue_id}'
+        self.assertEqual(self.client.get(abuja).data['results'][0]['booked_slots'], 0)
+
+        # Abuja's cache version only reads Abuja's games, so a Lagos booking leaves it cached
+        Booking.book(self.player, self.game)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(abuja)
+        self.assertEqual(len(queries), 1)
+        self.assertIn('"venue_id" =', queries[0]['sql'])
+
+        Booking.book(self.player, other)
+        self.assertEqual(self.client.get(abuja).data['results'][0]['booked_slots'], 1)
+        self.assertEqual(self.client.get(f'/api/games/?venue={self.game.venue_id}').data['count'], 1)
+
+    def test_game_moved_to_another_venue_leaves_the_old_venue_list(self):
+        moving, staying = make_game(self.player, location='Abuja Arena'), make_game(self.player, location='Abuja Arena')
+        abuja = f'/api/games/?venue={moving.venue_id}'
+        self.assertEqual(self.client.get(abuja).data['count'], 2)
+
+        # Abuja's newest updated_at is still the staying game's; its game count drops
+        moving.location = 'Lagos Sports Complex'
+        moving.save(update_fields=['location'])
+        self.assertEqual(moving.venue_id, self.game.venue_id)
+        self.assertEqual([game['id'] for game in self.client.get(abuja).data['results']], [staying.pk])
+
+    def test_missing_game_not_cached(self):
+        self.assertEqual(self.client.get('/api/games/999999/').status_code, 404)
+        self.assertEqual(self.client.get('/api/games/999999/').status_code, 404)
+
+    @override_settings(API_CACHE_SECONDS=0)
+    def test_cache_can_be_disabled(self):
+        self.client.get(f'/api/games/{self.game.pk}/')
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(f'/api/games/{self.game.pk}/')
+        self.assertNotIn('MAX', ' '.join(query['sql'] for query in queries))
+
+
+class VenueTests(TestCase):
+    """Tests for matching game locations to venues."""
+
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin', password='testpass123', is_staff=True)
+
+    def test_spellings_of_a_location_share_a_venue(self):
+        self.assertEqual(normalize_venue_name(' Lagos  Sports-Complex. '), 'lagos sports complex')
+        games = [make_game(self.admin, location=location) for location in ['Lagos Sports Complex', 'lagos sports complex ']]
+        self.assertEqual(games[0].venue_id, games[1].venue_id)
+        self.assertEqual(Venue.objects.get().name, 'Lagos Sports Complex')
+        self.assertIsNone(make_game(self.admin, location=' ').venue)
+
+    def test_editing_the_location_moves_the_game(self):
+        game = Game.objects.get(pk=make_game(self.admin, location='Lagos Sports Complex').pk)
+        game.location = 'Ikeja Turf'
+        game.save(update_fields=['location'])
+        self.assertEqual(Game.objects.get(pk=game.pk).venue.name, 'Ikeja Turf')
+
+        # A venue picked alongside the new location is kept
+        other = Venue.objects.get(name='Lagos Sports Complex')
+        game.location, game.venue = 'Lagos Sports Complex (Pitch 2)', other
+        game.save()
+        self.assertEqual(Game.objects.get(pk=game.pk).venue, other)
+
+    def test_bulk_inserted_games_are_assigned_in_batches(self):
+        Game.objects.bulk_create([
+            Game(name=f'Game {i}', location=location, date_time=timezone.now() + timedelta(days=1),
+                 coin_price=100, total_slots=10, created_by=self.admin)
+            for i, location in enumerate(['Abuja Arena', 'abuja arena', 'Abuja Arena', 'Ikeja Turf', ''])
+        ])
+
+        # One query for the locations, then five per batch of location strings
+        with self.assertNumQueries(11):
+            self.assertEqual(assign_venues(batch_size=2), 4)
+
+        self.assertEqual(
+            sorted(Venue.objects.values_list('name', 'normalized_name')),
+            [('Abuja Arena', 'abuja arena'), ('Ikeja Turf', 'ikeja turf')],
+        )
+        self.assertEqual(Game.objects.filter(venue__isnull=True).count(), 1)
+        self.assertEqual(assign_venues(), 0)
+
+    def test_create_game_respects_venue_capacity(self):
+        Venue.objects.create(name='Five-a-side Cage', normalized_name='five a side cage', capacity=10)
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        data = {
+            'name': 'Cage Match', 'location': 'five-a-side cage', 'date_time': timezone.now() + timedelta(days=3),
+            'coin_price': 100, 'total_slots': 12,
+        }
+
+        response = client.post('/api/games/create/', data)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('at most 10 players', str(response.data['total_slots']))
+        # Validation only reads venues; a new location's venue is made when the game is saved
+        serializer = GameCreateSerializer(data={**data, 'location': 'Nowhere Park'})
+        self.assertTrue(serializer.is_valid())
+        self.assertFalse(Venue.objects.filter(normalized_name='nowhere park').exists())
+        self.assertEqual(serializer.save(created_by=self.admin).venue.name, 'Nowhere Park')
+
+        data['total_slots'] = 10
+        self.assertEqual(client.post('/api/games/create/', data).status_code, 201)
+        self.assertEqual(Game.objects.get(location='five-a-side cage').venue.name, 'Five-a-side Cage')
+
+
+class NearbyGamesTests(TestCase):
+    """Tests for the games near me search."""
+
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin', password='testpass123', is_staff=True)
+        self.complex = Venue.objects.create(
+            name='Lagos Sports Complex', normalized_name='lagos sports complex', latitude=6.4990, longitude=3.3650,
+        )
+        self.ikeja = Venue.objects.create(name='Ikeja Turf', normalized_name='ikeja turf', latitude=6.6018, longitude=3.3515)
+        self.abuja = Venue.objects.create(name='Abuja Arena', normalized_name='abuja arena', latitude=9.0765, longitude=7.3986)
+        self.client = APIClient()
+
+    def test_venues_are_placed_in_the_grid(self):
+        self.assertEqual(self.complex.grid_cell, grid_cell(6.4990, 3.3650))
+        self.assertEqual(grid_cell(-90, -180), 0)
+        self.assertIsNone(Venue.objects.create(name='Somewhere', normalized_name='somewhere').grid_cell)
+        self.assertAlmostEqual(haversine_km(6.4990, 3.3650, 6.6018, 3.3515), 11.5, delta=0.1)
+
+    def test_bounding_box_wraps_at_the_antimeridian_and_poles(self):
+        south, north, longitudes = bounding_box(0, 179.95, 20)
+        self.assertEqual(len(longitudes), 2)
+        self.assertEqual(longitudes[1][0], -180.0)
+        self.assertLess(south, 0)
+        self.assertGreater(north, 0)
+        self.assertEqual(bounding_box(89.99, 0, 20)[2], [(-180.0, 180.0)])
+
+    def test_upcoming_games_within_the_radius_soonest_first(self):
+        later = make_game(self.admin, location='Ikeja Turf', date_time=timezone.now() + timedelta(days=3))
+        sooner = make_game(self.admin, location='Lagos Sports Complex', date_time=timezone.now() + timedelta(days=1))
+        make_game(self.admin, location='Abuja Arena')
+        make_game(self.admin, location='Lagos Sports Complex', status='cancelled')
+
+        # The venues in the box, then their games
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/games/nearby/', {'lat': 6.5, 'lng': 3.37, 'radius': 15})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['id'] for row in response.data['results']], [sooner.pk, later.pk])
+        self.assertLess(response.data['results'][0]['distance_km'], 1)
+        self.assertAlmostEqual(response.data['results'][1]['distance_km'], 11.5, delta=0.2)
+
+        response = self.client.get('/api/games/nearby/', {'lat': 6.5, 'lng': 3.37, 'radius': 5, 'limit': 1})
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(response.data['results'][0]['id'], sooner.pk)
+
+    def test_bad_coordinates_are_rejected(self):
+        for params in [{}, {'lat': 'north', 'lng': 3}, {'lat': 91, 'lng': 3}, {'lat': 6.5, 'lng': 3, 'radius': 500}]:
+            response = self.client.get('/api/games/nearby/', params)
+            self.assertEqual(response.status_code, 400)
+            self.assertIn('error', response.data)
+
+
+class GameSeriesTests(TestCase):
+    """Tests for materializing recurring game series."""
+
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin', password='testpass123', is_staff=True)
+        self.player = User.objects.create_user(username='player', password='testpass123', coin_balance=2000)
+        self.series = GameSeries.objects.create(
+            name='Night League', location='Lagos Sports Complex', coin_price=200, total_slots=10,
+            frequency='daily', interval=2, start_date=timezone.localdate() + timedelta(days=1),
+            start_time=time(19, 30), created_by=self.admin,
+        )
+
+    def test_weekly_rule(self):
+        series = GameSeries(frequency='weekly', interval=2, weekdays='mo, TH', start_date=date(2026, 11, 4))
+        self.assertEqual(
+            list(occurrence_dates(series, date(2026, 11, 1), date(2026, 11, 30))),
+            [date(2026, 11, 5), date(2026, 11, 16), date(2026, 11, 19), date(2026, 11, 30)],
+        )
+        series.end_date = date(2026, 11, 18)
+        self.assertEqual(len(list(occurrence_dates(series, date(2026, 11, 1), date(2026, 11, 30)))), 2)
+
+    def test_materializing_is_idempotent(self):
+        self.assertEqual(materialize(self.series, horizon_days=13)['created'], 7)
+        games = Game.objects.filter(series=self.series).order_by('date_time')
+        self.assertEqual(games[0].date_time.time(), time(19, 30))
+        self.assertEqual(games[0].venue, self.series.venue)
+
+        # Nothing differs, so only reads (and the savepoint) run
+        with self.assertNumQueries(5):
+            counts = materialize(self.series, horizon_days=13)
+        self.assertEqual(sum(counts.values()), 0)
+
+        self.assertEqual(materialize_series(horizon_days=15)['created'], 1)
+
+    def test_series_edits_reach_upcoming_games(self):
+        materialize(self.series, horizon_days=13)
+        booked = Game.objects.filter(series=self.series).order_by('date_time').first()
+        Booking.book(self.player, booked, slots=6)
+
+        self.series.coin_price, self.series.total_slots, self.series.start_time = 300, 5, time(20, 0)
+        self.series.save()
+        counts = materialize(self.series, horizon_days=13)
+        self.assertEqual((counts['updated'], counts['moved']), (7, 7))
+
+        games = Game.objects.filter(series=self.series)
+        self.assertEqual(set(games.values_list('coin_price', flat=True)), {300})
+        self.assertEqual(games.get(pk=booked.pk).total_slots, 6)
+        self.assertEqual(games.exclude(pk=booked.pk).filter(total_slots=5).count(), 6)
+        self.assertEqual({game.date_time.time() for game in games}, {time(20, 0)})
+        self.assertEqual(sum(materialize(self.series, horizon_days=13).values()), 0)
+
+    def test_pausing_cancels_unbooked_games(self):
+        materialize(self.series, horizon_days=13)
+        booked = Game.objects.filter(series=self.series).order_by('date_time').first()
+        Booking.book(self.player, booked)
+
+        self.series.is_active = False
+        self.series.save()
+        counts = materialize(self.series, horizon_days=13)
+        self.assertEqual((counts['cancelled'], counts['kept']), (6, 1))
+        self.assertEqual(Game.objects.get(pk=booked.pk).status, 'upcoming')
+
+        # The freed dates are scheduled again once the series resumes
+        self.series.is_active = True
+        self.series.save()
+        self.assertEqual(materialize(self.series, horizon_days=13)['created'], 6)
+
+    def test_create_series_api(self):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        data = {
+            'name': 'Sunday Kickabout', 'location': 'Ikeja Turf', 'coin_price': 100, 'total_slots': 14,
+            'frequency': 'weekly', 'weekdays': 'su,we', 'start_date': timezone.localdate() + timedelta(days=1),
+            'start_time': '08:00',
+        }
+
+        response = client.post('/api/games/series/create/', data)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['weekdays'], 'WE,SU')
+        self.assertTrue(Game.objects.filter(series_id=response.data['id']).exists())
+
+        data['weekdays'] = 'XX'
+        self.assertEqual(client.post('/api/games/series/create/', data).status_code, 400)
+
+
+class GameImportTests(TestCase):
+    """Tests for importing games in bulk."""
+
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin', password='testpass123', is_staff=True)
+        self.kick_off = (timezone.now() + timedelta(days=5)).replace(microsecond=0)
+        make_game(self.admin, name='Elite League Match', location='Ikeja Turf', date_time=self.kick_off)
+        Venue.objects.create(name='Five-a-side Cage', normalized_name='five a side cage', capacity=10)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def csv_file(self, rows):
+        lines = ['name,location,date_time,coin_price,total_slots,description']
+        lines += [','.join(row) for row in rows]
+        return SimpleUploadedFile('games.csv', '\n'.join(lines).encode())
+
+    def test_valid_rows_are_created_and_bad_ones_reported(self):
+        when = self.kick_off.isoformat()
+        upload = self.csv_file([
+            ['Weekend Warriors', 'Lagos Sports Complex', when, '500', '22', 'Bring boots'],
+            ['Weekend Warriors', 'lagos sports complex', (self.kick_off + timedelta(days=7)).isoformat(), '500', '22', ''],
+            ['Corporate League', 'Yaba', 'next friday', '-5', 'many', ''],
+            ['Weekend Warriors', 'Lagos Sports Complex', when, '500', '22', ''],
+            ['Elite League Match', 'Ikeja Turf', when, '400', '20', ''],
+            ['Cage Match', 'Five-a-side Cage', when, '100', '12', ''],
+            ['Big Match', 'Yaba', when, '2147483648', '9' * 5000, ''],
+        ])
+        # A game outside the import, left without a venue
+        Game.objects.filter(name='Elite League Match').update(venue=None)
+
+        response = self.client.post('/api/games/import/', {'file': upload})
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['created'], 2)
+        errors = {error['row']: error['errors'] for error in response.data['errors']}
+        self.assertEqual(sorted(errors), [3, 4, 5, 6, 7])
+        self.assertEqual(sorted(errors[3]), ['coin_price', 'date_time', 'total_slots'])
+        self.assertIn('row 1', errors[4]['non_field_errors'][0])
+        self.assertIn('already exists', errors[5]['non_field_errors'][0])
+        self.assertIn('at most 10 players', errors[6]['total_slots'][0])
+        self.assertIn('less than or equal to 2147483647', errors[7]['coin_price'][0])
+        self.assertEqual(errors[7]['total_slots'], ['A whole number is required.'])
+
+        imported = Game.objects.filter(name='Weekend Warriors')
+        self.assertEqual(imported.values('venue').distinct().count(), 1)
+        self.assertIsNotNone(imported.first().venue_id)
+        self.assertIsNone(Game.objects.get(name='Elite League Match').venue_id)
+        self.assertEqual(imported.get(description='Bring boots').date_time, self.kick_off)
+
+    def test_validation_queries_do_not_grow_with_rows(self):
+        rows = [
+            {'name': f'Game {i}', 'location': 'Lekki', 'date_time': (self.kick_off + timedelta(hours=i)).isoformat(),
+             'coin_price': 300, 'total_slots': 18}
+            for i in range(50)
+        ]
+        # Venue capacities, then existing games
+        with self.assertNumQueries(2):
+            games, errors = validate_rows(rows)
+        self.assertEqual((len(games), errors), (50, []))
+
+    def test_json_body_and_dry_run(self):
+        games = [{'name': 'Night Game', 'location': 'Lekki', 'date_time': self.kick_off.isoformat(),
+                  'coin_price': 300, 'total_slots': 18}]
+
+        response = self.client.post('/api/games/import/?dry_run=1', games, format='json')
+        self.assertEqual((response.status_code, response.data['created'], response.data['valid']), (200, 0, 1))
+        self.assertFalse(Game.objects.filter(name='Night Game').exists())
+
+        response = self.client.post('/api/games/import/', {'games': games}, format='json')
+        self.assertEqual(response.status_code, 201)
+        response = self.client.post('/api/games/import/', {'games': games}, format='json')
+        self.assertEqual((response.status_code, response.data['created']), (400, 0))
+
+        bad = SimpleUploadedFile('games.xml', b'<games/>')
+        self.assertEqual(self.client.post('/api/games/import/', {'file': bad}).status_code, 400)
+
+    def test_import_command(self):
+        games = [{'name': 'Sunday Kickabout', 'location': 'Ajah', 'date_time': self.kick_off.isoformat(),
+                  'coin_price': '250', 'total_slots': '16'}, {'name': 'Broken'}]
+        with tempfile.NamedTemporaryFile('w', suffix='.json') as handle:
+            json.dump(games, handle)
+            handle.flush()
+            out, err = io.StringIO(), io.StringIO()
+            call_command('import_games', handle.name, created_by='admin', stdout=out, stderr=err)
+
+        self.assertIn('1 games created, 1 rows rejected', out.getvalue())
+        self.assertIn('Row 2: location', err.getvalue())
+        self.assertEqual(Game.objects.get(name='Sunday Kickabout').created_by, self.admin)
+        self.assertEqual(import_games([], self.admin).created, 0)
+
+
+class SlotHoldTests(TestCase):
+    """Tests for checkout holds."""
+
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin', password='testpass123')
+        self.game = make_game(self.admin, total_slots=2, coin_price=100)
+        self.players = [
+            User.objects.create_user(username=f'player{i}', password='testpass123', coin_balance=500)
+            for i in range(3)
+        ]
+
+    def expire(self, *holds):
+        SlotHold.objects.filter(pk__in=[hold.pk for hold in holds]).update(
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+
+    def test_holds_reserve_slots_until_confirmed(self):
+        hold = hold_slots(self.players[0], self.game, slots=2)
+        self.game.refresh_from_db()
+        self.assertEqual((self.game.held_slots, self.game.available_slots, self.game.is_full), (2, 0, True))
+        with self.assertRaisesMessage(BookingError, 'Not enough slots'):
+            Booking.book(self.players[1], self.game)
+
+        booking = confirm_hold(self.players[0], hold.token, notes='five-a-side')
+        self.game.refresh_from_db()
+        self.players[0].refresh_from_db()
+        self.assertEqual((booking.slots, booking.coins_paid, booking.notes), (2, 200, 'five-a-side'))
+        self.assertEqual((self.game.booked_slots, self.game.held_slots), (2, 0))
+        self.assertEqual(self.players[0].coin_balance, 300)
+        self.assertFalse(SlotHold.objects.exists())
+        with self.assertRaisesMessage(BookingError, 'expired'):
+            confirm_hold(self.players[0], hold.token)
+
+    def test_expired_holds_are_released_when_slots_run_short(self):
+        hold = hold_slots(self.players[0], self.game, slots=2)
+        self.expire(hold)
+        with self.assertRaisesMessage(BookingError, 'expired'):
+            confirm_hold(self.players[0], hold.token)
+
+        Booking.book(self.players[1], self.game)
+        self.game.refresh_from_db()
+        self.assertEqual((self.game.booked_slots, self.game.held_slots), (1, 0))
+        # The lapsed holder can hold again
+        hold_slots(self.players[0], self.game)
+
+    def test_failed_confirmation_keeps_the_hold(self):
+        hold = hold_slots(self.players[0], self.game)
+        User.objects.filter(pk=self.players[0].pk).update(coin_balance=0)
+        with self.assertRaisesMessage(BookingError, 'Insufficient coins'):
+            confirm_hold(self.players[0], hold.token)
+        self.assertTrue(SlotHold.objects.filter(pk=hold.pk).exists())
+        self.assertTrue(release_hold(self.players[0], hold.token))
+        self.assertFalse(release_hold(self.players[0], hold.token))
+        self.game.refresh_from_db()
+        self.assertEqual(self.game.held_slots, 0)
+
+    def test_sweep_releases_in_fixed_queries(self):
+        games = [self.game] + [make_game(self.admin, total_slots=5) for _ in range(3)]
+        holds = [hold_slots(player, game) for game in games for player in self.players[:2]]
+        self.expire(*holds[:-1])
+
+        # One batch (with its waitlist check), then the query that finds nothing left
+        with self.assertNumQueries(9):
+            self.assertEqual(sweep_expired_holds(), 7)
+        self.assertEqual(list(SlotHold.objects.values_list('pk', flat=True)), [holds[-1].pk])
+        held = dict(Game.objects.values_list('pk', 'held_slots'))
+        self.assertEqual([held[game.pk] for game in games], [0, 0, 0, 1])
+
+    def test_given_back_slots_go_to_the_waitlist(self):
+        hold = hold_slots(self.players[0], self.game, slots=2)
+        self.game.refresh_from_db()
+        join_waitlist(self.players[1], self.game)
+        join_waitlist(self.players[2], self.game)
+
+        self.expire(hold)
+        with self.captureOnCommitCallbacks(execute=True):
+            sweep_expired_holds()
+        self.assertEqual(
+            sorted(Booking.objects.filter(game=self.game).values_list('user__username', flat=True)),
+            ['player1', 'player2'],
+        )
+
+        game = make_game(self.admin, total_slots=1, coin_price=100)
+        hold = hold_slots(self.players[0], game)
+        game.refresh_from_db()
+        join_waitlist(self.players[1], game)
+        with self.captureOnCommitCallbacks(execute=True):
+            release_hold(self.players[0], hold.token)
+        self.assertEqual(WaitlistEntry.objects.get(game=game).status, 'promoted')
+
+    def test_hold_lookups_are_cached(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            hold = hold_slots(self.players[0], self.game)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_hold(hold.token)['slots'], 1)
+        cache.clear()
+        self.assertEqual(get_hold(hold.token)['game'], self.game.pk)
+        self.expire(hold)
+        cache.clear()
+        self.assertIsNone(get_hold(hold.token))
+
+    def test_hold_api(self):
+        client = APIClient()
+        client.force_authenticate(self.players[0])
+        response = client.post('/api/games/holds/create/', {'game': self.game.pk, 'slots': 1}, format='json')
+        self.assertEqual(response.status_code, 201)
+        token = response.data['hold']['token']
+        self.assertEqual(client.get(f'/api/games/{self.game.pk}/').data['available_slots'], 1)
+        self.assertEqual(client.get('/api/games/').data['results'][0]['available_slots'], 1)
+        self.assertEqual(client.get(f'/api/games/holds/{token}/').data['slots'], 1)
+
+        other = APIClient()
+        other.force_authenticate(self.players[1])
+        self.assertEqual(other.get(f'/api/games/holds/{token}/').status_code, 404)
+        self.assertEqual(other.post(f'/api/games/holds/{token}/confirm/').status_code, 400)
+
+        response = client.post(f'/api/games/holds/{token}/confirm/')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['booking']['slots'], 1)
+        self.assertEqual(client.delete(f'/api/games/holds/{token}/').status_code, 404)
+
+
+class SlotEventsTests(TransactionTestCase):
+    """Tests for the live slot availability streams."""
+
+    def setUp(self):
+        self.player = User.objects.create_user(username='player', password='testpass123', coin_balance=1000)
+        self.game = make_game(self.player, total_slots=2)
+        self.application = events_router(self.django_application)
+
+    async def django_application(self, scope, receive, send):
+        await send({'type': 'http.response.start', 'status': 204, 'headers': []})
+        await send({'type': 'http.response.body', 'body': b''})
+
+    def open_stream(self, path, method='GET', headers=()):
+        scope = {'type': 'http', 'method': method, 'path': path, 'headers': list(headers)}
+        return ApplicationCommunicator(self.application, scope)
+
+    async def receive_body(self, communicator):
+        return (await communicator.receive_output(5))['body'].decode()
+
+    async def test_catalogue_stream_relays_bookings(self):
+        communicator = self.open_stream('/api/games/events/')
+        start = await communicator.receive_output(5)
+        self.assertEqual(start['status'], 200)
+        self.assertIn((b'content-type', b'text/event-stream'), start['headers'])
+        snapshot = await self.receive_body(communicator)
+        self.assertIn('event: snapshot', snapshot)
+        self.assertIn(f'"game":{self.game.pk},"available_slots":2', snapshot)
+
+        await sync_to_async(Booking.book)(self.player, self.game)
+        self.assertEqual(
+            await self.receive_body(communicator),
+            f'event: slots\ndata: {{"game":{self.game.pk},"available_slots":1,"status":"upcoming"}}\n\n',
+        )
+
+        await communicator.send_input({'type': 'http.disconnect'})
+        await communicator.wait(5)
+        self.assertFalse(get_broker().subscriber_count())
+
+    async def test_game_stream_only_relays_its_game(self):
+        other = await sync_to_async(make_game)(self.player)
+        communicator = self.open_stream(f'/api/games/{self.game.pk}/events/')
+        await communicator.receive_output(5)
+        self.assertIn('"available_slots":2', await self.receive_body(communicator))
+
+        await sync_to_async(Booking.book)(self.player, other)
+        await sync_to_async(Booking.book)(self.player, self.game)
+        body = await self.receive_body(communicator)
+        self.assertIn(f'"game":{self.game.pk},"available_slots":1', body)
+        self.assertNotIn(f'"game":{other.pk}', body)
+
+        await communicator.send_input({'type': 'http.disconnect'})
+        await communicator.wait(5)
+
+    async def test_errors(self):
+        communicator = self.open_stream('/api/games/999999/events/')
+        self.assertEqual((await communicator.receive_output(5))['status'], 404)
+        communicator = self.open_stream('/api/games/events/', method='POST')
+        self.assertEqual((await communicator.receive_output(5))['status'], 405)
+        with override_settings(SLOT_EVENTS_MAX_SUBSCRIBERS=0):
+            communicator = self.open_stream('/api/games/events/')
+            self.assertEqual((await communicator.receive_output(5))['status'], 503)
+        self.assertFalse(get_broker().subscriber_count())
+
+    async def test_cors_and_other_paths(self):
+        communicator = self.open_stream('/api/games/events/', headers=[(b'origin', b'http://localhost:3000')])
+        start = await communicator.receive_output(5)
+        self.assertIn((b'access-control-allow-origin', b'http://localhost:3000'), start['headers'])
+        await communicator.send_input({'type': 'http.disconnect'})
+        await communicator.wait(5)
+
+        communicator = self.open_stream('/api/games/')
+        self.assertEqual((await communicator.receive_output(5))['status'], 204)
+
+
+class GameLifecycleTests(TestCase):
+    """Tests for the batch lifecycle scheduler."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='player', password='testpass123', coin_balance=1000)
+        now = timezone.now()
+        self.future = make_game(self.user, date_time=now + timedelta(days=1))
+        self.started = make_game(self.user, date_time=now - timedelta(minutes=30))
+        self.finished = make_game(self.user, date_time=now - timedelta(days=1))
+        Booking.objects.create(user=self.user, game=self.finished, coins_paid=500)
+        Booking.objects.create(user=self.user, game=self.future, coins_paid=500)
+
+    def test_games_and_bookings_advance(self):
+        totals = advance_lifecycle(chunk_size=1)
+
+        self.assertEqual(totals['start_games'], 2)
+        self.assertEqual(totals['complete_games'], 1)
+        self.assertEqual(totals['complete_bookings'], 1)
+        statuses = dict(Game.objects.values_list('pk', 'status'))
+        self.assertEqual(statuses[self.future.pk], 'upcoming')
+        self.assertEqual(statuses[self.started.pk], 'ongoing')
+        self.assertEqual(statuses[self.finished.pk], 'completed')
+        self.assertEqual(Booking.objects.get(game=self.finished).status, 'completed')
+        self.assertEqual(Booking.objects.get(game=self.future).status, 'confirmed')
+
+    def test_rerun_is_idempotent_and_resets_checkpoint(self):
+        advance_lifecycle()
+        totals = advance_lifecycle()
+
+        self.assertEqual(sum(totals.values()), 0)
+        checkpoint = SchedulerCheckpoint.objects.get(name='game_lifecycle')
+        self.assertEqual(checkpoint.phase, '')
+        self.assertIsNotNone(checkpoint.last_run_at)
+
+    def test_started_games_leave_game_list(self):
+        response = APIClient().get('/api/games/')
+        ids = [game['id'] for game in response.data['results']]
+        self.assertEqual(ids, [self.future.pk])
+
+
+class MassRefundTests(TestCase):
+    """Tests for cancelling a game and refunding all bookings."""
+
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin', password='testpass123')
+        self.game = make_game(self.admin, total_slots=1000, coin_price=100)
+
+    def add_players(self, count):
+        players = User.objects.bulk_create([
+            User(username=f'player{self.game.pk}_{i}', coin_balance=0) for i in range(count)
+        ])
+        Booking.objects.bulk_create([
+            Booking(user=player, game=self.game, coins_paid=100, booking_reference=f'BK-T{i:06d}')
+            for i, player in enumerate(players)
+        ])
+        Game.objects.filter(pk=self.game.pk).update(booked_slots=count)
+        return players
+
+    def test_cancel_game_refunds_every_booking(self):
+        players = self.add_players(3)
+        waiter = User.objects.create_user(username='waiter', password='testpass123')
+        WaitlistEntry.objects.create(user=waiter, game=self.game)
+
+        self.assertEqual(cancel_game(self.game.pk), (3, 300))
+
+        self.game.refresh_from_db()
+        self.assertEqual((self.game.status, self.game.booked_slots), ('cancelled', 0))
+        self.assertEqual(
+            set(User.objects.filter(pk__in=[p.pk for p in players]).values_list('coin_balance', flat=True)),
+            {100}
+        )
+        self.assertFalse(Booking.objects.filter(game=self.game, status='confirmed').exists())
+        self.assertEqual(CoinLedgerEntry.objects.filter(reason='refund').count(), 3)
+        self.assertEqual(WaitlistEntry.objects.get(user=waiter).status, 'cancelled')
+        self.assertIsNone(cancel_game(self.game.pk))
+
+    def test_refund_statement_count_is_bounded(self):
+        self.add_players(1000)
+        # A constant handful of statements; SQLite splits the ledger insert
+        # into a few batches because of its bind-parameter limit.
+        with CaptureQueriesContext(connection) as queries:
+            cancel_game(self.game.pk)
+        self.assertLessEqual(len(queries), 20)
+
+
+class BookingLookupTests(AdminQueryCountMixin, TestCase):
+    """Tests for finding bookings by reference."""
+
+    def setUp(self):
+        self.player = User.objects.create_user(username='player', password='testpass123', coin_balance=1000)
+        self.booking = Booking.book(self.player, make_game(self.player))
+        self.api = APIClient()
+        self.api.force_authenticate(self.player)
+
+    def url(self, reference):
+        return f'/api/games/bookings/reference/{reference}/'
+
+    def test_lookup_by_typed_reference(self):
+        typed = self.booking.booking_reference.lower().replace('0', 'o').replace('1', 'l')
+        with self.assertNumQueries(1):
+            response = self.api.get(self.url(typed))
+        self.assertEqual(response.data['id'], self.booking.pk)
+
+    def test_bad_check_character_skips_the_database(self):
+        reference = self.booking.booking_reference
+        mistyped = reference[:-1] + ('0' if reference[-1] != '0' else '1')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.api.get(self.url(mistyped)).status_code, 404)
+
+    def test_legacy_references_and_permissions(self):
+        Booking.objects.filter(pk=self.booking.pk).update(booking_reference='BK-00C0FFEE')
+        self.assertEqual(self.api.get(self.url('bk-00c0ffee')).status_code, 200)
+        self.api.force_authenticate(User.objects.create_user(username='other', password='testpass123'))
+        self.assertEqual(self.api.get(self.url('BK-00C0FFEE')).status_code, 404)
+        self.api.force_authenticate(self.login_admin())
+        self.assertEqual(self.api.get(self.url('BK-00C0FFEE')).status_code, 200)
+
+    def test_admin_reference_modes(self):
+        self.login_admin()
+        reference = self.booking.booking_reference
+        for term, found in [(reference.lower(), 1), (f'ref:{reference[:6]}*', 1), ('BK-ZZ*', 0), ('user:player', 1), ('player', 1)]:
+            response = self.client.get('/admin/games/booking/', {'q': term})
+            self.assertEqual(response.context['cl'].result_count, found, term)
+
+
+class BookingArchiveTests(TestCase):
+    """Tests for moving bookings of finished games into the archive."""
+
+    def setUp(self):
+        self.player = User.objects.create_user(username='player', password='testpass123', coin_balance=1000)
+        self.old_game, self.new_game = make_game(self.player, coin_price=100), make_game(self.player, coin_price=50)
+        self.old_booking = Booking.book(self.player, self.old_game)
+        Booking.book(self.player, self.new_game)
+        Booking.book(User.objects.create_user(username='other', coin_balance=100), self.old_game).cancel_booking()
+        Game.objects.filter(pk=self.old_game.pk).update(
+            status='completed', date_time=timezone.now() - timedelta(days=200)
+        )
+        Booking.objects.filter(game=self.old_game, status='confirmed').update(status='completed')
+        self.api = APIClient()
+        self.api.force_authenticate(self.player)
+
+    def test_only_bookings_of_old_finished_games_move(self):
+        self.assertEqual(archive_bookings(timezone.now() - timedelta(days=180), batch_size=1), 2)
+
+        self.assertEqual(list(Booking.objects.values_list('game_id', flat=True)), [self.new_game.pk])
+        archived = BookingArchive.objects.get(pk=self.old_booking.pk)
+        self.assertEqual(
+            (archived.booking_reference, archived.status, archived.coins_paid, archived.created_at),
+            (self.old_booking.booking_reference, 'completed', 100, self.old_booking.created_at),
+        )
+        self.assertEqual(archive_bookings(timezone.now() - timedelta(days=180)), 0)
+
+    def test_archived_bookings_still_count(self):
+        refresh_rollups()
+        archive_bookings(timezone.now())
+
+        with self.assertNumQueries(1):
+            summary = self.api.get('/api/games/bookings/summary/').data
+        self.assertEqual((summary['total_bookings'], summary['completed_bookings']), (2, 1))
+        self.assertEqual(summary['total_coins_spent'], 50)
+
+        response = self.api.get(f'/api/games/bookings/reference/{self.old_booking.booking_reference}/')
+        self.assertEqual((response.status_code, response.data['id']), (200, self.old_booking.pk))
+
+        bookings = self.api.get('/api/games/bookings/').data
+        self.assertEqual(bookings['count'], 2)
+        self.assertEqual(
+            [(booking['game_name'], booking['status']) for booking in bookings['results']],
+            [('Weekend Warriors', 'confirmed'), ('Weekend Warriors', 'completed')],
+        )
+        self.assertEqual(bookings['results'][1]['booking_reference'], self.old_booking.booking_reference)
+        response = self.api.get(f'/api/games/bookings/{self.old_booking.pk}/')
+        self.assertEqual((response.status_code, response.data['status']), (200, 'completed'))
+        other = APIClient()
+        other.force_authenticate(User.objects.get(username='other'))
+        self.assertEqual(other.get(f'/api/games/bookings/{self.old_booking.pk}/').status_code, 404)
+
+        refresh_rollups(rebuild=True)
+        stats = GameStats.objects.get(game=self.old_game)
+        self.assertEqual((stats.bookings, stats.cancellations, stats.coins_booked), (1, 1, 100))
+
+
+class GamesAdminQueryTests(AdminQueryCountMixin, TestCase):
+    """Query-count regression tests for the games admin changelists."""
+
+    def setUp(self):
+        self.admin = self.login_admin()
+
+    def add_bookings(self, count):
+        for _ in range(count):
+            user = User.objects.create(username=f'player{User.objects.count()}', coin_balance=500)
+            Booking.book(user, make_game(user))
+
+    def test_game_changelist(self):
+        def add_rows(count):
+            for _ in range(count):
+                make_game(User.objects.create(username=f'creator{User.objects.count()}'))
+
+        self.assertChangelistQueriesConstant('/admin/games/game/', add_rows)
+
+    def test_game_changelist_search(self):
+        def add_rows(count):
+            for _ in range(count):
+                creator = User.objects.create(username=f'creator{User.objects.count()}')
+                make_game(creator, location='Surulere Astroturf')
+                make_game(creator, name='Friday Five-a-side')
+
+        self.assertChangelistQueriesConstant('/admin/games/game/?q=surulere', add_rows)
+        response = self.client.get('/admin/games/game/?q=FRIDAY')
+        self.assertEqual(response.context['cl'].result_count, 20)
+        self.assertTrue(all(game.name == 'Friday Five-a-side' for game in response.context['cl'].result_list))
+        # Prefix search: a word from the middle of the name doesn't match
+        response = self.client.get('/admin/games/game/?q=five')
+        self.assertEqual(response.context['cl'].result_count, 0)
+
+    def test_booking_changelist(self):
+        self.assertChangelistQueriesConstant('/admin/games/booking/', self.add_bookings)
+
+    def test_waitlist_changelist(self):
+        def add_rows(count):
+            for _ in range(count):
+                user = User.objects.create(username=f'waiter{User.objects.count()}')
+                WaitlistEntry.objects.create(user=user, game=make_game(user))
+
+        self.assertChangelistQueriesConstant('/admin/games/waitlistentry/', add_rows)
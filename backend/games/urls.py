@@ -6,9 +6,20 @@ app_name = 'games'
 urlpatterns = [
     path('', views.GameListView.as_view(), name='game-list'),
     path('create/', views.GameCreateView.as_view(), name='game-create'),
+    path('import/', views.import_games, name='game-import'),
+    path('series/create/', views.GameSeriesCreateView.as_view(), name='series-create'),
+    path('nearby/', views.nearby_games, name='nearby-games'),
     path('<int:pk>/', views.GameDetailView.as_view(), name='game-detail'),
+    path('<int:game_id>/waitlist/', views.join_waitlist, name='join-waitlist'),
+    path('<int:game_id>/waitlist/leave/', views.leave_waitlist, name='leave-waitlist'),
+    path('waitlist/', views.WaitlistEntryListView.as_view(), name='waitlist-list'),
     path('bookings/', views.BookingListView.as_view(), name='booking-list'),
     path('bookings/create/', views.BookingCreateView.as_view(), name='booking-create'),
+    path('bookings/bulk/', views.GroupBookingCreateView.as_view(), name='booking-bulk-create'),
+    path('holds/create/', views.SlotHoldCreateView.as_view(), name='hold-create'),
+    path('holds/<str:token>/', views.slot_hold, name='hold-detail'),
+    path('holds/<str:token>/confirm/', views.confirm_hold, name='hold-confirm'),
+    path('bookings/reference/<str:reference>/', views.booking_by_reference, name='booking-by-reference'),
     path('bookings/<int:pk>/', views.BookingDetailView.as_view(), name='booking-detail'),
     path('bookings/<int:booking_id>/cancel/', views.cancel_booking, name='cancel-booking'),
     path('bookings/summary/', views.user_bookings_summary, name='bookings-summary'),
@@ -0,0 +1,68 @@
+"""
+Venues: one row per place games are played.
+
+``Game.location`` is free text typed by admins, so one venue turns up as
+"Lagos Sports Complex", "lagos sports complex " and "Lagos Sports
+Complex." alike. ``normalize_venue_name`` folds those spellings together,
+and ``Venue.normalized_name`` is unique, so each place gets exactly one
+venue. Games point at their venue, which lets lists, rollups and caches
+work per venue id instead of scanning location strings.
+
+New games are matched in ``Game.save``, and matched again when their
+location is edited (``VenueMatchMixin``). ``assign_venues`` matches games
+inserted without it (``bulk_create``), a batch of location strings at a
+time; migration 0011 did the same for the games that predate venues.
+"""
+import re
+import unicodedata
+
+from django.db import transaction
+from django.db.models import Case, Count, Value, When
+
+from .models import Game, Venue
+
+NON_WORD = re.compile(r'[\W_]+')
+
+# Distinct location strings matched per batch
+LOCATION_BATCH = 500
+
+
+def normalize_venue_name(name):
+    """Fold case, accents, punctuation and spacing, so spellings of one venue match."""
+    text = unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode()
+    return NON_WORD.sub(' ', text).strip().casefold()
+
+
+def assign_venues(games=None, batch_size=LOCATION_BATCH):
+    """
+    Point every game without a venue at the venue of its location, creating venues as needed.
+
+    ``games`` narrows this to a queryset of games (by default all of them).
+    A new venue is named after its most used spelling. Each batch commits
+    on its own. Returns the number of games assigned.
+    """
+    games = Game.objects.all() if games is None else games
+    locations = list(
+        games.filter(venue__isnull=True).exclude(location='')
+        .values('location').annotate(games=Count('id')).order_by('-games', 'location')
+        .values_list('location', flat=True)
+    )
+    assigned = 0
+    for start in range(0, len(locations), batch_size):
+        batch = {location: normalize_venue_name(location) for location in locations[start:start + batch_size]}
+        spellings = {}
+        for location, normalized in batch.items():
+            if normalized:
+                spellings.setdefault(normalized, location.strip())
+        with transaction.atomic():
+            Venue.objects.bulk_create(
+                [Venue(name=name, normalized_name=normalized) for normalized, name in spellings.items()],
+                ignore_conflicts=True,
+            )
+            venue_ids = dict(Venue.objects.filter(normalized_name__in=spellings).values_list('normalized_name', 'pk'))
+            matched = {location: venue_ids[normalized] for location, normalized in batch.items() if normalized}
+            if matched:
+                assigned += games.filter(location__in=matched, venue__isnull=True).update(
+                    venue=Case(*(When(location=location, then=Value(pk)) for location, pk in matched.items()))
+                )
+    return assigned
@@ -1,24 +1,57 @@
+from collections import Counter
+
 from rest_framework import status, generics, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
+from django.db.models import Count, Max, Sum
+from django.http import Http404
 from django.shortcuts import get_object_or_404
-from .models import Game, Booking
+from django.utils import timezone
+from galactiturf.coalesce import CoalescedCacheMixin
+from galactiturf.db_router import ReplicaReadMixin, read_from_replica
+from galactiturf.serializers import ValuesListMixin
+from .models import Game, GameSeries, Booking, BookingArchive, BookingError, WaitlistEntry, parse_booking_reference
 from .serializers import (
-    GameSerializer, GameCreateSerializer,
-    BookingSerializer, BookingCreateSerializer
+    GameSerializer, GameValuesSerializer, GameCreateSerializer,
+    BookingSerializer, BookingValuesSerializer, BookingCreateSerializer,
+    GameSeriesSerializer, GroupBookingCreateSerializer, SlotHoldCreateSerializer, WaitlistEntrySerializer
 )
+from . import geo, holds, imports, series, waitlist
 
 
-class GameListView(generics.ListAPIView):
-    """View for listing all games."""
+class GameCacheMixin(CoalescedCacheMixin):
+    """Cache game responses until a game they show changes."""
+    
+    cache_prefix = 'games'
     
-    queryset = Game.objects.filter(status='upcoming').order_by('date_time')
+    def get_version_queryset(self):
+        """The games whose changes invalidate this response."""
+        return Game.objects.all()
+    
+    def get_cache_version(self):
+        # Booking, cancelling and the lifecycle job all touch updated_at;
+        # the count changes when a game is deleted, which no updated_at shows
+        version = self.get_version_queryset().aggregate(latest=Max('updated_at'), games=Count('id'))
+        latest = version['latest'].timestamp() if version['latest'] else 0
+        return f"{latest}-{version['games']}"
+
+
+class GameListView(GameCacheMixin, ReplicaReadMixin, ValuesListMixin, generics.ListAPIView):
+    """View for listing all games, or one venue's with ``?venue=<id>``."""
+    
+    queryset = Game.objects.filter(status='upcoming').select_related('created_by').order_by('date_time')
     serializer_class = GameSerializer
+    values_serializer_class = GameValuesSerializer
     permission_classes = [permissions.AllowAny]
     
     def get_queryset(self):
         """Filter games based on query parameters."""
-        queryset = super().get_queryset()
+        # Hide games that have kicked off but not been advanced by the scheduler yet
+        queryset = super().get_queryset().filter(date_time__gt=timezone.now())
+        
+        venue = self.venue_id()
+        if venue is not None:
+            queryset = queryset.filter(venue_id=venue)
         
         # Filter by location
         location = self.request.query_params.get('location', None)
@@ -35,14 +68,105 @@ class GameListView(generics.ListAPIView):
             queryset = queryset.filter(date_time__date__lte=date_to)
         
         return queryset
+    
+    def venue_id(self):
+        venue = self.request.query_params.get('venue', '')
+        return int(venue) if venue.isdigit() else None
+    
+    def get_version_queryset(self):
+        # A booking at one venue leaves every other venue's cached lists valid.
+        # A game that moves to another venue drops this venue's game count,
+        # so its lists are refreshed too (see GameCacheMixin)
+        venue = self.venue_id()
+        if venue is None:
+            return super().get_version_queryset()
+        return Game.objects.filter(venue_id=venue)
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAdminUser])
+def import_games(request):
+    """
+    Create games in bulk from an uploaded CSV or JSON ``file``, or from a JSON list of games.
+    
+    Valid rows are created even when others fail, and each failed row is
+    returned with its errors (see games.imports). ``?dry_run=1`` only
+    validates.
+    """
+    dry_run = request.query_params.get('dry_run') in ('1', 'true')
+    upload = request.FILES.get('file')
+    try:
+        if upload is not None:
+            file_format = request.query_params.get('format') or upload.name.rpartition('.')[2].lower()
+            rows = imports.read_rows(upload.read(), file_format)
+        else:
+            rows = request.data if isinstance(request.data, list) else request.data.get('games')
+        result = imports.import_games(rows, request.user, dry_run=dry_run)
+    except imports.GameImportError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    if not result.created and result.errors:
+        response_status = status.HTTP_400_BAD_REQUEST
+    elif result.created and not dry_run:
+        response_status = status.HTTP_201_CREATED
+    else:
+        response_status = status.HTTP_200_OK
+    return Response({
+        'created': 0 if dry_run else result.created,
+        'valid': result.created,
+        'errors': result.errors,
+    }, status=response_status)
+
+
+NEARBY_DEFAULT_RADIUS_KM = 10
+NEARBY_DEFAULT_LIMIT = 50
+NEARBY_MAX_LIMIT = 200
+
+
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def nearby_games(request):
+    """
+    Upcoming games within ``radius`` km (default 10, at most 100) of ``lat``/``lng``, soonest first.
+    
+    Returns up to ``limit`` games (default 50, at most 200), each with its
+    ``distance_km``. See games.geo for how the search stays on indexes.
+    """
+    try:
+        latitude = float(request.query_params['lat'])
+        longitude = float(request.query_params['lng'])
+        radius = float(request.query_params.get('radius', NEARBY_DEFAULT_RADIUS_KM))
+        limit = int(request.query_params.get('limit', NEARBY_DEFAULT_LIMIT))
+    except (KeyError, ValueError):
+        return Response({
+            'error': 'lat and lng are required; lat, lng and radius must be numbers and limit a whole number.'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180 and 0 < radius <= geo.MAX_RADIUS_KM):
+        return Response({
+            'error': f'lat must be between -90 and 90, lng between -180 and 180 and radius at most {geo.MAX_RADIUS_KM} km.'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    limit = min(max(limit, 1), NEARBY_MAX_LIMIT)
+    
+    with read_from_replica():
+        distances = geo.venues_within(latitude, longitude, radius)
+        games = Game.objects.filter(
+            venue_id__in=distances, status='upcoming', date_time__gt=timezone.now()
+        ).order_by('date_time')
+        rows = GameValuesSerializer(GameValuesSerializer.values(games)[:limit]).data if distances else []
+    for row in rows:
+        row['distance_km'] = round(distances[row['venue']], 2)
+    return Response({'count': len(rows), 'results': rows})
 
 
-class GameDetailView(generics.RetrieveAPIView):
+class GameDetailView(GameCacheMixin, ReplicaReadMixin, generics.RetrieveAPIView):
     """View for game details."""
     
-    queryset = Game.objects.all()
+    queryset = Game.objects.select_related('created_by')
     serializer_class = GameSerializer
     permission_classes = [permissions.AllowAny]
+    
+    def get_version_queryset(self):
+        return Game.objects.filter(pk=self.kwargs['pk'])
 
 
 class GameCreateView(generics.CreateAPIView):
@@ -57,15 +181,34 @@ class GameCreateView(generics.CreateAPIView):
         serializer.save(created_by=self.request.user)
 
 
-class BookingListView(generics.ListAPIView):
+class GameSeriesCreateView(generics.CreateAPIView):
+    """View for creating recurring game series (admin only)."""
+    
+    queryset = GameSeries.objects.all()
+    serializer_class = GameSeriesSerializer
+    permission_classes = [permissions.IsAdminUser]
+    
+    def perform_create(self, serializer):
+        """Set the creator of the series and schedule its first games."""
+        series.materialize(serializer.save(created_by=self.request.user))
+
+
+class BookingListView(ValuesListMixin, generics.ListAPIView):
     """View for listing user's bookings."""
     
     serializer_class = BookingSerializer
+    values_serializer_class = BookingValuesSerializer
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
         """Return bookings for the current user."""
-        return Booking.objects.filter(user=self.request.user).order_by('-created_at')
+        return Booking.objects.filter(user=self.request.user).select_related('user', 'game').order_by('-created_at')
+    
+    def get_values_queryset(self):
+        # Archived bookings have the same columns, so one UNION ALL lists both, newest first
+        values = self.values_serializer_class.values
+        archived = BookingArchive.objects.filter(user=self.request.user)
+        return values(self.get_queryset().order_by()).union(values(archived), all=True).order_by('-created_at', '-id')
 
 
 class BookingCreateView(generics.CreateAPIView):
@@ -86,6 +229,80 @@ class BookingCreateView(generics.CreateAPIView):
         }, status=status.HTTP_201_CREATED)
 
 
+class GroupBookingCreateView(generics.CreateAPIView):
+    """View for booking several slots of a game in one transaction."""
+    
+    serializer_class = GroupBookingCreateSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def create(self, request, *args, **kwargs):
+        """Create a group booking and return response."""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        booking = serializer.save()
+        
+        return Response({
+            'message': f'{booking.slots} slots booked successfully!',
+            'booking': BookingSerializer(booking).data
+        }, status=status.HTTP_201_CREATED)
+
+
+class SlotHoldCreateView(generics.CreateAPIView):
+    """View for holding slots in a game while the user checks out."""
+    
+    serializer_class = SlotHoldCreateSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def create(self, request, *args, **kwargs):
+        """Hold the slots and return the hold."""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        hold = serializer.save()
+        
+        return Response({
+            'message': f'{hold.slots} slots held until {hold.expires_at:%H:%M:%S}. Confirm the hold to book them.',
+            'hold': holds.hold_data(hold)
+        }, status=status.HTTP_201_CREATED)
+
+
+@api_view(['GET', 'DELETE'])
+@permission_classes([permissions.IsAuthenticated])
+def slot_hold(request, token):
+    """Get or release one of the user's holds."""
+    if request.method == 'DELETE':
+        if not holds.release_hold(request.user, token):
+            return Response({
+                'error': 'This hold has already expired or been used.'
+            }, status=status.HTTP_404_NOT_FOUND)
+        return Response({
+            'message': 'The held slots have been released.'
+        })
+    
+    data = holds.get_hold(token)
+    if data is None or data['user'] != request.user.pk:
+        return Response({
+            'error': 'This hold has already expired or been used.'
+        }, status=status.HTTP_404_NOT_FOUND)
+    return Response(data)
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def confirm_hold(request, token):
+    """Book the slots of one of the user's holds."""
+    try:
+        booking = holds.confirm_hold(request.user, token, notes=request.data.get('notes', ''))
+    except BookingError as e:
+        return Response({
+            'error': str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    return Response({
+        'message': 'Game booked successfully!',
+        'booking': BookingSerializer(booking).data
+    }, status=status.HTTP_201_CREATED)
+
+
 class BookingDetailView(generics.RetrieveAPIView):
     """View for booking details."""
     
@@ -94,7 +311,37 @@ class BookingDetailView(generics.RetrieveAPIView):
     
     def get_queryset(self):
         """Return bookings for the current user."""
-        return Booking.objects.filter(user=self.request.user)
+        return Booking.objects.filter(user=self.request.user).select_related('user', 'game')
+    
+    def get_object(self):
+        try:
+            return super().get_object()
+        except Http404:
+            # Bookings of long-finished games keep their id in the archive
+            archived = BookingArchive.objects.filter(user=self.request.user).select_related('user', 'game')
+            return get_object_or_404(archived, pk=self.kwargs['pk'])
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def booking_by_reference(request, reference):
+    """Look a booking up by its reference: the user's own, or any for staff."""
+    reference = parse_booking_reference(reference)
+    if reference is None:
+        # Wrong shape or check character; no need to ask the database
+        return Response({
+            'error': 'That is not a valid booking reference.'
+        }, status=status.HTTP_404_NOT_FOUND)
+    
+    for model in (Booking, BookingArchive):
+        bookings = model.objects.select_related('user', 'game')
+        if not request.user.is_staff:
+            bookings = bookings.filter(user=request.user)
+        booking = bookings.filter(booking_reference=reference).first()
+        if booking is not None:
+            # Archived bookings have the same fields, so serialize the same way
+            return Response(BookingSerializer(booking).data)
+    return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
 
 
 @api_view(['POST'])
@@ -125,18 +372,68 @@ def user_bookings_summary(request):
     """Get user's booking summary."""
     user = request.user
     
-    total_bookings = user.bookings.count()
-    confirmed_bookings = user.bookings.filter(status='confirmed').count()
-    cancelled_bookings = user.bookings.filter(status='cancelled').count()
-    completed_bookings = user.bookings.filter(status='completed').count()
-    
-    total_coins_spent = sum(booking.coins_paid for booking in user.bookings.filter(status='confirmed'))
+    # One query for live and archived bookings: a few (status, count, coins) rows
+    archived = user.archived_bookings.values('status').annotate(count=Count('id'), coins=Sum('coins_paid')).order_by()
+    rows = user.bookings.values('status').annotate(count=Count('id'), coins=Sum('coins_paid')).order_by()
+    counts = Counter()
+    coins_spent = 0
+    for row in rows.union(archived, all=True):
+        counts[row['status']] += row['count']
+        if row['status'] == 'confirmed':
+            coins_spent += row['coins'] or 0
     
     return Response({
-        'total_bookings': total_bookings,
-        'confirmed_bookings': confirmed_bookings,
-        'cancelled_bookings': cancelled_bookings,
-        'completed_bookings': completed_bookings,
-        'total_coins_spent': total_coins_spent,
+        'total_bookings': sum(counts.values()),
+        'confirmed_bookings': counts['confirmed'],
+        'cancelled_bookings': counts['cancelled'],
+        'completed_bookings': counts['completed'],
+        'total_coins_spent': coins_spent,
         'current_balance': user.coin_balance
     })
+
+
+class WaitlistEntryListView(generics.ListAPIView):
+    """View for listing user's waitlist entries."""
+    
+    serializer_class = WaitlistEntrySerializer
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get_queryset(self):
+        """Return waitlist entries for the current user."""
+        return WaitlistEntry.objects.filter(user=self.request.user).select_related('game').order_by('-created_at')
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def join_waitlist(request, game_id):
+    """Join the waitlist of a full game."""
+    game = get_object_or_404(Game, id=game_id)
+    
+    try:
+        entry = waitlist.join_waitlist(request.user, game)
+    except BookingError as e:
+        return Response({
+            'error': str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    return Response({
+        'message': 'You have joined the waitlist. Coins are only deducted if a slot frees up.',
+        'entry': WaitlistEntrySerializer(entry).data,
+        'position': entry.position
+    }, status=status.HTTP_201_CREATED)
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def leave_waitlist(request, game_id):
+    """Leave the waitlist of a game."""
+    game = get_object_or_404(Game, id=game_id)
+    
+    if not waitlist.leave_waitlist(request.user, game):
+        return Response({
+            'error': 'You are not on the waitlist for this game.'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    return Response({
+        'message': 'You have left the waitlist.'
+    })
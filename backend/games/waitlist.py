@@ -0,0 +1,163 @@
+"""
+Waitlist engine for full games.
+
+Promotion works in locked batches: the game row is locked, the oldest
+waiting entries are read in one query, and every promoted user is charged,
+booked and marked as promoted with a fixed number of set-based statements.
+The query count depends on the number of batches, not on how many users
+are promoted, so a storm of cancellations (for example after a game is
+rescheduled) is absorbed in a handful of round trips.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+
+from accounts.models import CoinLedgerEntry, User
+from .models import (
+    REFERENCE_ATTEMPTS, Booking, BookingError, Game, WaitlistEntry, generate_booking_references,
+    publish_slots, reference_taken,
+)
+
+
+def join_waitlist(user, game):
+    """Queue a user for a slot in a full game."""
+    if not game.is_upcoming:
+        raise BookingError("This game is not available for booking.")
+    if not game.is_full:
+        raise BookingError("This game still has free slots. Book it directly.")
+    if Booking.objects.filter(user=user, game=game, status='confirmed').exists():
+        raise BookingError("You already have a booking for this game.")
+    if not user.has_sufficient_coins(game.coin_price):
+        raise BookingError("Insufficient coins to join the waitlist for this game.")
+    
+    entry, created = WaitlistEntry.objects.get_or_create(user=user, game=game, status='waiting')
+    if not created:
+        raise BookingError("You are already on the waitlist for this game.")
+    return entry
+
+
+def leave_waitlist(user, game):
+    """Remove a user's waiting entry for a game."""
+    return WaitlistEntry.objects.filter(user=user, game=game, status='waiting').update(
+        status='cancelled',
+        resolved_at=timezone.now()
+    )
+
+
+def create_with_references(bookings):
+    """Bulk-create bookings with fresh references, retrying the batch if one collides."""
+    if not bookings:
+        return []
+    for attempt in range(REFERENCE_ATTEMPTS):
+        for booking, reference in zip(bookings, generate_booking_references(len(bookings))):
+            booking.booking_reference = reference
+        try:
+            with transaction.atomic():
+                return Booking.objects.bulk_create(bookings)
+        except IntegrityError as error:
+            taken = [booking.booking_reference for booking in bookings]
+            if attempt + 1 == REFERENCE_ATTEMPTS or not reference_taken(error, taken):
+                raise
+
+
+def promote_waitlist(game_id, batch_size=100):
+    """
+    Fill a game's free slots from its waitlist, oldest entries first.
+    
+    Each batch runs a fixed number of queries regardless of its size.
+    Waiters who can no longer afford the game are marked as lapsed, and
+    waiters who booked directly in the meantime are marked as cancelled.
+    Returns the number of users promoted.
+    """
+    promoted_total = 0
+    
+    with transaction.atomic():
+        game = Game.objects.select_for_update().filter(pk=game_id).first()
+        if game is None or not game.is_upcoming:
+            return 0
+        
+        free_slots = game.available_slots
+        while free_slots > 0:
+            entries = list(
+                WaitlistEntry.objects.select_for_update()
+                .filter(game_id=game_id, status='waiting')
+                .order_by('created_at', 'id')
+                .values_list('id', 'user_id')[:min(free_slots, batch_size)]
+            )
+            if not entries:
+                break
+            
+            user_ids = [user_id for _, user_id in entries]
+            bookings = {
+                user_id: (status, reference)
+                for user_id, status, reference in Booking.objects.filter(
+                    game_id=game_id, user_id__in=user_ids
+                ).values_list('user_id', 'status', 'booking_reference')
+            }
+            balances = dict(
+                User.objects.select_for_update().filter(pk__in=user_ids).values_list('pk', 'coin_balance')
+            )
+            
+            promoted, resolved = [], {}
+            for entry_id, user_id in entries:
+                booking_status, _ = bookings.get(user_id, (None, None))
+                if booking_status == 'confirmed':
+                    resolved[entry_id] = 'cancelled'
+                elif balances.get(user_id, 0) < game.coin_price:
+                    resolved[entry_id] = 'lapsed'
+                else:
+                    promoted.append(user_id)
+                    resolved[entry_id] = 'promoted'
+            
+            now = timezone.now()
+            if promoted:
+                _book_promoted_users(game, promoted, bookings, now)
+            
+            WaitlistEntry.objects.filter(pk__in=list(resolved)).update(
+                status=Case(
+                    *[When(pk=entry_id, then=Value(status)) for entry_id, status in resolved.items()],
+                    default=F('status'),
+                ),
+                resolved_at=now
+            )
+            
+            promoted_total += len(promoted)
+            free_slots -= len(promoted)
+    
+    return promoted_total
+
+
+def _book_promoted_users(game, user_ids, existing_bookings, now):
+    """Charge and book a batch of promoted users in set-based statements."""
+    price = game.coin_price
+    
+    User.objects.filter(pk__in=user_ids).update(coin_balance=F('coin_balance') - price)
+    
+    # Users with a cancelled booking for this game keep their row (user, game is unique)
+    rebooked = [user_id for user_id in user_ids if user_id in existing_bookings]
+    if rebooked:
+        Booking.objects.filter(game_id=game.pk, user_id__in=rebooked).update(
+            status='confirmed',
+            slots=1,
+            coins_paid=price,
+            updated_at=now
+        )
+    
+    references = {user_id: existing_bookings[user_id][1] for user_id in rebooked}
+    new_bookings = [
+        Booking(user_id=user_id, game_id=game.pk, slots=1, coins_paid=price, notes='Promoted from waitlist')
+        for user_id in user_ids if user_id not in references
+    ]
+    create_with_references(new_bookings)
+    references.update((booking.user_id, booking.booking_reference) for booking in new_bookings)
+    
+    CoinLedgerEntry.objects.bulk_create([
+        CoinLedgerEntry(user_id=user_id, amount=-price, reason='booking', reference=references[user_id])
+        for user_id in user_ids
+    ])
+    
+    Game.objects.filter(pk=game.pk).update(
+        booked_slots=F('booked_slots') + len(user_ids),
+        updated_at=now
+    )
+    publish_slots(game.pk)
@@ -0,0 +1,49 @@
+"""
+Gunicorn settings for Render (``gunicorn -c gunicorn.conf.py``).
+
+Workers are uvicorn's ASGI workers, so one worker can hold thousands of
+idle live-availability streams (see ``games.availability``) alongside
+ordinary requests. Set ``GUNICORN_WORKER_CLASS=sync`` to serve the WSGI
+app instead, without the streams. Large downloads (finance exports, JSON
+history) are ``ChunkedStreamingResponse`` bodies, which stay streamed
+under either worker (see ``galactiturf.streaming``).
+
+The app is imported once in the master (``preload_app``) and the workers
+are forked from it, so a cold start pays for Django's imports and app
+loading once instead of once per worker, and the workers share those
+pages. Connections must not cross the fork, so each worker drops any it
+inherited and opens its own on first use.
+"""
+import gc
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'uvicorn_worker.UvicornWorker')
+wsgi_app = 'galactiturf.asgi:application' if 'Uvicorn' in worker_class else 'galactiturf.wsgi:application'
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'true').lower() in ('1', 'true', 'yes')
+
+
+def when_ready(server):
+    """Finish warming up in the master before the workers are forked."""
+    if not preload_app:
+        return
+    # Import every view module now rather than on each worker's first request
+    from django.urls import get_resolver
+    get_resolver().url_patterns
+
+    # Keep start-up objects out of the workers' garbage collection, so
+    # collections don't write to (and un-share) the forked pages
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    """Drop database and cache connections inherited from the master."""
+    if not preload_app:
+        return
+    from django.core.cache import caches
+    from django.db import connections
+
+    connections.close_all()
+    caches.close_all()
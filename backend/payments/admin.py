@@ -1,16 +1,33 @@
+import json
+
 from django.contrib import admin
-from .models import Transaction
+from django.utils.html import format_html
+from galactiturf.admin_exports import JSONExportMixin
+from galactiturf.admin_search import IndexedSearchMixin
+from galactiturf.pagination import EstimatedCountPaginator
+from .models import Transaction, TransactionArchive
 
 
 @admin.register(Transaction)
-class TransactionAdmin(admin.ModelAdmin):
+class TransactionAdmin(IndexedSearchMixin, JSONExportMixin, admin.ModelAdmin):
     """Admin configuration for Transaction model."""
     
     list_display = ['reference_id', 'user', 'transaction_type', 'amount', 'coins_amount', 'status', 'created_at']
     list_filter = ['transaction_type', 'status', 'created_at']
-    search_fields = ['reference_id', 'user__username', 'description']
+    list_select_related = ['user']
+    # Paystack references can't be told from usernames; ref: searches the reference index only
+    search_fields = ['=reference_id', '=user__username']
+    reference_field = 'reference_id'
+    autocomplete_fields = ['user']
     ordering = ['-created_at']
-    readonly_fields = ['created_at', 'updated_at']
+    readonly_fields = ['paystack_payload', 'created_at', 'updated_at']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ['export_as_json']
+    export_fields = [
+        'id', 'reference_id', 'user_id', 'user__username', 'transaction_type',
+        'amount', 'coins_amount', 'status', 'description', 'created_at', 'updated_at'
+    ]
     
     fieldsets = (
         ('Transaction Information', {
@@ -20,10 +37,38 @@ class TransactionAdmin(admin.ModelAdmin):
             'fields': ('amount', 'coins_amount')
         }),
         ('Additional Information', {
-            'fields': ('description', 'paystack_response')
+            'fields': ('description', 'paystack_payload')
         }),
         ('Metadata', {
             'fields': ('created_at', 'updated_at'),
             'classes': ('collapse',)
         }),
     )
+    
+    @admin.display(description='Paystack response')
+    def paystack_payload(self, obj):
+        # Loaded from TransactionPayload only when a single transaction is opened
+        return format_html('<pre>{}</pre>', json.dumps(obj.paystack_response, indent=2, sort_keys=True))
+
+
+@admin.register(TransactionArchive)
+class TransactionArchiveAdmin(IndexedSearchMixin, admin.ModelAdmin):
+    """Admin configuration for TransactionArchive model."""
+    
+    list_display = ['reference_id', 'user', 'transaction_type', 'amount', 'coins_amount', 'status', 'created_at']
+    list_filter = ['transaction_type', 'status']
+    list_select_related = ['user']
+    search_fields = ['=reference_id', '=user__username']
+    reference_field = 'reference_id'
+    ordering = ['-id']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    exclude = ['payload_data']
+    readonly_fields = [
+        'id', 'reference_id', 'user', 'transaction_type', 'status', 'amount', 'coins_amount',
+        'description', 'paystack_payload', 'created_at', 'updated_at', 'archived_at',
+    ]
+    
+    @admin.display(description='Paystack response')
+    def paystack_payload(self, obj):
+        return format_html('<pre>{}</pre>', json.dumps(obj.paystack_response, indent=2, sort_keys=True))
@@ -0,0 +1,27 @@
+"""
+Archiving settled transactions.
+
+A transaction that succeeded, failed or was cancelled never changes
+again. ``archive_transactions`` moves old ones, with their Paystack
+payloads, into ``TransactionArchive`` (see galactiturf.archive). Pending
+transactions stay in place, so a late Paystack callback still finds
+them. Archived transactions still count in the revenue rollups and
+reference lookups.
+"""
+from django.db.models import F
+
+from galactiturf.archive import move_rows
+from .models import Transaction, TransactionArchive
+
+SETTLED_STATUSES = ['success', 'failed', 'cancelled']
+
+TRANSACTION_FIELDS = [
+    'id', 'user_id', 'transaction_type', 'amount', 'coins_amount', 'reference_id', 'status',
+    'description', 'created_at', 'updated_at',
+]
+
+
+def archive_transactions(before, batch_size=1000):
+    """Archive the settled transactions created before ``before``; return how many moved."""
+    settled = Transaction.objects.filter(status__in=SETTLED_STATUSES, created_at__lt=before)
+    return move_rows(settled, TransactionArchive, TRANSACTION_FIELDS, batch_size, payload_data=F('payload__data'))
@@ -0,0 +1,255 @@
+"""
+Finance exports of transactions, bookings and coin ledger entries.
+
+Rows are read in (created_at, id) order for a date range. The read uses
+a server-side cursor inside a read-only transaction, on a replica when
+one is configured, and rows are encoded one chunk at a time, so memory
+stays flat however many rows are exported. Output formats:
+
+* ``csv``: header row plus one line per row;
+* ``jsonl``: one JSON object per line;
+* ``parquet``: columnar, one row group per ``EXPORT_ROW_GROUP_SIZE`` rows.
+  This needs the optional ``pyarrow`` package.
+"""
+import csv
+import io
+from datetime import datetime, time
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import models, router, transaction
+from django.utils import timezone
+
+from accounts.models import CoinLedgerArchive, CoinLedgerEntry
+from galactiturf.db_router import read_from_replica
+from games.models import Booking, BookingArchive
+from .models import Transaction, TransactionArchive
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+DATASETS = {
+    'transactions': (Transaction, [
+        'id', 'created_at', 'reference_id', 'user_id', 'user__username', 'transaction_type',
+        'status', 'amount', 'coins_amount', 'description',
+    ]),
+    'bookings': (Booking, [
+        'id', 'created_at', 'booking_reference', 'user_id', 'user__username', 'game_id',
+        'game__name', 'game__date_time', 'status', 'slots', 'coins_paid',
+    ]),
+    'transactions_archive': (TransactionArchive, [
+        'id', 'created_at', 'reference_id', 'user_id', 'user__username', 'transaction_type',
+        'status', 'amount', 'coins_amount', 'description',
+    ]),
+    'bookings_archive': (BookingArchive, [
+        'id', 'created_at', 'booking_reference', 'user_id', 'user__username', 'game_id',
+        'game__name', 'game__date_time', 'status', 'slots', 'coins_paid',
+    ]),
+    'ledger': (CoinLedgerEntry, [
+        'id', 'created_at', 'user_id', 'user__username', 'amount', 'reason', 'reference',
+    ]),
+    'ledger_archive': (CoinLedgerArchive, [
+        'id', 'created_at', 'user_id', 'user__username', 'amount', 'reason', 'reference',
+    ]),
+}
+
+FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'jsonl': ('application/x-ndjson', 'jsonl'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+}
+
+
+def load_pyarrow():
+    """Import pyarrow on first use, or return None when it isn't installed."""
+    # pyarrow takes tens of milliseconds to import, so it stays out of worker start-up
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        return None
+    return pyarrow
+
+
+class ExportError(Exception):
+    """Raised for an unknown dataset or format, or a missing optional dependency."""
+
+
+def parse_day(value):
+    """Turn YYYY-MM-DD into an aware datetime at midnight."""
+    try:
+        day = datetime.strptime(value, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        raise ExportError(f'Invalid date {value!r}; use YYYY-MM-DD.')
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def check_export(dataset, fmt):
+    if dataset not in DATASETS:
+        raise ExportError(f'Unknown dataset {dataset!r}; choose from {", ".join(DATASETS)}.')
+    if fmt not in FORMATS:
+        raise ExportError(f'Unknown format {fmt!r}; choose from {", ".join(FORMATS)}.')
+    if fmt == 'parquet' and load_pyarrow() is None:
+        raise ExportError('Parquet export needs the pyarrow package (pip install pyarrow).')
+
+
+def _model_field(model, lookup):
+    """Resolve a values() lookup such as ``game__date_time`` to its model field."""
+    *path, name = lookup.split('__')
+    for step in path:
+        model = model._meta.get_field(step).related_model
+    field = model._meta.get_field(name)
+    return field.target_field if field.is_relation else field
+
+
+def export_columns(dataset):
+    """Return [(column, model field)] for a dataset."""
+    model, columns = DATASETS[dataset]
+    return [(column, _model_field(model, column)) for column in columns]
+
+
+def iter_rows(dataset, start=None, end=None, chunk_size=None):
+    """Yield value tuples for rows created in [start, end), oldest first."""
+    model, columns = DATASETS[dataset]
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+
+    # Pick the replica before the first yield: no routing scope may stay
+    # open across yields, as the caller can resume us from another context
+    with read_from_replica():
+        alias = router.db_for_read(model)
+
+    queryset = model.objects.using(alias).all()
+    if start:
+        queryset = queryset.filter(created_at__gte=start)
+    if end:
+        queryset = queryset.filter(created_at__lt=end)
+    queryset = queryset.order_by('created_at', 'id').values_list(*columns)
+
+    # Inside a transaction PostgreSQL streams the named cursor instead
+    # of materialising the whole result as a WITH HOLD cursor
+    with transaction.atomic(using=alias):
+        yield from queryset.iterator(chunk_size=chunk_size)
+
+
+def _chunks(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def iter_csv(dataset, rows, chunk_size=None):
+    """Encode rows as CSV bytes, one chunk of rows at a time."""
+    columns = export_columns(dataset)
+    datetime_indexes = [i for i, (_, field) in enumerate(columns) if isinstance(field, models.DateTimeField)]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([column for column, _ in columns])
+
+    for chunk in _chunks(rows, chunk_size or settings.EXPORT_CHUNK_SIZE):
+        for row in chunk:
+            if datetime_indexes:
+                row = list(row)
+                for i in datetime_indexes:
+                    if row[i] is not None:
+                        row[i] = row[i].isoformat()
+            writer.writerow(row)
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f'Cannot export {type(value).__name__}')
+
+
+def iter_jsonl(dataset, rows, chunk_size=None):
+    """Encode rows as newline-delimited JSON objects."""
+    import json
+
+    columns = [column for column, _ in export_columns(dataset)]
+    for chunk in _chunks(rows, chunk_size or settings.EXPORT_CHUNK_SIZE):
+        if orjson is not None:
+            lines = [orjson.dumps(dict(zip(columns, row)), default=_json_default) for row in chunk]
+        else:
+            lines = [json.dumps(dict(zip(columns, row)), default=_json_default).encode('utf-8') for row in chunk]
+        yield b'\n'.join(lines) + b'\n'
+
+
+def _arrow_type(pyarrow, field):
+    if isinstance(field, models.DateTimeField):
+        return pyarrow.timestamp('us', tz='UTC')
+    if isinstance(field, models.DecimalField):
+        return pyarrow.decimal128(field.max_digits, field.decimal_places)
+    if isinstance(field, models.BooleanField):
+        return pyarrow.bool_()
+    if isinstance(field, (models.IntegerField, models.AutoField)):
+        return pyarrow.int64()
+    return pyarrow.string()
+
+
+class _Drain(io.RawIOBase):
+    """Write-only sink whose contents are collected after each row group."""
+
+    def __init__(self):
+        self.parts = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        return len(data)
+
+    def take(self):
+        data, self.parts = b''.join(self.parts), []
+        return data
+
+
+def iter_parquet(dataset, rows, row_group_size=None):
+    """Encode rows as a Parquet file, yielding bytes after every row group."""
+    pyarrow = load_pyarrow()
+    columns = export_columns(dataset)
+    schema = pyarrow.schema([(column, _arrow_type(pyarrow, field)) for column, field in columns])
+    sink = _Drain()
+    writer = pyarrow.parquet.ParquetWriter(sink, schema, compression='zstd')
+    try:
+        for chunk in _chunks(rows, row_group_size or settings.EXPORT_ROW_GROUP_SIZE):
+            arrays = [
+                pyarrow.array([row[i] for row in chunk], type=schema.field(i).type)
+                for i in range(len(columns))
+            ]
+            writer.write_table(pyarrow.Table.from_arrays(arrays, schema=schema))
+            yield sink.take()
+    finally:
+        writer.close()
+    yield sink.take()
+
+
+def iter_export(dataset, fmt, start=None, end=None):
+    """Yield the encoded export of a dataset as bytes."""
+    check_export(dataset, fmt)
+    rows = iter_rows(dataset, start, end)
+    if fmt == 'csv':
+        return iter_csv(dataset, rows)
+    if fmt == 'jsonl':
+        return iter_jsonl(dataset, rows)
+    return iter_parquet(dataset, rows)
+
+
+def export_filename(dataset, fmt, start=None, end=None):
+    dates = '_'.join(value.date().isoformat() for value in (start, end) if value)
+    return f'{dataset}{"_" + dates if dates else ""}.{FORMATS[fmt][1]}'
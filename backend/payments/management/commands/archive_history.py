@@ -0,0 +1,24 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from games.archive import archive_bookings
+from payments.archive import archive_transactions
+
+
+class Command(BaseCommand):
+    help = 'Move bookings of finished games and settled transactions older than N days into the archive tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=180, help='Keep the last N days in the live tables')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows moved per transaction')
+
+    def handle(self, *args, **options):
+        today = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+        before = today - timedelta(days=options['days'])
+        bookings = archive_bookings(before, batch_size=options['batch_size'])
+        transactions = archive_transactions(before, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Archived {bookings} bookings and {transactions} transactions from before {before.date()}'
+        ))
@@ -0,0 +1,57 @@
+import sys
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from payments.exports import DATASETS, FORMATS, ExportError, check_export, export_filename, iter_export, parse_day
+
+
+class Command(BaseCommand):
+    help = 'Export transactions, bookings and coin ledger entries for a date range'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dataset', choices=[*DATASETS, 'all'], default='all', help='What to export')
+        parser.add_argument('--from', dest='start', help='First day to include (YYYY-MM-DD)')
+        parser.add_argument('--to', dest='end', help='Day to stop before (YYYY-MM-DD)')
+        parser.add_argument('--format', dest='file_format', choices=list(FORMATS), default='csv', help='Output format')
+        parser.add_argument(
+            '--output',
+            help='File to write, or a directory when exporting all datasets. '
+                 'CSV and JSON lines go to stdout when omitted.',
+        )
+
+    def handle(self, *args, **options):
+        file_format = options['file_format']
+        datasets = list(DATASETS) if options['dataset'] == 'all' else [options['dataset']]
+        output = options['output']
+
+        try:
+            for dataset in datasets:
+                check_export(dataset, file_format)
+            start = parse_day(options['start']) if options['start'] else None
+            end = parse_day(options['end']) if options['end'] else None
+        except ExportError as e:
+            raise CommandError(str(e))
+
+        if output is None:
+            if file_format == 'parquet' or len(datasets) > 1:
+                raise CommandError('--output is required for Parquet and for exporting all datasets')
+            self.write_chunks(iter_export(datasets[0], file_format, start, end), sys.stdout.buffer)
+            return
+
+        path = Path(output)
+        if len(datasets) > 1:
+            path.mkdir(parents=True, exist_ok=True)
+        for dataset in datasets:
+            target = path / export_filename(dataset, file_format, start, end) if len(datasets) > 1 else path
+            with open(target, 'wb') as stream:
+                size = self.write_chunks(iter_export(dataset, file_format, start, end), stream)
+            self.stderr.write(self.style.SUCCESS(f'Wrote {dataset} to {target} ({size} bytes)'))
+
+    def write_chunks(self, chunks, stream):
+        size = 0
+        for chunk in chunks:
+            stream.write(chunk)
+            size += len(chunk)
+        stream.flush()
+        return size
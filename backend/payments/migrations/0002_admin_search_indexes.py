@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 22:55
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(django.db.models.functions.text.Upper('reference_id'), name='payments_tx_ref_upper'),
+        ),
+    ]
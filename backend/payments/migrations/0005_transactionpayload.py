@@ -0,0 +1,22 @@
+# Generated by Django 4.2.7 on 2026-10-18 23:32
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0004_transaction_rollup_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TransactionPayload',
+            fields=[
+                ('transaction', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='payload', serialize=False, to='payments.transaction')),
+                ('data', models.BinaryField(help_text='zlib-compressed JSON of the Paystack response')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,85 @@
+"""
+Copy Transaction.paystack_response into TransactionPayload in batches.
+
+The migration is not atomic: each batch commits on its own, so a large
+table is never copied in one long transaction, and an interrupted run
+resumes by skipping transactions that already have a payload.
+"""
+import json
+import zlib
+
+from django.db import migrations, transaction
+
+BATCH_SIZE = 1000
+
+
+def encode(payload):
+    return zlib.compress(json.dumps(payload, separators=(',', ':')).encode('utf-8'))
+
+
+def move_payloads(apps, schema_editor):
+    Transaction = apps.get_model('payments', 'Transaction')
+    TransactionPayload = apps.get_model('payments', 'TransactionPayload')
+    db = schema_editor.connection.alias
+
+    cursor = 0
+    while True:
+        rows = list(
+            Transaction.objects.using(db)
+            .filter(pk__gt=cursor)
+            .order_by('pk')
+            .values_list('pk', 'paystack_response')[:BATCH_SIZE]
+        )
+        if not rows:
+            break
+        cursor = rows[-1][0]
+
+        with transaction.atomic(using=db):
+            done = set(
+                TransactionPayload.objects.using(db)
+                .filter(transaction_id__in=[pk for pk, _ in rows])
+                .values_list('transaction_id', flat=True)
+            )
+            TransactionPayload.objects.using(db).bulk_create([
+                TransactionPayload(transaction_id=pk, data=encode(payload))
+                for pk, payload in rows
+                if payload and pk not in done
+            ])
+            # Free the space in the hot row before the column is dropped
+            Transaction.objects.using(db).filter(pk__in=[pk for pk, _ in rows]).update(paystack_response={})
+
+
+def restore_payloads(apps, schema_editor):
+    Transaction = apps.get_model('payments', 'Transaction')
+    TransactionPayload = apps.get_model('payments', 'TransactionPayload')
+    db = schema_editor.connection.alias
+
+    cursor = 0
+    while True:
+        payloads = list(
+            TransactionPayload.objects.using(db)
+            .filter(pk__gt=cursor)
+            .order_by('pk')[:BATCH_SIZE]
+        )
+        if not payloads:
+            break
+        cursor = payloads[-1].pk
+
+        with transaction.atomic(using=db):
+            for payload in payloads:
+                Transaction.objects.using(db).filter(pk=payload.pk).update(
+                    paystack_response=json.loads(zlib.decompress(bytes(payload.data)))
+                )
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('payments', '0005_transactionpayload'),
+    ]
+
+    operations = [
+        migrations.RunPython(move_payloads, restore_payloads),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 23:32
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0006_move_paystack_responses'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='transaction',
+            name='paystack_response',
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.7 on 2026-10-19 00:24
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('payments', '0007_remove_transaction_paystack_response'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='transaction',
+            options={},
+        ),
+        migrations.CreateModel(
+            name='TransactionArchive',
+            fields=[
+                ('id', models.BigIntegerField(help_text='ID the transaction had in the live table', primary_key=True, serialize=False)),
+                ('transaction_type', models.CharField(choices=[('subscription', 'Subscription'), ('booking', 'Game Booking'), ('refund', 'Refund')], max_length=20)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('coins_amount', models.IntegerField()),
+                ('reference_id', models.CharField(db_index=True, max_length=100)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('success', 'Success'), ('failed', 'Failed'), ('cancelled', 'Cancelled')], max_length=20)),
+                ('description', models.TextField(blank=True)),
+                ('payload_data', models.BinaryField(help_text='zlib-compressed JSON of the Paystack response', null=True)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_transactions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['created_at', 'id'], name='payments_txarch_created_idx')],
+            },
+        ),
+    ]
@@ -1,4 +1,9 @@
-from django.db import models
+import json
+import zlib
+
+from django.db import models, transaction
+from django.db.models.functions import Upper
+from django.utils import timezone
 from django.conf import settings
 
 
@@ -24,13 +29,16 @@ class Transaction(models.Model):
     coins_amount = models.IntegerField(help_text="Amount in coins")
     reference_id = models.CharField(max_length=100, unique=True, help_text="Paystack reference ID")
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
-    paystack_response = models.JSONField(default=dict, help_text="Full Paystack response")
     description = models.TextField(blank=True, help_text="Transaction description")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
-        ordering = ['-created_at']
+        indexes = [
+            models.Index(Upper('reference_id'), name='payments_tx_ref_upper'),
+            models.Index(fields=['created_at', 'id'], name='payments_tx_created_idx'),
+            models.Index(fields=['updated_at'], name='payments_tx_updated_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.username} - {self.transaction_type} - {self.reference_id}"
@@ -47,19 +55,108 @@ class Transaction(models.Model):
             description=description
         )
     
+    @property
+    def paystack_response(self):
+        """Full Paystack response, loaded from TransactionPayload on first access."""
+        try:
+            return self.payload.decoded()
+        except TransactionPayload.DoesNotExist:
+            return {}
+    
+    def store_paystack_response(self, paystack_response):
+        """Save the full Paystack response outside the transaction row."""
+        TransactionPayload.objects.update_or_create(
+            transaction=self, defaults={'data': TransactionPayload.encode(paystack_response)}
+        )
+        self._state.fields_cache.pop('payload', None)
+    
     def mark_successful(self, paystack_response):
         """Mark transaction as successful."""
-        self.status = 'success'
-        self.paystack_response = paystack_response
-        self.save()
+        with transaction.atomic():
+            self.status = 'success'
+            self.save()
+            self.store_paystack_response(paystack_response)
+    
+    def claim_successful(self, paystack_response):
+        """Mark a pending transaction successful; return False if it was already processed."""
+        with transaction.atomic():
+            claimed = Transaction.objects.filter(pk=self.pk, status='pending').update(
+                status='success',
+                updated_at=timezone.now()
+            )
+            if claimed:
+                self.status = 'success'
+                self.store_paystack_response(paystack_response)
+        return bool(claimed)
     
     def mark_failed(self, paystack_response):
         """Mark transaction as failed."""
-        self.status = 'failed'
-        self.paystack_response = paystack_response
-        self.save()
+        with transaction.atomic():
+            self.status = 'failed'
+            self.save()
+            self.store_paystack_response(paystack_response)
     
     def mark_cancelled(self):
         """Mark transaction as cancelled."""
         self.status = 'cancelled'
         self.save()
+
+
+class TransactionPayload(models.Model):
+    """
+    Model to keep the full Paystack response of a transaction.
+    
+    Payloads are large and rarely read, so they live outside the
+    Transaction row that dashboards and histories scan, stored as
+    zlib-compressed JSON.
+    """
+    
+    transaction = models.OneToOneField(
+        Transaction, on_delete=models.CASCADE, primary_key=True, related_name='payload'
+    )
+    data = models.BinaryField(help_text="zlib-compressed JSON of the Paystack response")
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"Payload of transaction {self.transaction_id}"
+    
+    @staticmethod
+    def encode(payload):
+        """Compress a JSON-serializable payload."""
+        return zlib.compress(json.dumps(payload, separators=(',', ':')).encode('utf-8'))
+    
+    def decoded(self):
+        """Return the stored payload."""
+        return json.loads(zlib.decompress(bytes(self.data)))
+
+
+class TransactionArchive(models.Model):
+    """Model to keep settled transactions moved out of Transaction (see payments.archive)."""
+    
+    id = models.BigIntegerField(primary_key=True, help_text="ID the transaction had in the live table")
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='archived_transactions')
+    transaction_type = models.CharField(max_length=20, choices=Transaction.TRANSACTION_TYPES)
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    coins_amount = models.IntegerField()
+    reference_id = models.CharField(max_length=100, db_index=True)
+    status = models.CharField(max_length=20, choices=Transaction.STATUS_CHOICES)
+    description = models.TextField(blank=True)
+    payload_data = models.BinaryField(null=True, help_text="zlib-compressed JSON of the Paystack response")
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='payments_txarch_created_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.reference_id} - {self.status} (archived)"
+    
+    @property
+    def paystack_response(self):
+        """Full Paystack response kept with the archived transaction."""
+        if self.payload_data is None:
+            return {}
+        return json.loads(zlib.decompress(bytes(self.payload_data)))
@@ -0,0 +1,28 @@
+"""
+Signed Paystack webhook bodies, for the payments tests and the load tests.
+
+Plain functions over json and hmac, so the load test client can import
+them without setting Django up.
+"""
+import hashlib
+import hmac
+import json
+
+
+def sign(body, secret):
+    """Return the X-Paystack-Signature header value for a raw webhook body."""
+    return hmac.new(secret.encode('utf-8'), body, hashlib.sha512).hexdigest()
+
+
+def charge_event(reference, amount_kobo, email, event='charge.success'):
+    """Build a webhook body (bytes) for a charge on the given reference."""
+    payload = {
+        'event': event,
+        'data': {
+            'reference': reference,
+            'amount': amount_kobo,
+            'status': 'success' if event == 'charge.success' else 'failed',
+            'customer': {'email': email},
+        },
+    }
+    return json.dumps(payload).encode('utf-8')
@@ -1,3 +1,284 @@
-from django.test import TestCase
+import contextvars
+import csv
+import io
+import json
+import os
+import tempfile
+import threading
+import unittest
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from asgiref.testing import ApplicationCommunicator
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounts.models import CoinLedgerEntry, User
+from galactiturf.testing import AdminQueryCountMixin
+from subscriptions.models import SubscriptionTier
+from . import exports
+from .models import Transaction, TransactionArchive, TransactionPayload
+from .testing import charge_event, sign
+
+
+@override_settings(PAYSTACK_SECRET_KEY='sk_test_webhook')
+class PaystackWebhookTests(TestCase):
+    """Tests for the signed Paystack webhook."""
+
+    def setUp(self):
+        SubscriptionTier.objects.create(name='bronze', price=5000, coins_awarded=1000)
+        self.user = User.objects.create_user(username='payer', password='testpass123', email='payer@example.com')
+        Transaction.create_transaction(
+            user=self.user, transaction_type='subscription', amount=5000, coins_amount=1000, reference_id='PS_WEBHOOK'
+        )
+
+    def deliver(self, secret='sk_test_webhook'):
+        body = charge_event('PS_WEBHOOK', 500000, self.user.email)
+        return self.client.post(
+            '/api/payments/webhook/', body, content_type='application/json',
+            HTTP_X_PAYSTACK_SIGNATURE=sign(body, secret)
+        )
+
+    def test_rejects_bad_signature(self):
+        self.assertEqual(self.deliver(secret='wrong').status_code, 400)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.coin_balance, 0)
+
+    def test_duplicate_delivery_credits_once(self):
+        self.assertEqual(self.deliver().data['message'], 'Payment processed successfully')
+        self.assertEqual(self.deliver().data['message'], 'Transaction already processed')
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.coin_balance, 1000)
+        self.assertEqual(self.user.subscription_tier, 'bronze')
+        self.assertEqual(self.user.coin_ledger.filter(reason='purchase').count(), 1)
+
+
+class TransactionPayloadTests(AdminQueryCountMixin, TestCase):
+    """Tests for Paystack responses stored outside the transaction row."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='payer', password='testpass123')
+        self.transaction = Transaction.create_transaction(
+            user=self.user, transaction_type='subscription', amount=5000, coins_amount=1000, reference_id='PS_PAYLOAD'
+        )
+
+    def test_missing_payload_reads_as_empty(self):
+        self.assertEqual(self.transaction.paystack_response, {})
+
+    def test_payload_round_trip(self):
+        self.transaction.mark_failed({'status': 'failed', 'gateway_response': 'Declined'})
+        self.transaction.mark_successful({'status': 'success', 'log': {'history': ['x'] * 200}})
+
+        stored = Transaction.objects.get(pk=self.transaction.pk)
+        self.assertEqual(stored.paystack_response['status'], 'success')
+        self.assertEqual(TransactionPayload.objects.count(), 1)
+        self.assertLess(len(TransactionPayload.objects.get().data), 200)
+
+    def test_claim_stores_payload_once(self):
+        self.assertTrue(self.transaction.claim_successful({'reference': 'PS_PAYLOAD', 'attempt': 1}))
+        self.assertFalse(self.transaction.claim_successful({'reference': 'PS_PAYLOAD', 'attempt': 2}))
+        self.assertEqual(Transaction.objects.get(pk=self.transaction.pk).paystack_response['attempt'], 1)
+
+    def test_admin_shows_payload(self):
+        self.login_admin()
+        self.transaction.mark_successful({'gateway_response': 'Approved'})
+        response = self.client.get(f'/admin/payments/transaction/{self.transaction.pk}/change/')
+        self.assertContains(response, 'Approved')
+
+
+class TransactionLookupTests(AdminQueryCountMixin, TestCase):
+    """Tests for finding transactions by payment reference."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='payer', password='testpass123')
+        Transaction.create_transaction(
+            user=self.user, transaction_type='subscription', amount=5000, coins_amount=1000, reference_id='PS_Lookup_1'
+        )
+        self.api = APIClient()
+
+    def test_owner_and_staff_can_look_up(self):
+        self.api.force_authenticate(self.user)
+        with self.assertNumQueries(1):
+            response = self.api.get('/api/payments/transactions/PS_Lookup_1/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['user'], response.data['coins_amount']), ('payer', 1000))
+
+        self.api.force_authenticate(User.objects.create_user(username='other', password='testpass123'))
+        self.assertEqual(self.api.get('/api/payments/transactions/PS_Lookup_1/').status_code, 404)
+        self.api.force_authenticate(self.login_admin())
+        self.assertEqual(self.api.get('/api/payments/transactions/PS_Lookup_1/').status_code, 200)
+
+    def test_admin_reference_modes(self):
+        self.login_admin()
+        for term, found in [('ref:PS_Lookup_1', 1), ('ref:PS_Look*', 1), ('ref:ps_lookup_1', 0), ('user:payer', 1), ('ps_lookup_1', 1)]:
+            response = self.client.get('/admin/payments/transaction/', {'q': term})
+            self.assertEqual(response.context['cl'].result_count, found, term)
+
+
+class TransactionArchiveTests(TestCase):
+    """Tests for moving settled transactions into the archive."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='payer', password='testpass123')
+        for reference, status in [('PS_OLD_PAID', 'success'), ('PS_OLD_OPEN', 'pending'), ('PS_NEW_PAID', 'success')]:
+            transaction = Transaction.create_transaction(
+                user=self.user, transaction_type='subscription', amount=5000, coins_amount=1000, reference_id=reference
+            )
+            transaction.status = status
+            transaction.save()
+        Transaction.objects.get(reference_id='PS_OLD_PAID').store_paystack_response({'status': 'success'})
+        Transaction.objects.exclude(reference_id='PS_NEW_PAID').update(created_at=timezone.now() - timedelta(days=400))
+
+    def test_settled_transactions_move_with_their_payload(self):
+        out = io.StringIO()
+        call_command('archive_history', days=180, stdout=out)
+        self.assertIn('Archived 0 bookings and 1 transactions', out.getvalue())
+
+        self.assertEqual(
+            sorted(Transaction.objects.values_list('reference_id', flat=True)), ['PS_NEW_PAID', 'PS_OLD_OPEN']
+        )
+        self.assertFalse(TransactionPayload.objects.exists())
+        archived = TransactionArchive.objects.get()
+        self.assertEqual((archived.reference_id, archived.paystack_response), ('PS_OLD_PAID', {'status': 'success'}))
+
+        api = APIClient()
+        api.force_authenticate(self.user)
+        response = api.get('/api/payments/transactions/PS_OLD_PAID/')
+        self.assertEqual((response.status_code, response.data['status']), (200, 'success'))
+
+
+class PaymentsAdminQueryTests(AdminQueryCountMixin, TestCase):
+    """Query-count regression tests for the payments admin changelists."""
+
+    def setUp(self):
+        self.login_admin()
+
+    def test_transaction_changelist(self):
+        def add_rows(count):
+            for _ in range(count):
+                index = User.objects.count()
+                Transaction.create_transaction(
+                    user=User.objects.create(username=f'payer{index}'),
+                    transaction_type='subscription',
+                    amount=5000,
+                    coins_amount=1000,
+                    reference_id=f'PS_{index}',
+                )
+
+        self.assertChangelistQueriesConstant('/admin/payments/transaction/', add_rows)
+
+
+class LedgerExportTests(TestCase):
+    """Tests for the finance exports."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='payer', password='testpass123')
+        for index, day in enumerate(['2026-03-01', '2026-03-02', '2026-03-03']):
+            transaction = Transaction.create_transaction(
+                user=self.user, transaction_type='subscription', amount='5000.50',
+                coins_amount=1000, reference_id=f'PS_EXPORT_{index}', description='Café, "gold"',
+            )
+            Transaction.objects.filter(pk=transaction.pk).update(created_at=exports.parse_day(day) + timedelta(hours=9))
+        CoinLedgerEntry.objects.create(user=self.user, amount=1000, reason='purchase', reference='PS_EXPORT_0')
+
+    def test_csv_date_range(self):
+        rows = exports.iter_rows('transactions', exports.parse_day('2026-03-02'), exports.parse_day('2026-03-03'))
+        content = b''.join(exports.iter_csv('transactions', rows)).decode()
+        reader = list(csv.DictReader(io.StringIO(content)))
+
+        self.assertEqual([row['reference_id'] for row in reader], ['PS_EXPORT_1'])
+        self.assertEqual(reader[0]['amount'], '5000.50')
+        self.assertEqual(reader[0]['description'], 'Café, "gold"')
+        self.assertEqual(reader[0]['created_at'], '2026-03-02T09:00:00+00:00')
+
+    def test_rows_can_be_resumed_from_other_contexts(self):
+        # As sync_to_async does: every next() in a fresh copy of the context
+        rows = exports.iter_rows('transactions', chunk_size=1)
+        done = object()
+        references = []
+        while (row := contextvars.copy_context().run(next, rows, done)) is not done:
+            references.append(row[2])
+        self.assertEqual(references, ['PS_EXPORT_0', 'PS_EXPORT_1', 'PS_EXPORT_2'])
+
+    def test_jsonl_is_ordered_by_creation(self):
+        lines = b''.join(exports.iter_export('transactions', 'jsonl')).splitlines()
+        references = [json.loads(line)['reference_id'] for line in lines]
+        self.assertEqual(references, ['PS_EXPORT_0', 'PS_EXPORT_1', 'PS_EXPORT_2'])
+
+    @unittest.skipIf(exports.load_pyarrow() is None, 'pyarrow is not installed')
+    def test_parquet_round_trip(self):
+        with override_settings(EXPORT_ROW_GROUP_SIZE=2):
+            content = b''.join(exports.iter_export('transactions', 'parquet'))
+        table = exports.load_pyarrow().parquet.read_table(io.BytesIO(content))
+
+        self.assertEqual(table.num_rows, 3)
+        self.assertEqual(str(table.schema.field('amount').type), 'decimal128(10, 2)')
+        self.assertEqual(table.column('reference_id').to_pylist()[-1], 'PS_EXPORT_2')
+
+    def test_endpoint_is_staff_only(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        self.assertEqual(client.get('/api/payments/exports/transactions.csv').status_code, 403)
+
+    def test_endpoint_streams_export(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(username='finance', password='testpass123', is_staff=True))
+
+        response = client.get('/api/payments/exports/transactions.csv?from=2026-03-02')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertIn('transactions_2026-03-02.csv', response['Content-Disposition'])
+        self.assertEqual(b''.join(response.streaming_content).count(b'PS_EXPORT_'), 2)
+
+        self.assertEqual(client.get('/api/payments/exports/refunds.csv').status_code, 400)
+        self.assertEqual(client.get('/api/payments/exports/ledger.csv?from=March').status_code, 400)
+
+    def test_command_exports_all_datasets(self):
+        with tempfile.TemporaryDirectory() as directory:
+            call_command('export_ledger', file_format='jsonl', output=directory, stderr=io.StringIO())
+            self.assertEqual(sorted(os.listdir(directory)), [
+                'bookings.jsonl', 'bookings_archive.jsonl', 'ledger.jsonl', 'ledger_archive.jsonl',
+                'transactions.jsonl', 'transactions_archive.jsonl',
+            ])
+            with open(os.path.join(directory, 'ledger.jsonl')) as stream:
+                self.assertEqual(json.loads(stream.readline())['reference'], 'PS_EXPORT_0')
+
+
+class ExportStreamingASGITests(TransactionTestCase):
+    """Tests that exports stream chunk by chunk under the ASGI app too."""
+
+    @override_settings(EXPORT_CHUNK_SIZE=2)
+    async def test_export_streams_every_chunk(self):
+        from galactiturf.asgi import application
+
+        staff = await User.objects.acreate(username='finance', is_staff=True)
+        for index in range(5):
+            await Transaction.objects.acreate(
+                user=staff, transaction_type='subscription', amount=5000, coins_amount=1000,
+                reference_id=f'PS_ASGI_{index}', status='success',
+            )
+        scope = {
+            'type': 'http', 'method': 'GET', 'path': '/api/payments/exports/transactions.csv', 'query_string': b'',
+            'headers': [(b'host', b'testserver'), (b'authorization', f'Bearer {AccessToken.for_user(staff)}'.encode())],
+        }
+        communicator = ApplicationCommunicator(application, scope)
+        await communicator.send_input({'type': 'http.request'})
+        self.assertEqual((await communicator.receive_output(5))['status'], 200)
+
+        bodies = []
+        while True:
+            message = await communicator.receive_output(5)
+            bodies.append(message.get('body', b''))
+            if not message.get('more_body'):
+                break
+        await communicator.wait(5)
+
+        # Two full chunks (the first with the header), then the last partial one
+        self.assertGreaterEqual(len([body for body in bodies if body]), 3)
+        rows = list(csv.DictReader(io.StringIO(b''.join(bodies).decode())))
+        self.assertEqual([row['reference_id'] for row in rows], [f'PS_ASGI_{index}' for index in range(5)])
@@ -7,4 +7,6 @@ urlpatterns = [
     path('webhook/', views.paystack_webhook, name='webhook'),
     path('initialize/', views.initialize_payment, name='initialize'),
     path('verify/<str:reference>/', views.verify_payment, name='verify'),
+    path('transactions/<str:reference>/', views.transaction_by_reference, name='transaction-by-reference'),
+    path('exports/<slug:dataset>.<slug:file_format>', views.export_dataset, name='export'),
 ]
\ No newline at end of file
@@ -1,24 +1,30 @@
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import AllowAny
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from django.conf import settings
+from django.db import transaction as db_transaction
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 from django.views import View
-import requests
 import json
-from .models import Transaction
+from .exports import FORMATS, ExportError, check_export, export_filename, iter_export, parse_day
+from .models import Transaction, TransactionArchive
 from subscriptions.models import SubscriptionTier
 from accounts.models import User
+from galactiturf.streaming import ChunkedStreamingResponse
 
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([])
 @csrf_exempt
 def paystack_webhook(request):
     """
     Handle Paystack webhook for payment verification.
+    
+    Not throttled: Paystack delivers from a few shared addresses, and an
+    event turned away with a 429 would only be retried later.
     """
     # Verify the webhook signature
     signature = request.headers.get('X-Paystack-Signature')
@@ -77,16 +83,18 @@ def handle_successful_payment(data):
         # Find the transaction
         transaction = Transaction.objects.get(reference_id=reference)
         
-        if transaction.status == 'pending':
-            # Mark transaction as successful
-            transaction.mark_successful(data)
-            
-            # Process based on transaction type
-            if transaction.transaction_type == 'subscription':
-                process_subscription_payment(transaction)
-            elif transaction.transaction_type == 'booking':
-                process_booking_payment(transaction)
-            
+        # Claim the pending transaction atomically so duplicate webhook
+        # deliveries (or a racing verify call) award the coins only once
+        with db_transaction.atomic():
+            claimed = transaction.claim_successful(data)
+            if claimed:
+                # Process based on transaction type
+                if transaction.transaction_type == 'subscription':
+                    process_subscription_payment(transaction)
+                elif transaction.transaction_type == 'booking':
+                    process_booking_payment(transaction)
+        
+        if claimed:
             return Response({'message': 'Payment processed successfully'}, status=status.HTTP_200_OK)
         else:
             return Response({'message': 'Transaction already processed'}, status=status.HTTP_200_OK)
@@ -122,16 +130,16 @@ def process_subscription_payment(transaction):
         tier = SubscriptionTier.objects.get(price=transaction.amount, is_active=True)
         
         # Add coins to user
-        user.add_coins(tier.coins_awarded)
+        user.add_coins(tier.coins_awarded, reason='purchase', reference=transaction.reference_id)
         
         # Update user's subscription tier
         user.subscription_tier = tier.name
-        user.save()
+        user.save(update_fields=['subscription_tier'])
         
     except SubscriptionTier.DoesNotExist:
         # If tier not found, award coins based on amount (fallback)
         coins_awarded = int(transaction.amount / 5)  # 5 NGN = 1 coin
-        user.add_coins(coins_awarded)
+        user.add_coins(coins_awarded, reason='purchase', reference=transaction.reference_id)
 
 
 def process_booking_payment(transaction):
@@ -202,8 +210,11 @@ def initialize_payment(request):
             'Content-Type': 'application/json'
         }
         
+        # Imported on first use so loading the views doesn't import requests and urllib3
+        import requests
+        
         response = requests.post(
-            'https://api.paystack.co/transaction/initialize',
+            f'{settings.PAYSTACK_API_URL}/transaction/initialize',
             json=paystack_data,
             headers=headers
         )
@@ -235,8 +246,10 @@ def verify_payment(request, reference):
             'Content-Type': 'application/json'
         }
         
+        import requests
+        
         response = requests.get(
-            f'https://api.paystack.co/transaction/verify/{reference}',
+            f'{settings.PAYSTACK_API_URL}/transaction/verify/{reference}',
             headers=headers
         )
         
@@ -253,3 +266,56 @@ def verify_payment(request, reference):
             
     except Exception as e:
         return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+TRANSACTION_LOOKUP_FIELDS = [
+    'id', 'reference_id', 'user__username', 'transaction_type', 'amount',
+    'coins_amount', 'status', 'description', 'created_at', 'updated_at',
+]
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def transaction_by_reference(request, reference):
+    """
+    Look a transaction up by its exact payment reference.
+    
+    Users see their own transactions and staff see any. The lookup is one
+    query on the unique reference index, and a second on the archive's
+    reference index when the transaction has been archived.
+    """
+    for model in (Transaction, TransactionArchive):
+        transactions = model.objects.filter(reference_id=reference)
+        if not request.user.is_staff:
+            transactions = transactions.filter(user=request.user)
+        row = transactions.values(*TRANSACTION_LOOKUP_FIELDS).first()
+        if row is not None:
+            break
+    else:
+        return Response({'error': 'Transaction not found'}, status=status.HTTP_404_NOT_FOUND)
+    row['user'] = row.pop('user__username')
+    return Response(row)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def export_dataset(request, dataset, file_format):
+    """
+    Stream a finance export of transactions, bookings or ledger entries.
+    
+    ``from`` and ``to`` (YYYY-MM-DD, ``to`` exclusive) limit the rows to a
+    date range.
+    """
+    try:
+        check_export(dataset, file_format)
+        start = parse_day(request.GET['from']) if request.GET.get('from') else None
+        end = parse_day(request.GET['to']) if request.GET.get('to') else None
+    except ExportError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    response = ChunkedStreamingResponse(
+        iter_export(dataset, file_format, start, end),
+        content_type=FORMATS[file_format][0],
+    )
+    response['Content-Disposition'] = f'attachment; filename="{export_filename(dataset, file_format, start, end)}"'
+    return response
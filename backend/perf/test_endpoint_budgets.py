@@ -0,0 +1,231 @@
+"""
+Query-count and latency budgets for the API endpoints.
+
+Every endpoint is requested against seeded data at each ``--perf-sizes``
+row count: 10 and 1000 by default, add 100000 for the full run. A test
+fails when an endpoint:
+
+* runs more queries than its ``max_queries`` budget in perf/budgets.json,
+* runs more queries as the data grows (an N+1 in a view or serializer),
+* is slower than ``max_ms`` at any size, or
+* slows down faster than ``max_latency_exponent`` allows between the
+  smallest and largest size (1.0 is linear, 0 is constant).
+
+The query counts are deterministic and checked on every test run. The
+latency checks depend on the machine, so they are marked ``perf``, which
+pytest.ini deselects by default: run them with ``pytest -m perf perf``.
+
+After an intended change, refresh the query budgets with
+``pytest perf --update-perf-baseline`` and review the diff.
+"""
+import json
+import math
+import statistics
+import time
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+from django.conf import settings
+from django.db import connection, transaction
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from games.models import Booking, Game, WaitlistEntry
+from payments.models import Transaction
+from reports.rollups import refresh_rollups
+from subscriptions.models import SubscriptionTier
+
+BUDGETS_PATH = Path(__file__).with_name('budgets.json')
+
+ENDPOINTS = {
+    'games-list': '/api/games/',
+    'game-detail': '/api/games/{game}/',
+    'bookings-list': '/api/games/bookings/',
+    'booking-detail': '/api/games/bookings/{booking}/',
+    'bookings-summary': '/api/games/bookings/summary/',
+    'waitlist-list': '/api/games/waitlist/',
+    'dashboard': '/api/auth/dashboard/',
+    'profile': '/api/auth/profile/',
+    'subscription-tiers': '/api/subscriptions/tiers/',
+    'subscription-history': '/api/subscriptions/history/',
+    'reports-revenue': '/api/reports/revenue/',
+    'reports-coins': '/api/reports/coins/',
+    'reports-occupancy': '/api/reports/occupancy/',
+    'reports-games': '/api/reports/games/',
+}
+
+BOOKING_STATUSES = ['confirmed', 'confirmed', 'completed', 'cancelled']
+
+
+class Dataset:
+    """One staff player whose games, bookings, waitlist entries and payments grow with the size."""
+
+    def __init__(self):
+        self.rows = 0
+        self.player = User.objects.create_user(
+            username='perf-player', password='testpass123', coin_balance=1000, is_staff=True
+        )
+        self.creator = User.objects.create_user(username='perf-creator', password='testpass123')
+        for name, price, coins in [('bronze', 5000, 1000), ('silver', 15000, 5000), ('gold', 25000, 10000)]:
+            SubscriptionTier.objects.get_or_create(name=name, defaults={'price': price, 'coins_awarded': coins})
+        self.game_id = None
+        self.booking_id = None
+
+    def grow_to(self, size):
+        start, now = self.rows, timezone.now()
+        if size <= start:
+            return
+        games = Game.objects.bulk_create([
+            Game(
+                name=f'Perf game {i}',
+                location='Lagos Sports Complex',
+                date_time=now + timedelta(days=1, minutes=i),
+                coin_price=500,
+                total_slots=22,
+                booked_slots=1,
+                created_by=self.creator,
+            )
+            for i in range(start, size)
+        ], batch_size=1000)
+        Booking.objects.bulk_create([
+            Booking(
+                user=self.player,
+                game=game,
+                status=BOOKING_STATUSES[i % len(BOOKING_STATUSES)],
+                coins_paid=500,
+                booking_reference=f'BK-P{i:08d}',
+            )
+            for i, game in enumerate(games, start=start)
+        ], batch_size=1000)
+        WaitlistEntry.objects.bulk_create([
+            WaitlistEntry(user=self.player, game=game) for game in games
+        ], batch_size=1000)
+        Transaction.objects.bulk_create([
+            Transaction(
+                user=self.player,
+                transaction_type='subscription',
+                amount=5000,
+                coins_amount=1000,
+                reference_id=f'PS_PERF_{i}',
+                status='success',
+            )
+            for i in range(start, size)
+        ], batch_size=1000)
+        refresh_rollups(overlap=0)
+
+        self.rows = size
+        self.game_id = self.game_id or games[0].pk
+        self.booking_id = self.booking_id or Booking.objects.filter(user=self.player).values_list('pk', flat=True).first()
+
+
+def fetch(client, path):
+    """GET path and read the whole body, including streamed responses."""
+    response = client.get(path)
+    if response.streaming:
+        b''.join(response.streaming_content)
+    return response
+
+
+def measure(client, path, repeat):
+    """Return (queries, median milliseconds) for a GET of path."""
+    fetch(client, path)
+    with CaptureQueriesContext(connection) as queries:
+        response = fetch(client, path)
+    assert response.status_code == 200, f'GET {path} returned {response.status_code}'
+    # Read the count now; the next request resets connection.queries
+    count = len(queries)
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fetch(client, path)
+        timings.append((time.perf_counter() - start) * 1000)
+    return count, statistics.median(timings)
+
+
+def load_budgets():
+    return json.loads(BUDGETS_PATH.read_text())
+
+
+def update_baseline(results):
+    """Record the measured query counts as the new budgets."""
+    budgets = load_budgets()
+    for name, samples in results.items():
+        budget = budgets.setdefault(name, {'max_ms': 500, 'max_latency_exponent': 0.5})
+        budget['max_queries'] = max(queries for queries, _ in samples.values())
+    BUDGETS_PATH.write_text(json.dumps(budgets, indent=2, sort_keys=True) + '\n')
+
+
+@pytest.fixture(scope='module')
+def measurements(request, django_db_setup, django_db_blocker):
+    """Measure every endpoint at every size, rolling the seeded rows back afterwards."""
+    sizes = sorted({int(size) for size in request.config.getoption('--perf-sizes').split(',') if size.strip()})
+    repeat = request.config.getoption('--perf-repeat')
+    results = {name: {} for name in ENDPOINTS}
+
+    # Hundreds of requests from one user would otherwise run into the rate limits
+    unthrottled = override_settings(REST_FRAMEWORK={
+        **settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {'anon': '', 'user': ''},
+    })
+    with unthrottled, django_db_blocker.unblock(), transaction.atomic():
+        data = Dataset()
+        client = APIClient()
+        client.force_authenticate(data.player)
+        for size in sizes:
+            data.grow_to(size)
+            for name, template in ENDPOINTS.items():
+                path = template.format(game=data.game_id, booking=data.booking_id)
+                results[name][size] = measure(client, path, repeat)
+        transaction.set_rollback(True)
+
+    if request.config.getoption('--update-perf-baseline'):
+        update_baseline(results)
+    return results
+
+
+# Marked so pytest-django creates the test database even when perf runs alone
+@pytest.mark.django_db
+@pytest.mark.parametrize('endpoint', sorted(ENDPOINTS))
+def test_endpoint_queries_within_budget(endpoint, measurements):
+    budget = load_budgets().get(endpoint)
+    assert budget, f'{endpoint} has no entry in {BUDGETS_PATH.name}'
+    samples = measurements[endpoint]
+    sizes = sorted(samples)
+
+    for size in sizes:
+        queries, _ = samples[size]
+        assert queries <= budget['max_queries'], (
+            f'{endpoint} ran {queries} queries at {size} rows (budget {budget["max_queries"]})'
+        )
+    smallest, largest = sizes[0], sizes[-1]
+    assert samples[largest][0] == samples[smallest][0], (
+        f'{endpoint} queries grew from {samples[smallest][0]} at {smallest} rows '
+        f'to {samples[largest][0]} at {largest} rows (N+1?)'
+    )
+
+
+@pytest.mark.perf
+@pytest.mark.django_db
+@pytest.mark.parametrize('endpoint', sorted(ENDPOINTS))
+def test_endpoint_latency_within_budget(endpoint, measurements):
+    budget = load_budgets().get(endpoint)
+    assert budget, f'{endpoint} has no entry in {BUDGETS_PATH.name}'
+    samples = measurements[endpoint]
+    sizes = sorted(samples)
+
+    for size in sizes:
+        _, ms = samples[size]
+        assert ms <= budget['max_ms'], f'{endpoint} took {ms:.1f} ms at {size} rows (budget {budget["max_ms"]} ms)'
+
+    smallest, largest = sizes[0], sizes[-1]
+    if largest == smallest:
+        return
+    exponent = math.log(max(samples[largest][1], 0.01) / max(samples[smallest][1], 0.01)) / math.log(largest / smallest)
+    assert exponent <= budget['max_latency_exponent'], (
+        f'{endpoint} latency grows like rows^{exponent:.2f} between {smallest} and {largest} rows '
+        f'(budget rows^{budget["max_latency_exponent"]})'
+    )
@@ -0,0 +1,36 @@
+"""
+Worker start-up budget.
+
+Imports the WSGI app and URLconf in a fresh interpreter, as a gunicorn
+master does before forking, and fails when our own code imports a
+package that is meant to load on first use (``LAZY_MODULES``), or when
+the total import time exceeds ``max_import_ms`` for "startup" in
+perf/budgets.json. ``python -m benchmarks.startup imports`` shows where
+the time goes. Only the timing is marked ``perf`` (deselected by
+default); which packages load is the same on every machine.
+"""
+import json
+from pathlib import Path
+
+import pytest
+
+from benchmarks.startup import LAZY_MODULES, first_party, import_times, lazy_imports
+
+BUDGETS_PATH = Path(__file__).with_name('budgets.json')
+
+
+@pytest.fixture(scope='module')
+def modules():
+    return import_times()
+
+
+def test_heavy_packages_load_on_first_use(modules):
+    offenders = {package: importer for package, importer in lazy_imports(modules).items() if first_party(importer)}
+    assert not offenders, f'Imported at start-up by our code (keep {", ".join(LAZY_MODULES)} lazy): {offenders}'
+
+
+@pytest.mark.perf
+def test_import_time_within_budget(modules):
+    budget = json.loads(BUDGETS_PATH.read_text())['startup']['max_import_ms']
+    total = sum(self_ms for _, self_ms, _, _ in modules)
+    assert total <= budget, f'Start-up imports took {total:.0f} ms (budget {budget} ms)'
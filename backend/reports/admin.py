@@ -0,0 +1,52 @@
+from django.contrib import admin
+from .models import DailyCoinFlow, DailyLocationStats, DailyRevenue, GameStats
+
+
+class RollupAdmin(admin.ModelAdmin):
+    """Read-only admin for rollups, which only refresh_rollups writes."""
+    
+    date_hierarchy = 'day'
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(DailyRevenue)
+class DailyRevenueAdmin(RollupAdmin):
+    """Admin configuration for DailyRevenue model."""
+    
+    list_display = ['day', 'tier', 'payments', 'revenue']
+    list_filter = ['tier']
+
+
+@admin.register(DailyCoinFlow)
+class DailyCoinFlowAdmin(RollupAdmin):
+    """Admin configuration for DailyCoinFlow model."""
+    
+    list_display = ['day', 'reason', 'entries', 'credited', 'debited']
+    list_filter = ['reason']
+
+
+@admin.register(DailyLocationStats)
+class DailyLocationStatsAdmin(RollupAdmin):
+    """Admin configuration for DailyLocationStats model."""
+    
+    list_display = ['day', 'location', 'games', 'total_slots', 'booked_slots', 'fill_rate', 'bookings']
+    # Prefix search, served on PostgreSQL by the index of migration 0002
+    search_fields = ['^location']
+
+
+@admin.register(GameStats)
+class GameStatsAdmin(RollupAdmin):
+    """Admin configuration for GameStats model."""
+    
+    list_display = ['game', 'day', 'location', 'status', 'total_slots', 'booked_slots', 'fill_rate', 'bookings']
+    list_filter = ['status']
+    list_select_related = ['game']
+    # Prefix search, served on PostgreSQL by the index of migration 0002
+    search_fields = ['^location']
+    raw_id_fields = ['game']
+    ordering = ['-day']
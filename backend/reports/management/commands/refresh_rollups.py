@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from reports.rollups import refresh_rollups
+
+
+class Command(BaseCommand):
+    help = 'Update the reporting rollups from rows changed since the last run (safe to run every few minutes)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild', action='store_true', help='Empty the rollups and recompute them from all rows')
+        parser.add_argument('--overlap', type=int, default=None, help='Seconds before the watermark to rescan')
+
+    def handle(self, *args, **options):
+        totals = refresh_rollups(
+            rebuild=options['rebuild'],
+            overlap=options['overlap'],
+            log=self.stdout.write if options['verbosity'] > 1 else None,
+        )
+
+        summary = ', '.join(f'{name}: {count}' for name, count in totals.items())
+        self.stdout.write(self.style.SUCCESS(f'Rollups refreshed ({summary})'))
@@ -0,0 +1,90 @@
+# Generated by Django 4.2.7 on 2026-10-18 23:25
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('games', '0006_game_rollup_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyCoinFlow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('reason', models.CharField(max_length=20)),
+                ('entries', models.IntegerField(default=0, help_text='Number of ledger entries')),
+                ('credited', models.BigIntegerField(default=0, help_text='Coins added to balances')),
+                ('debited', models.BigIntegerField(default=0, help_text='Coins taken from balances')),
+            ],
+            options={
+                'ordering': ['day', 'reason'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyLocationStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('location', models.CharField(max_length=200)),
+                ('games', models.IntegerField(default=0)),
+                ('total_slots', models.IntegerField(default=0)),
+                ('booked_slots', models.IntegerField(default=0)),
+                ('bookings', models.IntegerField(default=0)),
+                ('coins_booked', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'daily location stats',
+                'ordering': ['day', 'location'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyRevenue',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('tier', models.CharField(help_text="Subscription tier, or 'other' for unmatched amounts", max_length=20)),
+                ('payments', models.IntegerField(default=0, help_text='Number of successful payments')),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, help_text='Revenue in NGN', max_digits=14)),
+            ],
+            options={
+                'ordering': ['day', 'tier'],
+            },
+        ),
+        migrations.CreateModel(
+            name='GameStats',
+            fields=[
+                ('game', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='games.game')),
+                ('day', models.DateField(help_text='Date the game is played')),
+                ('location', models.CharField(max_length=200)),
+                ('status', models.CharField(max_length=20)),
+                ('total_slots', models.IntegerField(default=0)),
+                ('booked_slots', models.IntegerField(default=0)),
+                ('bookings', models.IntegerField(default=0, help_text='Confirmed and completed bookings')),
+                ('cancellations', models.IntegerField(default=0, help_text='Cancelled bookings')),
+                ('coins_booked', models.BigIntegerField(default=0, help_text='Coins paid by confirmed and completed bookings')),
+            ],
+            options={
+                'verbose_name_plural': 'game stats',
+                'indexes': [models.Index(fields=['day', 'location'], name='reports_gamestats_day_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='dailyrevenue',
+            constraint=models.UniqueConstraint(fields=('day', 'tier'), name='reports_revenue_day_tier_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailylocationstats',
+            constraint=models.UniqueConstraint(fields=('day', 'location'), name='reports_location_day_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailycoinflow',
+            constraint=models.UniqueConstraint(fields=('day', 'reason'), name='reports_coinflow_day_reason_uniq'),
+        ),
+    ]
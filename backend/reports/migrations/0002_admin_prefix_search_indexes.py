@@ -0,0 +1,45 @@
+"""
+Indexes for the admin's ``^location`` search on the rollups.
+
+As in games 0014: the search runs ``UPPER(location::text) LIKE
+UPPER('term%')`` on PostgreSQL, which only a ``text_pattern_ops`` index on
+that expression serves. They are built CONCURRENTLY, and on PostgreSQL
+only; elsewhere the migration does nothing.
+"""
+from django.db import migrations
+
+INDEXES = [
+    ('reports_location_prefix', 'reports_dailylocationstats', 'location'),
+    ('reports_gamestats_location_prefix', 'reports_gamestats', 'location'),
+]
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    quote = schema_editor.quote_name
+    for name, table, column in INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {quote(name)} '
+            f'ON {quote(table)} (UPPER({quote(column)}::text) text_pattern_ops)'
+        )
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _, _ in INDEXES:
+        schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {schema_editor.quote_name(name)}')
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('reports', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
@@ -0,0 +1,93 @@
+from django.db import models
+
+
+class DailyRevenue(models.Model):
+    """Model for successful subscription payments per day and tier."""
+    
+    day = models.DateField()
+    tier = models.CharField(max_length=20, help_text="Subscription tier, or 'other' for unmatched amounts")
+    payments = models.IntegerField(default=0, help_text="Number of successful payments")
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0, help_text="Revenue in NGN")
+    
+    class Meta:
+        ordering = ['day', 'tier']
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'tier'], name='reports_revenue_day_tier_uniq'),
+        ]
+    
+    def __str__(self):
+        return f"{self.day} - {self.tier} - {self.revenue}"
+
+
+class DailyCoinFlow(models.Model):
+    """Model for coin ledger totals per day and reason."""
+    
+    day = models.DateField()
+    reason = models.CharField(max_length=20)
+    entries = models.IntegerField(default=0, help_text="Number of ledger entries")
+    credited = models.BigIntegerField(default=0, help_text="Coins added to balances")
+    debited = models.BigIntegerField(default=0, help_text="Coins taken from balances")
+    
+    class Meta:
+        ordering = ['day', 'reason']
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'reason'], name='reports_coinflow_day_reason_uniq'),
+        ]
+    
+    def __str__(self):
+        return f"{self.day} - {self.reason} - +{self.credited}/-{self.debited}"
+
+
+class GameStats(models.Model):
+    """Model for the booking totals of one game."""
+    
+    game = models.OneToOneField('games.Game', on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    day = models.DateField(help_text="Date the game is played")
+    location = models.CharField(max_length=200)
+    status = models.CharField(max_length=20)
+    total_slots = models.IntegerField(default=0)
+    booked_slots = models.IntegerField(default=0)
+    bookings = models.IntegerField(default=0, help_text="Confirmed and completed bookings")
+    cancellations = models.IntegerField(default=0, help_text="Cancelled bookings")
+    coins_booked = models.BigIntegerField(default=0, help_text="Coins paid by confirmed and completed bookings")
+    
+    class Meta:
+        verbose_name_plural = 'game stats'
+        indexes = [
+            models.Index(fields=['day', 'location'], name='reports_gamestats_day_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.game_id} - {self.day} - {self.booked_slots}/{self.total_slots}"
+    
+    @property
+    def fill_rate(self):
+        """Share of slots booked, from 0 to 1."""
+        return round(self.booked_slots / self.total_slots, 4) if self.total_slots else 0.0
+
+
+class DailyLocationStats(models.Model):
+    """Model for occupancy per day and location, excluding cancelled games."""
+    
+    day = models.DateField()
+    location = models.CharField(max_length=200)
+    games = models.IntegerField(default=0)
+    total_slots = models.IntegerField(default=0)
+    booked_slots = models.IntegerField(default=0)
+    bookings = models.IntegerField(default=0)
+    coins_booked = models.BigIntegerField(default=0)
+    
+    class Meta:
+        ordering = ['day', 'location']
+        verbose_name_plural = 'daily location stats'
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'location'], name='reports_location_day_uniq'),
+        ]
+    
+    def __str__(self):
+        return f"{self.day} - {self.location} - {self.booked_slots}/{self.total_slots}"
+    
+    @property
+    def fill_rate(self):
+        """Share of slots booked, from 0 to 1."""
+        return round(self.booked_slots / self.total_slots, 4) if self.total_slots else 0.0
@@ -0,0 +1,249 @@
+"""
+Incremental maintenance of the reporting rollups.
+
+Each rollup row summarises one bucket: a day (revenue, coin flow,
+location occupancy) or a game. A refresh only reads the source rows
+changed since the last watermark, to find the buckets they touch, and
+then recomputes those buckets from the source tables and replaces their
+rollup rows. Recomputing whole buckets keeps the rollups exact when rows
+change after they are inserted (a payment succeeding, a booking being
+cancelled). It also makes a refresh idempotent, so it can safely rescan
+``ROLLUP_OVERLAP_SECONDS`` before the watermark to catch transactions that
+committed late.
+
+The watermark is the start time of the last completed refresh, kept on
+the ``reports.rollups`` scheduler checkpoint.
+"""
+from collections import Counter, defaultdict
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from accounts.models import CoinLedgerArchive, CoinLedgerEntry
+from games.models import Booking, BookingArchive, Game, SchedulerCheckpoint
+from payments.models import Transaction, TransactionArchive
+from subscriptions.models import SubscriptionTier
+from .models import DailyCoinFlow, DailyLocationStats, DailyRevenue, GameStats
+
+CHECKPOINT_NAME = 'reports.rollups'
+
+ACTIVE_BOOKING_STATUSES = ['confirmed', 'completed']
+
+# Day ranges per source query, and games per recompute batch
+RANGES_PER_QUERY = 50
+GAMES_PER_BATCH = 1000
+
+
+def _batches(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _day_ranges(days):
+    """Merge dates into [start, end) datetime ranges of consecutive days."""
+    ranges = []
+    for day in sorted(days):
+        start = timezone.make_aware(datetime.combine(day, time.min))
+        if ranges and ranges[-1][1] == start:
+            ranges[-1][1] = start + timedelta(days=1)
+        else:
+            ranges.append([start, start + timedelta(days=1)])
+    return ranges
+
+
+def _in_ranges(field, ranges):
+    return reduce(or_, (Q(**{f'{field}__gte': start, f'{field}__lt': end}) for start, end in ranges))
+
+
+def _changed_days(queryset, since, changed_field='updated_at'):
+    """Creation dates of the rows in queryset changed since the watermark."""
+    if since is not None:
+        queryset = queryset.filter(**{f'{changed_field}__gte': since})
+    return set(queryset.order_by().annotate(day=TruncDate('created_at')).values_list('day', flat=True).distinct())
+
+
+def _rollup_days(ranges):
+    return _in_ranges('day', [(start.date(), end.date()) for start, end in ranges])
+
+
+def refresh_revenue(since):
+    """Recompute DailyRevenue for days with subscription payments changed since the watermark."""
+    days = _changed_days(Transaction.objects.filter(transaction_type='subscription'), since)
+    if since is None:
+        days |= _changed_days(TransactionArchive.objects.filter(transaction_type='subscription'), since)
+
+    # Payments are matched to tiers by price, as when the coins are awarded
+    tiers = dict(SubscriptionTier.objects.values_list('price', 'name'))
+    for ranges in _batches(_day_ranges(days), RANGES_PER_QUERY):
+        totals = defaultdict(lambda: [0, Decimal('0')])
+        # Archived payments are settled, but their days are recomputed too
+        for model in (Transaction, TransactionArchive):
+            rows = (
+                model.objects
+                .filter(_in_ranges('created_at', ranges), transaction_type='subscription', status='success')
+                .annotate(day=TruncDate('created_at'))
+                .values('day', 'amount')
+                .annotate(payments=Count('id'), revenue=Sum('amount'))
+                .order_by()
+            )
+            for row in rows:
+                bucket = totals[row['day'], tiers.get(row['amount'], 'other')]
+                bucket[0] += row['payments']
+                bucket[1] += row['revenue']
+
+        with transaction.atomic():
+            DailyRevenue.objects.filter(_rollup_days(ranges)).delete()
+            DailyRevenue.objects.bulk_create([
+                DailyRevenue(day=day, tier=tier, payments=payments, revenue=revenue)
+                for (day, tier), (payments, revenue) in totals.items()
+            ])
+    return len(days)
+
+
+def refresh_coin_flow(since):
+    """Recompute DailyCoinFlow for days with ledger entries written since the watermark."""
+    # Ledger entries are never updated, so new rows are the changed rows
+    days = _changed_days(CoinLedgerEntry.objects.all(), since, changed_field='created_at')
+    if since is None:
+        days |= _changed_days(CoinLedgerArchive.objects.all(), since)
+
+    for ranges in _batches(_day_ranges(days), RANGES_PER_QUERY):
+        # Compacted entries live in the archive, and a day can be split across both tables
+        totals = defaultdict(lambda: [0, 0, 0])
+        for model in (CoinLedgerEntry, CoinLedgerArchive):
+            rows = (
+                model.objects
+                .filter(_in_ranges('created_at', ranges))
+                .annotate(day=TruncDate('created_at'))
+                .values('day', 'reason')
+                .annotate(
+                    entries=Count('id'),
+                    credited=Sum('amount', filter=Q(amount__gt=0)),
+                    debited=Sum('amount', filter=Q(amount__lt=0)),
+                )
+                .order_by()
+            )
+            for row in rows:
+                bucket = totals[row['day'], row['reason']]
+                bucket[0] += row['entries']
+                bucket[1] += row['credited'] or 0
+                bucket[2] -= row['debited'] or 0
+
+        with transaction.atomic():
+            DailyCoinFlow.objects.filter(_rollup_days(ranges)).delete()
+            DailyCoinFlow.objects.bulk_create([
+                DailyCoinFlow(day=day, reason=reason, entries=entries, credited=credited, debited=debited)
+                for (day, reason), (entries, credited, debited) in totals.items()
+            ])
+    return len(days)
+
+
+def refresh_games(since):
+    """
+    Recompute GameStats for games changed since the watermark.
+
+    Booking, cancelling, waitlist promotion and the lifecycle job all touch
+    the game's ``updated_at``, so changed games cover changed bookings.
+    Returns the number of games and the days whose location totals moved.
+    """
+    changed = Game.objects.all()
+    if since is not None:
+        changed = changed.filter(updated_at__gte=since)
+    game_ids = list(changed.order_by('pk').values_list('pk', flat=True))
+    days = set()
+
+    for batch in _batches(game_ids, GAMES_PER_BATCH):
+        games = Game.objects.filter(pk__in=batch).values(
+            'pk', 'date_time', 'location', 'status', 'total_slots', 'booked_slots'
+        )
+        totals = defaultdict(Counter)
+        # A finished game's bookings may have moved to the archive
+        for model in (Booking, BookingArchive):
+            for row in model.objects.filter(game_id__in=batch).values('game_id').annotate(
+                bookings=Count('id', filter=Q(status__in=ACTIVE_BOOKING_STATUSES)),
+                cancellations=Count('id', filter=Q(status='cancelled')),
+                coins_booked=Sum('coins_paid', filter=Q(status__in=ACTIVE_BOOKING_STATUSES)),
+            ).order_by():
+                totals[row.pop('game_id')].update({key: value or 0 for key, value in row.items()})
+        stats = []
+        for game in games:
+            booked = totals.get(game['pk'], {})
+            stats.append(GameStats(
+                game_id=game['pk'],
+                day=timezone.localtime(game['date_time']).date(),
+                location=game['location'],
+                status=game['status'],
+                total_slots=game['total_slots'],
+                booked_slots=game['booked_slots'],
+                bookings=booked.get('bookings', 0),
+                cancellations=booked.get('cancellations', 0),
+                coins_booked=booked.get('coins_booked') or 0,
+            ))
+
+        # A rescheduled game moves out of its old day as well as into the new one
+        days.update(GameStats.objects.filter(game_id__in=batch).values_list('day', flat=True))
+        days.update(stat.day for stat in stats)
+        with transaction.atomic():
+            GameStats.objects.filter(game_id__in=batch).delete()
+            GameStats.objects.bulk_create(stats)
+    return len(game_ids), days
+
+
+def refresh_locations(days):
+    """Recompute DailyLocationStats for the given days from GameStats."""
+    for batch in _batches(sorted(days), RANGES_PER_QUERY):
+        rows = (
+            GameStats.objects
+            .filter(day__in=batch)
+            .exclude(status='cancelled')
+            .values('day', 'location')
+            .annotate(
+                games=Count('pk'),
+                total_slots=Sum('total_slots'),
+                booked_slots=Sum('booked_slots'),
+                bookings=Sum('bookings'),
+                coins_booked=Sum('coins_booked'),
+            )
+            .order_by()
+        )
+        with transaction.atomic():
+            DailyLocationStats.objects.filter(day__in=batch).delete()
+            DailyLocationStats.objects.bulk_create([DailyLocationStats(**row) for row in rows])
+    return len(days)
+
+
+def refresh_rollups(rebuild=False, overlap=None, now=None, log=None):
+    """
+    Bring every rollup up to date and advance the watermark.
+
+    With ``rebuild`` the rollups are emptied and recomputed from all rows.
+    Returns the number of buckets recomputed per rollup.
+    """
+    now = now or timezone.now()
+    overlap = settings.ROLLUP_OVERLAP_SECONDS if overlap is None else overlap
+    checkpoint, _ = SchedulerCheckpoint.objects.get_or_create(name=CHECKPOINT_NAME)
+
+    if rebuild or checkpoint.last_run_at is None:
+        since = None
+        for model in (DailyRevenue, DailyCoinFlow, DailyLocationStats, GameStats):
+            model.objects.all().delete()
+    else:
+        since = checkpoint.last_run_at - timedelta(seconds=overlap)
+
+    totals = {}
+    totals['revenue days'] = refresh_revenue(since)
+    totals['coin days'] = refresh_coin_flow(since)
+    totals['games'], days = refresh_games(since)
+    totals['location days'] = refresh_locations(days)
+    if log:
+        log(f'Recomputed rollups for rows changed since {since or "the beginning"}')
+
+    checkpoint.mark_completed(now)
+    return totals
@@ -0,0 +1,41 @@
+from rest_framework import serializers
+from .models import DailyCoinFlow, DailyLocationStats, DailyRevenue, GameStats
+
+
+class DailyRevenueSerializer(serializers.ModelSerializer):
+    """Serializer for DailyRevenue model."""
+    
+    class Meta:
+        model = DailyRevenue
+        fields = ['day', 'tier', 'payments', 'revenue']
+
+
+class DailyCoinFlowSerializer(serializers.ModelSerializer):
+    """Serializer for DailyCoinFlow model."""
+    
+    class Meta:
+        model = DailyCoinFlow
+        fields = ['day', 'reason', 'entries', 'credited', 'debited']
+
+
+class DailyLocationStatsSerializer(serializers.ModelSerializer):
+    """Serializer for DailyLocationStats model."""
+    
+    fill_rate = serializers.ReadOnlyField()
+    
+    class Meta:
+        model = DailyLocationStats
+        fields = ['day', 'location', 'games', 'total_slots', 'booked_slots', 'fill_rate', 'bookings', 'coins_booked']
+
+
+class GameStatsSerializer(serializers.ModelSerializer):
+    """Serializer for GameStats model."""
+    
+    fill_rate = serializers.ReadOnlyField()
+    
+    class Meta:
+        model = GameStats
+        fields = [
+            'game', 'day', 'location', 'status', 'total_slots', 'booked_slots',
+            'fill_rate', 'bookings', 'cancellations', 'coins_booked'
+        ]
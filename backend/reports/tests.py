@@ -0,0 +1,146 @@
+from datetime import date, datetime, timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from games.models import Booking, Game
+from payments.models import Transaction
+from subscriptions.models import SubscriptionTier
+from .models import DailyCoinFlow, DailyLocationStats, DailyRevenue, GameStats
+from .rollups import refresh_rollups
+
+GAME_DAY = date(2030, 6, 1)
+
+
+def pay(user, amount, day, reference, succeed=True):
+    """Create a subscription payment dated on day."""
+    transaction = Transaction.create_transaction(
+        user=user, transaction_type='subscription', amount=amount, coins_amount=1000, reference_id=reference
+    )
+    if succeed:
+        transaction.mark_successful({'status': 'success'})
+    Transaction.objects.filter(pk=transaction.pk).update(
+        created_at=timezone.make_aware(datetime.combine(day, datetime.min.time())) + timedelta(hours=10)
+    )
+    return transaction
+
+
+class RollupTests(TestCase):
+    """Tests for the incremental reporting rollups."""
+
+    def setUp(self):
+        SubscriptionTier.objects.create(name='bronze', price=5000, coins_awarded=1000)
+        SubscriptionTier.objects.create(name='gold', price=25000, coins_awarded=10000)
+        self.creator = User.objects.create_user(username='creator', password='testpass123')
+        self.players = [
+            User.objects.create_user(username=f'player{i}', password='testpass123', coin_balance=1000)
+            for i in range(3)
+        ]
+        self.game = Game.objects.create(
+            name='Weekend Warriors', location='Lagos Sports Complex', coin_price=500, total_slots=10,
+            date_time=timezone.make_aware(datetime.combine(GAME_DAY, datetime.min.time())) + timedelta(hours=18),
+            created_by=self.creator,
+        )
+        for player in self.players:
+            Booking.book(player, self.game)
+        pay(self.players[0], 25000, date(2030, 5, 1), 'PS_1')
+        pay(self.players[1], 25000, date(2030, 5, 1), 'PS_2')
+        pay(self.players[2], 5000, date(2030, 5, 2), 'PS_3')
+        pay(self.players[2], 5000, date(2030, 5, 2), 'PS_4', succeed=False)
+
+    def test_rollups_match_sources(self):
+        Booking.objects.get(user=self.players[0]).cancel_booking()
+        refresh_rollups()
+
+        self.assertEqual(
+            list(DailyRevenue.objects.values_list('day', 'tier', 'payments', 'revenue')),
+            [(date(2030, 5, 1), 'gold', 2, 50000), (date(2030, 5, 2), 'bronze', 1, 5000)],
+        )
+        stats = GameStats.objects.get(game=self.game)
+        self.assertEqual((stats.day, stats.booked_slots, stats.bookings, stats.cancellations), (GAME_DAY, 2, 2, 1))
+        self.assertEqual(stats.coins_booked, 1000)
+
+        location = DailyLocationStats.objects.get()
+        self.assertEqual((location.day, location.games, location.booked_slots, location.fill_rate), (GAME_DAY, 1, 2, 0.2))
+
+        flow = {row.reason: row for row in DailyCoinFlow.objects.all()}
+        self.assertEqual((flow['booking'].entries, flow['booking'].debited), (3, 1500))
+        self.assertEqual(flow['refund'].credited, 500)
+
+    def test_refresh_only_recomputes_changed_buckets(self):
+        refresh_rollups()
+        untouched = DailyRevenue.objects.get(day=date(2030, 5, 1)).pk
+
+        Booking.objects.get(user=self.players[0]).cancel_booking()
+        pay(self.players[0], 5000, date(2030, 5, 2), 'PS_5')
+        totals = refresh_rollups(overlap=0)
+
+        self.assertEqual(totals['revenue days'], 1)
+        self.assertEqual(totals['games'], 1)
+        self.assertEqual(DailyRevenue.objects.get(day=date(2030, 5, 1)).pk, untouched)
+        self.assertEqual(DailyRevenue.objects.get(day=date(2030, 5, 2)).payments, 2)
+        self.assertEqual(GameStats.objects.get(game=self.game).cancellations, 1)
+
+        totals = refresh_rollups(overlap=0)
+        self.assertEqual(totals, {'revenue days': 0, 'coin days': 0, 'games': 0, 'location days': 0})
+
+    def test_rescheduled_game_leaves_old_day(self):
+        refresh_rollups()
+        self.game.date_time += timedelta(days=3)
+        self.game.save()
+        refresh_rollups(overlap=0)
+
+        self.assertEqual(list(DailyLocationStats.objects.values_list('day', flat=True)), [GAME_DAY + timedelta(days=3)])
+
+    def test_rebuild_matches_incremental(self):
+        refresh_rollups()
+        Booking.objects.get(user=self.players[1]).cancel_booking()
+        refresh_rollups(overlap=0)
+        incremental = list(DailyLocationStats.objects.values_list('day', 'location', 'booked_slots', 'bookings'))
+
+        refresh_rollups(rebuild=True)
+        self.assertEqual(list(DailyLocationStats.objects.values_list('day', 'location', 'booked_slots', 'bookings')), incremental)
+
+
+class ReportEndpointTests(TestCase):
+    """Tests for the staff reporting endpoints."""
+
+    def setUp(self):
+        self.staff = User.objects.create_user(username='finance', password='testpass123', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.staff)
+        DailyRevenue.objects.create(day=date(2030, 5, 1), tier='gold', payments=2, revenue=50000)
+        DailyRevenue.objects.create(day=date(2030, 5, 2), tier='bronze', payments=1, revenue=5000)
+        DailyRevenue.objects.create(day=date(2030, 6, 1), tier='bronze', payments=1, revenue=5000)
+
+    def test_requires_staff(self):
+        player = APIClient()
+        player.force_authenticate(User.objects.create_user(username='player', password='testpass123'))
+        self.assertEqual(player.get('/api/reports/revenue/').status_code, 403)
+
+    def test_revenue_totals_for_range(self):
+        response = self.client.get('/api/reports/revenue/?from=2030-05-01&to=2030-06-01')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertEqual(response.data['totals']['revenue'], '55000.00')
+        self.assertEqual(response.data['totals']['tiers']['gold'], {'payments': 2, 'revenue': '50000.00'})
+
+    def test_rejects_bad_dates(self):
+        response = self.client.get('/api/reports/occupancy/?from=June')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('error', response.data)
+        self.assertEqual(self.client.get('/api/reports/games/?from=2030-06-02&to=2030-06-01').status_code, 400)
+
+    def test_game_stats_are_paginated(self):
+        game = Game.objects.create(
+            name='Weekend Warriors', location='Lagos Sports Complex', coin_price=500, total_slots=10,
+            date_time=timezone.now() + timedelta(days=1), created_by=self.staff, booked_slots=5,
+        )
+        refresh_rollups()
+
+        response = self.client.get('/api/reports/games/')
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(response.data['results'][0]['game'], game.pk)
+        self.assertEqual(response.data['results'][0]['fill_rate'], 0.5)
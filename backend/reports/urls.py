@@ -0,0 +1,11 @@
+from django.urls import path
+from . import views
+
+app_name = 'reports'
+
+urlpatterns = [
+    path('revenue/', views.revenue_report, name='revenue'),
+    path('coins/', views.coin_flow_report, name='coins'),
+    path('occupancy/', views.occupancy_report, name='occupancy'),
+    path('games/', views.GameStatsListView.as_view(), name='games'),
+]
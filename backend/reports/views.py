@@ -0,0 +1,132 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from rest_framework import generics, permissions
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from django.utils import timezone
+from galactiturf.db_router import ReplicaReadMixin, read_from_replica
+from .models import DailyCoinFlow, DailyLocationStats, DailyRevenue, GameStats
+from .serializers import (
+    DailyCoinFlowSerializer, DailyLocationStatsSerializer, DailyRevenueSerializer, GameStatsSerializer,
+)
+
+DEFAULT_REPORT_DAYS = 30
+
+
+def report_range(request):
+    """
+    Return the (from, to) days of a report; ``to`` is exclusive.
+    
+    Defaults to the 30 days either side of today, so occupancy reports
+    include upcoming games.
+    """
+    def parse(name, default):
+        value = request.query_params.get(name)
+        if not value:
+            return default
+        try:
+            return datetime.strptime(value, '%Y-%m-%d').date()
+        except ValueError:
+            raise ValidationError({'error': f'Invalid {name!r} date {value!r}; use YYYY-MM-DD.'})
+    
+    end = parse('to', timezone.localdate() + timedelta(days=DEFAULT_REPORT_DAYS + 1))
+    start = parse('from', end - timedelta(days=2 * DEFAULT_REPORT_DAYS + 1))
+    if start >= end:
+        raise ValidationError({'error': "'from' must be before 'to'."})
+    return start, end
+
+
+def rollup_report(request, model, serializer_class, totals, **filters):
+    """Serialize the rollup rows of a report range together with their totals."""
+    start, end = report_range(request)
+    with read_from_replica():
+        rows = list(model.objects.filter(day__gte=start, day__lt=end, **filters))
+    return Response({
+        'from': start,
+        'to': end,
+        'totals': totals(rows),
+        'results': serializer_class(rows, many=True).data,
+    })
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def revenue_report(request):
+    """Get subscription revenue per day and tier."""
+    def totals(rows):
+        by_tier = {}
+        for row in rows:
+            tier = by_tier.setdefault(row.tier, {'payments': 0, 'revenue': Decimal('0.00')})
+            tier['payments'] += row.payments
+            tier['revenue'] += row.revenue
+        return {
+            'payments': sum(tier['payments'] for tier in by_tier.values()),
+            'revenue': str(sum((tier['revenue'] for tier in by_tier.values()), Decimal('0.00'))),
+            'tiers': {name: {**tier, 'revenue': str(tier['revenue'])} for name, tier in sorted(by_tier.items())},
+        }
+    
+    return rollup_report(request, DailyRevenue, DailyRevenueSerializer, totals)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def coin_flow_report(request):
+    """Get coins issued, spent and refunded per day."""
+    def totals(rows):
+        def credited(reason):
+            return sum(row.credited for row in rows if row.reason == reason)
+        
+        def debited(reason):
+            return sum(row.debited for row in rows if row.reason == reason)
+        
+        issued = credited('purchase') + credited('adjustment')
+        spent = debited('booking')
+        refunded = credited('refund')
+        return {
+            'issued': issued,
+            'spent': spent,
+            'refunded': refunded,
+            'removed': debited('adjustment'),
+            'net_spent': spent - refunded,
+            'net_change': sum(row.credited - row.debited for row in rows),
+        }
+    
+    return rollup_report(request, DailyCoinFlow, DailyCoinFlowSerializer, totals)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def occupancy_report(request):
+    """Get games, bookings and fill rate per day and location."""
+    def totals(rows):
+        total_slots = sum(row.total_slots for row in rows)
+        booked_slots = sum(row.booked_slots for row in rows)
+        return {
+            'games': sum(row.games for row in rows),
+            'total_slots': total_slots,
+            'booked_slots': booked_slots,
+            'fill_rate': round(booked_slots / total_slots, 4) if total_slots else 0.0,
+            'bookings': sum(row.bookings for row in rows),
+            'coins_booked': sum(row.coins_booked for row in rows),
+        }
+    
+    filters = {}
+    if request.query_params.get('location'):
+        filters['location'] = request.query_params['location']
+    return rollup_report(request, DailyLocationStats, DailyLocationStatsSerializer, totals, **filters)
+
+
+class GameStatsListView(ReplicaReadMixin, generics.ListAPIView):
+    """View for listing booking totals and fill rate per game."""
+    
+    serializer_class = GameStatsSerializer
+    permission_classes = [permissions.IsAdminUser]
+    
+    def get_queryset(self):
+        start, end = report_range(self.request)
+        queryset = GameStats.objects.filter(day__gte=start, day__lt=end)
+        if self.request.query_params.get('location'):
+            queryset = queryset.filter(location=self.request.query_params['location'])
+        return queryset.order_by('day', 'game_id')
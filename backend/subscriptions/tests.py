@@ -1,3 +1,75 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from accounts.models import User
+from galactiturf.testing import AdminQueryCountMixin
+from payments.models import Transaction
+from .models import SubscriptionTier
+
+
+@override_settings(STREAM_CHUNK_SIZE=2)
+class SubscriptionHistoryTests(TestCase):
+    """Tests for the streamed subscription history."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='player', password='testpass123', coin_balance=1500, subscription_tier='silver'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def add_payments(self, count):
+        for index in range(count):
+            Transaction.objects.create(
+                user=self.user, transaction_type='subscription', amount='15000.00', coins_amount=5000,
+                reference_id=f'PS_HIST_{index}', status='success'
+            )
+
+    def expected_bytes(self):
+        payments = self.user.transactions.filter(status='success').order_by('-created_at')
+        return JSONRenderer().render({
+            'current_tier': 'silver',
+            'current_balance': 1500,
+            'subscription_history': [
+                {
+                    'id': payment.id,
+                    'amount': str(payment.amount),
+                    'coins_awarded': payment.coins_amount,
+                    'date': payment.created_at,
+                    'reference': payment.reference_id,
+                }
+                for payment in payments
+            ],
+        })
+
+    def test_streamed_history_matches_buffered_json(self):
+        for count in (0, 1, 5):
+            Transaction.objects.all().delete()
+            self.add_payments(count)
+            response = self.client.get('/api/subscriptions/history/')
+            self.assertTrue(response.streaming)
+            self.assertEqual(b''.join(response.streaming_content), self.expected_bytes())
+
+    def test_history_is_gzipped_on_request(self):
+        self.add_payments(20)
+        response = self.client.get('/api/subscriptions/history/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+
+class SubscriptionsAdminQueryTests(AdminQueryCountMixin, TestCase):
+    """Query-count regression tests for the subscriptions admin changelists."""
+
+    def setUp(self):
+        self.login_admin()
+
+    def test_tier_changelist(self):
+        names = iter(['bronze', 'silver', 'gold'])
+
+        def add_rows(count):
+            for name in [next(names, None) for _ in range(count)]:
+                if name:
+                    SubscriptionTier.objects.create(name=name, price=5000, coins_awarded=1000)
+
+        self.assertChangelistQueriesConstant('/admin/subscriptions/subscriptiontier/', add_rows)
@@ -2,12 +2,14 @@ from rest_framework import status, generics, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
+from galactiturf.db_router import ReplicaReadMixin
+from galactiturf.streaming import StreamingJSONResponse, stream_chunk_size
 from .models import SubscriptionTier
 from .serializers import SubscriptionTierSerializer, SubscriptionPurchaseSerializer
 from payments.models import Transaction
 
 
-class SubscriptionTierListView(generics.ListAPIView):
+class SubscriptionTierListView(ReplicaReadMixin, generics.ListAPIView):
     """View for listing subscription tiers."""
     
     queryset = SubscriptionTier.get_active_tiers()
@@ -56,7 +58,7 @@ def purchase_subscription(request):
     transaction.mark_successful({'status': 'success'})
     
     # Add coins to user
-    request.user.add_coins(tier.coins_awarded)
+    request.user.add_coins(tier.coins_awarded, reason='purchase', reference=transaction.reference_id)
     
     # Update user's subscription tier
     request.user.subscription_tier = tier.name
@@ -78,25 +80,31 @@ def purchase_subscription(request):
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def user_subscription_history(request):
-    """Get user's subscription history."""
+    """Get user's subscription history, streamed so long histories use constant memory."""
     user = request.user
     
     subscription_transactions = user.transactions.filter(
         transaction_type='subscription',
         status='success'
-    ).order_by('-created_at')
+    ).order_by('-created_at').values_list('id', 'amount', 'coins_amount', 'created_at', 'reference_id')
     
-    return Response({
-        'current_tier': user.subscription_tier,
-        'current_balance': user.coin_balance,
-        'subscription_history': [
-            {
-                'id': transaction.id,
-                'amount': str(transaction.amount),
-                'coins_awarded': transaction.coins_amount,
-                'date': transaction.created_at,
-                'reference': transaction.reference_id
-            }
-            for transaction in subscription_transactions
-        ]
-    })
+    history = (
+        {
+            'id': transaction_id,
+            'amount': str(amount),
+            'coins_awarded': coins_amount,
+            'date': created_at,
+            'reference': reference_id
+        }
+        for transaction_id, amount, coins_amount, created_at, reference_id
+        in subscription_transactions.iterator(chunk_size=stream_chunk_size())
+    )
+    
+    return StreamingJSONResponse(
+        history,
+        head={
+            'current_tier': user.subscription_tier,
+            'current_balance': user.coin_balance,
+        },
+        key='subscription_history'
+    )
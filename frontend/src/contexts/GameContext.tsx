@@ -5,6 +5,8 @@ interface Game {
   id: number;
   name: string;
   location: string;
+  venue: number | null;
+  series: number | null;
   date_time: string;
   coin_price: number;
   total_slots: number;
@@ -43,6 +45,28 @@ interface GameContextType {
   getGame: (id: number) => Promise<Game>;
 }
 
+interface SlotAvailability {
+  game: number;
+  available_slots: number;
+  status: string;
+}
+
+const applyAvailability = (games: Game[], updates: SlotAvailability[]): Game[] => {
+  const byGame = new Map(updates.map((update) => [update.game, update]));
+  return games.map((game) => {
+    const update = byGame.get(game.id);
+    if (!update) {
+      return game;
+    }
+    return {
+      ...game,
+      available_slots: update.available_slots,
+      is_full: update.available_slots === 0,
+      status: update.status,
+    };
+  });
+};
+
 const GameContext = createContext<GameContextType | undefined>(undefined);
 
 export const useGame = () => {
@@ -62,6 +86,20 @@ export const GameProvider: React.FC<GameProviderProps> = ({ children }) => {
   const [bookings, setBookings] = useState<Booking[]>([]);
   const [loading, setLoading] = useState(false);
 
+  // Keep slot counts live; EventSource reconnects by itself and gets a fresh snapshot
+  useEffect(() => {
+    const events = new EventSource(gamesAPI.eventsUrl);
+    events.addEventListener('snapshot', (event) => {
+      const { games: updates } = JSON.parse((event as MessageEvent).data);
+      setGames((current) => applyAvailability(current, updates));
+    });
+    events.addEventListener('slots', (event) => {
+      const update = JSON.parse((event as MessageEvent).data);
+      setGames((current) => applyAvailability(current, [update]));
+    });
+    return () => events.close();
+  }, []);
+
   const fetchGames = async (params?: any) => {
     setLoading(true);
     try {
@@ -70,12 +70,20 @@ export const authAPI = {
 export const gamesAPI = {
   getGames: withWakeUp((params?: any) => api.get('/games/', { params })),
   getGame: withWakeUp((id: number) => api.get(`/games/${id}/`)),
+  getNearbyGames: withWakeUp((params: { lat: number; lng: number; radius?: number; limit?: number }) => api.get('/games/nearby/', { params })),
   createGame: withWakeUp((data: any) => api.post('/games/create/', data)),
+  importGames: withWakeUp((data: FormData | any[]) => api.post('/games/import/', data)),
   getBookings: withWakeUp(() => api.get('/games/bookings/')),
   createBooking: withWakeUp((data: any) => api.post('/games/bookings/create/', data)),
   getBooking: withWakeUp((id: number) => api.get(`/games/bookings/${id}/`)),
   cancelBooking: withWakeUp((id: number) => api.post(`/games/bookings/${id}/cancel/`)),
   getBookingsSummary: withWakeUp(() => api.get('/games/bookings/summary/')),
+  holdSlots: withWakeUp((data: any) => api.post('/games/holds/create/', data)),
+  getHold: withWakeUp((token: string) => api.get(`/games/holds/${token}/`)),
+  confirmHold: withWakeUp((token: string, data?: any) => api.post(`/games/holds/${token}/confirm/`, data)),
+  releaseHold: withWakeUp((token: string) => api.delete(`/games/holds/${token}/`)),
+  // Server-sent events with live slot availability for every upcoming game
+  eventsUrl: `${API_URL}/api/games/events/`,
 };
 
 // Subscriptions API